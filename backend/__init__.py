@@ -192,6 +192,16 @@ def create_app(config_name=None):
         print(f"⚠️ Some blueprints failed to load: {blueprint_errors}")
     else:
         print("✅ All blueprints registered successfully")
+
+    # Keep generated/ bounded whenever PDFs are written there (archive copies, job outputs)
+    if app.config.get('PDF_PERSIST_GENERATED') or app.config.get('PDF_JOB_WORKERS'):
+        try:
+            from backend.utils.generated_sweeper import start_generated_sweeper
+            from backend.utils.pdf_jobs import job_output_names
+            start_generated_sweeper(app, protected=lambda: job_output_names(app))
+            print("✅ Generated PDF sweeper started")
+        except ImportError as e:
+            print(f"⚠️ Generated PDF sweeper not started: {e}")
     
     # Add basic routes for testing and health checks
     @app.route('/')
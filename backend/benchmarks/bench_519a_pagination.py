@@ -0,0 +1,112 @@
+# benchmarks/bench_519a_pagination.py
+"""
+Memory and time of a 519A with a long drug-movement history, rendered as one
+document versus paginated (a few pages per renderer call, joined with pdfrw).
+
+    python backend/benchmarks/bench_519a_pagination.py --movements 10000
+    python backend/benchmarks/bench_519a_pagination.py --engine reportlab --sizes 1000,5000,10000
+
+Each case runs in a fresh subprocess so peak RSS is not carried between
+cases. For wkhtmltopdf the peak is the largest renderer process
+(RUSAGE_CHILDREN); for ReportLab it is the benchmark process itself.
+Paginated peaks should stay flat as the history grows.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import resource
+from pathlib import Path
+
+# Make the backend package importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / 'templates'
+
+
+def build_body(movements):
+    return {
+        'receiving_no': 'BENCH-RN-0001', 'item_no': 'BENCH-ITEM-0001', 'lot_no': 'LOT-0001',
+        'storage_conditions': '2-8C', 'max_exposure_time': 100000, 'temper_time': 15, 'working_exposure_time': 60,
+        'drug_movements': [
+            {'destination': f'Pharmacy shelf {i % 12}', 'date': '2026-10-18', 'time': f'{i % 24:02d}:{i % 60:02d}',
+             'exposure_time': 2, 'cumulative_et': 2 * (i + 1), 'completed_by': 'QA', 'verified_by': 'QA2'}
+            for i in range(movements)
+        ]
+    }
+
+
+def run_case(engine, mode, movements, wkhtmltopdf):
+    """One render in this process; prints a JSON result line"""
+    from flask import Flask
+    from backend.utils.html_to_pdf_handler import HTMLToPDFHandler
+
+    app = Flask(__name__, template_folder=str(TEMPLATE_DIR))
+    app.config.update(
+        WKHTMLTOPDF_PATH=wkhtmltopdf, PDF_CACHE_MAX_MB=0, PDF_RENDERER_POOL_SIZE=1, PDF_METRICS_LOG=False,
+        PDF_RENDERER_MEMORY_MB=0, PDF_RENDER_TIMEOUT=3600,
+        # 'single' never paginates; 'paginated' always does
+        PDF_519A_PAGINATE_ABOVE=0 if mode == 'single' else 1
+    )
+    handler = HTMLToPDFHandler(app.config)
+    body = build_body(movements)
+    who = resource.RUSAGE_SELF if engine == 'reportlab' else resource.RUSAGE_CHILDREN
+
+    with app.app_context():
+        started = time.perf_counter()
+        output = handler.generate_519a_pdf(body, engine=engine)
+        elapsed = time.perf_counter() - started
+    handler.renderer.close()
+
+    usage = resource.getrusage(who)
+    print(json.dumps({
+        'seconds': round(elapsed, 2),
+        'bytes': len(output.getvalue()),
+        # ru_maxrss is reported in kilobytes on Linux
+        'peak_rss_mb': round(usage.ru_maxrss / 1e3, 1),
+        'cpu_seconds': round(usage.ru_utime + usage.ru_stime, 2)
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--movements', type=int, default=10000)
+    parser.add_argument('--sizes', help='comma-separated history lengths (default: --movements)')
+    parser.add_argument('--engine', choices=('wkhtmltopdf', 'reportlab'), default='wkhtmltopdf')
+    parser.add_argument('--modes', default='paginated,single')
+    parser.add_argument('--case', nargs=2, metavar=('MODE', 'MOVEMENTS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    wkhtmltopdf = os.environ.get('WKHTMLTOPDF_PATH') or shutil.which('wkhtmltopdf') or '/usr/bin/wkhtmltopdf'
+    if args.case:
+        run_case(args.engine, args.case[0], int(args.case[1]), wkhtmltopdf)
+        return
+
+    if args.engine == 'wkhtmltopdf' and not os.access(wkhtmltopdf, os.X_OK):
+        print(f"wkhtmltopdf: {wkhtmltopdf} not found; set WKHTMLTOPDF_PATH or use --engine reportlab")
+        return
+
+    sizes = [int(size) for size in (args.sizes or str(args.movements)).split(',')]
+    print(f"Engine:     {args.engine}")
+    print(f"  {'mode':<10} {'movements':>9} {'seconds':>8} {'cpu s':>7} {'peak RSS MB':>12} {'bytes':>10}")
+    for size in sizes:
+        for mode in args.modes.split(','):
+            completed = subprocess.run(
+                [sys.executable, __file__, '--engine', args.engine, '--case', mode, str(size)],
+                capture_output=True, text=True, env=dict(os.environ, WKHTMLTOPDF_PATH=wkhtmltopdf)
+            )
+            lines = [line for line in completed.stdout.splitlines() if line.startswith('{')]
+            if completed.returncode != 0 or not lines:
+                error = (completed.stderr.strip().splitlines() or ['no output'])[-1]
+                print(f"  {mode:<10} {size:>9} failed: {error}")
+                continue
+            result = json.loads(lines[-1])
+            print(f"  {mode:<10} {size:>9} {result['seconds']:>8.2f} {result['cpu_seconds']:>7.2f} "
+                  f"{result['peak_rss_mb']:>12.1f} {result['bytes']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# benchmarks/bench_item_import.py
+"""
+Throughput benchmark for the bulk item import (utils/item_import.py).
+
+Generates an N-row CSV in memory and streams it through import_items()
+against a scratch database, reporting rows/second and peak RSS.
+
+    python backend/benchmarks/bench_item_import.py --rows 100000
+    DATABASE_URL=postgresql://... python backend/benchmarks/bench_item_import.py
+
+Without DATABASE_URL a temporary SQLite file is used.
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+import resource
+from pathlib import Path
+
+# Make the backend package importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from flask import Flask # noqa: E402
+from backend.extensions import db # noqa: E402
+from backend.utils.item_import import import_items, iter_csv_rows # noqa: E402
+
+HEADER = ('item_number,description,client,protocol_number,vendor,uom,controlled,'
+          'temp_storage_conditions,other_storage_conditions,max_exposure_time,temper_time,'
+          'working_exposure_time,vendor_code_rev,randomized,sequential_numbers,study_type\n')
+
+
+def build_csv(rows):
+    buffer = io.StringIO()
+    buffer.write(HEADER)
+    for i in range(rows):
+        buffer.write(
+            f'BENCH-{i:07d},Benchmark item {i} description,Client {i % 40},PROT-{i % 300},'
+            f'Vendor {i % 25},EA,No,2-8C,N/A,{30 + i % 60},15,20,REV-A,No,Yes,Clinical\n'
+        )
+    return io.BytesIO(buffer.getvalue().encode('utf-8'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    scratch_dir = tempfile.mkdtemp(prefix='bench_import_')
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+        'DATABASE_URL', f"sqlite:///{os.path.join(scratch_dir, 'bench.db')}"
+    )
+    db.init_app(app)
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        csv_file = build_csv(args.rows)
+        print(f"Database:   {db.engine.url.render_as_string(hide_password=True)}")
+        print(f"Rows:       {args.rows} ({len(csv_file.getvalue()) / 1e6:.1f} MB CSV), chunk size {args.chunk_size}")
+
+        started = time.perf_counter()
+        report = import_items(iter_csv_rows(csv_file), chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - started
+
+        print(f"Imported:   {report['imported']} rows, {report['failed']} failed")
+        print(f"Elapsed:    {elapsed:.2f} s")
+        print(f"Throughput: {report['imported'] / elapsed:,.0f} rows/s")
+        # ru_maxrss is reported in kilobytes on Linux
+        print(f"Peak RSS:   {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3:.1f} MB")
+
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
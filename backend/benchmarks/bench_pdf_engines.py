@@ -0,0 +1,140 @@
+# benchmarks/bench_pdf_engines.py
+"""
+Latency, CPU and memory of the two PDF engines on the same inputs.
+
+Renders 501A, 519A and 520B (and the three as one packet) with the
+ReportLab engine and then the wkhtmltopdf engine, with the PDF cache off,
+and reports p50/p95 latency, CPU milliseconds per document and peak RSS.
+
+    python backend/benchmarks/bench_pdf_engines.py --runs 50 --transactions 40
+    WKHTMLTOPDF_PATH=/usr/local/bin/wkhtmltopdf python backend/benchmarks/bench_pdf_engines.py
+
+ReportLab runs inside this process, so its CPU and RSS are RUSAGE_SELF.
+wkhtmltopdf runs in child processes: its CPU is RUSAGE_CHILDREN (each
+render reaps the process that did it, start-up included) and its RSS is
+the largest child.
+ReportLab runs first so the self peak is not inflated by the other engine.
+"""
+import argparse
+import io
+import os
+import shutil
+import statistics
+import sys
+import time
+import resource
+from pathlib import Path
+
+# Make the backend package importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from flask import Flask # noqa: E402
+from backend.utils.html_to_pdf_handler import HTMLToPDFHandler # noqa: E402
+from backend.utils.reportlab_forms import REPORTLAB_AVAILABLE # noqa: E402
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / 'templates'
+
+
+def build_inputs(transactions, movements):
+    body_501a = {
+        'receiving_no': 'BENCH-RN-0001', 'item_no': 'BENCH-ITEM-0001',
+        'item_description': 'Benchmark item, 10 mg tablets in HDPE bottles',
+        'client_name': 'Bench Client', 'vendor_name': 'Bench Vendor', 'lot_no': 'LOT-0001',
+        'storage_conditions': '2-8C', 'total_units_received': '120 EA', 'controlled_substance': 'No',
+        'locationStatus': {'quarantine': True}, 'dateType': 'Expiration Date', 'dateValue': '2027-01-31',
+        'completedBy': 'QA 2026-10-18',
+        'transactions': [
+            {'date': '2026-10-18', 'reason': f'Dispense {i}', 'transactionType': 'Out', 'quantity': 1,
+             'balance': 120 - i, 'balanceLocation': 'Fridge A', 'enteredBy': 'QA'}
+            for i in range(transactions)
+        ],
+        'comments': 'Received in good condition.'
+    }
+    body_519a = {
+        'receiving_no': 'BENCH-RN-0001', 'item_no': 'BENCH-ITEM-0001', 'lot_no': 'LOT-0001',
+        'storage_conditions': '2-8C', 'max_exposure_time': 120, 'temper_time': 15, 'working_exposure_time': 60,
+        'drug_movements': [
+            {'destination': 'Pharmacy', 'date': '2026-10-18', 'time': '09:00', 'exposure_time': 2,
+             'cumulative_et': 2 * (i + 1), 'completed_by': 'QA', 'verified_by': 'QA2'}
+            for i in range(movements)
+        ]
+    }
+    body_520b = {
+        'Item No': 'BENCH-ITEM-0001', 'RN': 'BENCH-RN-0001', 'Lot No': 'LOT-0001', 'Vendor': 'Bench Vendor',
+        'Protocol No': 'PROT-1', 'UoM': 'EA', 'Client Name': 'Bench Client',
+        'deliveryAcceptanceNA': {'material_placed': True}, 'documentVerification': {'COA #': True},
+        'Comments': 'None'
+    }
+    return [
+        ('501A', lambda handler, engine: handler.generate_501a_pdf(body_501a, engine=engine)),
+        ('519A', lambda handler, engine: handler.generate_519a_pdf(body_519a, engine=engine)),
+        ('520B', lambda handler, engine: handler.generate_520b_pdf(body_520b, engine=engine)),
+        ('packet', lambda handler, engine: handler.generate_packet_pdf(
+            {'501A': body_501a, '519A': body_519a, '520B': body_520b}, engine=engine)),
+    ]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_engine(app, handler, engine, inputs, runs):
+    who = resource.RUSAGE_SELF if engine == 'reportlab' else resource.RUSAGE_CHILDREN
+    results = []
+    with app.app_context():
+        for name, render in inputs:
+            render(handler, engine)  # warm-up: fonts, templates, first process
+            before = resource.getrusage(who)
+            latencies, size = [], 0
+            for _ in range(runs):
+                started = time.perf_counter()
+                output = render(handler, engine)
+                latencies.append((time.perf_counter() - started) * 1000)
+                size = len(output.getvalue()) if isinstance(output, io.BytesIO) else Path(output).stat().st_size
+            after = resource.getrusage(who)
+            cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+            results.append((name, statistics.median(latencies), percentile(latencies, 0.95), cpu / runs * 1000, size))
+    # ru_maxrss is reported in kilobytes on Linux
+    return results, resource.getrusage(who).ru_maxrss / 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=30)
+    parser.add_argument('--transactions', type=int, default=40, help='501A transaction rows')
+    parser.add_argument('--movements', type=int, default=20, help='519A drug movement rows')
+    parser.add_argument('--engine', choices=('reportlab', 'wkhtmltopdf', 'both'), default='both')
+    args = parser.parse_args()
+
+    wkhtmltopdf = os.environ.get('WKHTMLTOPDF_PATH') or shutil.which('wkhtmltopdf') or '/usr/bin/wkhtmltopdf'
+    app = Flask(__name__, template_folder=str(TEMPLATE_DIR))
+    app.config.update(WKHTMLTOPDF_PATH=wkhtmltopdf, PDF_CACHE_MAX_MB=0, PDF_RENDERER_POOL_SIZE=1,
+                      PDF_METRICS_LOG=False)
+    handler = HTMLToPDFHandler(app.config)
+
+    engines = ['reportlab', 'wkhtmltopdf'] if args.engine == 'both' else [args.engine]
+    inputs = build_inputs(args.transactions, args.movements)
+    print(f"Inputs:     501A with {args.transactions} transactions, 519A with {args.movements} movements, "
+          f"520B, packet; {args.runs} runs each")
+
+    try:
+        for engine in engines:
+            if engine == 'reportlab' and not REPORTLAB_AVAILABLE:
+                print("\nreportlab: not installed, skipped")
+                continue
+            if engine == 'wkhtmltopdf' and not os.access(wkhtmltopdf, os.X_OK):
+                print(f"\nwkhtmltopdf: {wkhtmltopdf} not found, skipped")
+                continue
+            results, peak_rss = run_engine(app, handler, engine, inputs, args.runs)
+            print(f"\n{engine}")
+            print(f"  {'form':<8} {'p50 ms':>9} {'p95 ms':>9} {'cpu ms/doc':>11} {'bytes':>9}")
+            for name, p50, p95, cpu, size in results:
+                print(f"  {name:<8} {p50:>9.1f} {p95:>9.1f} {cpu:>11.1f} {size:>9}")
+            print(f"  peak RSS {'(this process)' if engine == 'reportlab' else '(largest renderer)'}: {peak_rss:.1f} MB")
+    finally:
+        handler.renderer.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -15,6 +15,48 @@ class Config:
     # PDF settings
     PDF_UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
     PDF_OUTPUT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'generated')
+    WKHTMLTOPDF_PATH = os.environ.get('WKHTMLTOPDF_PATH', '/usr/bin/wkhtmltopdf')
+    PDF_ENGINE = os.environ.get('PDF_ENGINE', 'wkhtmltopdf')                         # or 'reportlab'; ?engine= overrides per request
+    
+    # PDF renderer pool (one per app process)
+    PDF_RENDERER_POOL_SIZE = int(os.environ.get('PDF_RENDERER_POOL_SIZE', 2))        # concurrent renders / warm processes
+    PDF_RENDERER_QUEUE_SIZE = int(os.environ.get('PDF_RENDERER_QUEUE_SIZE', 8))      # renders allowed to wait for a process, per app process
+    PDF_RENDER_TIMEOUT = int(os.environ.get('PDF_RENDER_TIMEOUT', 60))               # seconds before a render is killed
+    PDF_RENDERER_MEMORY_MB = int(os.environ.get('PDF_RENDERER_MEMORY_MB', 1024))     # address-space cap (Linux), 0 disables
+    PDF_RENDERER_MAX_IDLE_SECONDS = int(os.environ.get('PDF_RENDERER_MAX_IDLE_SECONDS', 300))
+    PDF_CACHE_MAX_MB = int(os.environ.get('PDF_CACHE_MAX_MB', 256))                  # rendered-PDF cache budget across all workers, 0 disables
+    PDF_METRICS_LOG = os.environ.get('PDF_METRICS_LOG', 'true').lower() in ('true', '1', 'yes')  # one JSON log line per PDF request
+    PDF_OPTIMIZE = os.environ.get('PDF_OPTIMIZE', 'true').lower() in ('true', '1', 'yes')    # dedupe resources + recompress streams (pdfrw)
+    PDF_LINEARIZE = os.environ.get('PDF_LINEARIZE', 'true').lower() in ('true', '1', 'yes')  # fast first page; only when qpdf is installed
+    QPDF_PATH = os.environ.get('QPDF_PATH')                                             # defaults to qpdf on PATH
+    PDF_519A_PAGINATE_ABOVE = int(os.environ.get('PDF_519A_PAGINATE_ABOVE', 100))    # drug movements before 519A renders page by page, 0 disables
+    PDF_519A_ROWS_PER_PAGE = int(os.environ.get('PDF_519A_ROWS_PER_PAGE', 20))
+    PDF_519A_PAGES_PER_RENDER = int(os.environ.get('PDF_519A_PAGES_PER_RENDER', 10))  # pages per renderer call; bounds renderer memory
+    
+    # Host-wide cap on /generate-pdf/* and /packet requests (flock slots shared by all workers).
+    # Rendering and queued requests each hold a request worker, so slots + queue are lowered
+    # to at most WEB_CONCURRENCY - PDF_BATCH_CONCURRENCY - PDF_WORKER_RESERVE; past a slot, a request can still
+    # wait for its process's renderer (PDF_RENDERER_QUEUE_SIZE, mostly used by jobs and batches)
+    WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 8))                      # request workers on the host (gunicorn workers x threads)
+    PDF_WORKER_RESERVE = int(os.environ.get('PDF_WORKER_RESERVE', 2))                # workers PDF requests never hold
+    PDF_CONCURRENCY = int(os.environ.get('PDF_CONCURRENCY', 4))                      # rendering at once, 0 disables
+    PDF_CONCURRENCY_QUEUE = int(os.environ.get('PDF_CONCURRENCY_QUEUE', 2))          # waiting beyond that; more get 429 at once
+    PDF_CONCURRENCY_WAIT_SECONDS = int(os.environ.get('PDF_CONCURRENCY_WAIT_SECONDS', 30))
+    PDF_CONCURRENCY_DIR = os.environ.get('PDF_CONCURRENCY_DIR')                     # lock files; defaults to <tmp>/pdf_slots
+    
+    # generated/ housekeeping: old PDFs go to per-day ZIPs in generated/archive
+    PDF_PERSIST_GENERATED = os.environ.get('PDF_PERSIST_GENERATED', 'false').lower() in ('true', '1', 'yes')  # keep a copy of every PDF for archiving
+    PDF_RETENTION_HOURS = int(os.environ.get('PDF_RETENTION_HOURS', 24))
+    PDF_ARCHIVE_RETENTION_DAYS = int(os.environ.get('PDF_ARCHIVE_RETENTION_DAYS', 90))
+    PDF_GENERATED_MAX_MB = int(os.environ.get('PDF_GENERATED_MAX_MB', 2048))          # live PDFs + archives
+    PDF_SWEEP_INTERVAL_SECONDS = int(os.environ.get('PDF_SWEEP_INTERVAL_SECONDS', 900))  # 0 disables the background sweep
+    
+    # Asynchronous PDF jobs (/api/form/jobs), queued in the pdf_jobs table
+    PDF_JOB_WORKERS = int(os.environ.get('PDF_JOB_WORKERS', 2))                      # worker threads per app process
+    PDF_JOB_MAX_ATTEMPTS = int(os.environ.get('PDF_JOB_MAX_ATTEMPTS', 3))
+    PDF_JOB_STALE_SECONDS = int(os.environ.get('PDF_JOB_STALE_SECONDS', 300))        # 'running' longer than this is requeued
+    PDF_BATCH_MAX_DOCUMENTS = int(os.environ.get('PDF_BATCH_MAX_DOCUMENTS', 500))    # forms per /api/form/batch request
+    PDF_BATCH_CONCURRENCY = int(os.environ.get('PDF_BATCH_CONCURRENCY', 1))          # /api/form/batch requests at once on the host; more get 429
     
     # Security fallbacks (only used if env vars not set)
     SECRET_KEY = os.environ.get('SECRET_KEY') or secrets.token_hex(32)
@@ -57,6 +99,9 @@ class TestingConfig(Config):
     # Override security keys for testing to ensure they're safe/predictable
     SECRET_KEY = 'test-secret-key-not-for-production'
     JWT_SECRET_KEY = 'test-jwt-secret-key-not-for-production'
+
+    # No background sweeps of generated/ while tests run
+    PDF_SWEEP_INTERVAL_SECONDS = 0
     
     # Use DATABASE_URL if provided (for CI), otherwise use test database or fallback
     if os.environ.get('DATABASE_URL'):
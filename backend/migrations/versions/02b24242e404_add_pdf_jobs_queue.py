@@ -0,0 +1,46 @@
+"""Add pdf_jobs table for asynchronous PDF generation
+
+Revision ID: 02b24242e404
+Revises: 167c17f797c0
+Create Date: 2026-10-18 05:46:12.408817
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '02b24242e404'
+down_revision = '167c17f797c0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('pdf_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('form_type', sa.String(length=10), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('receiving_no', sa.String(length=20), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('worker_id', sa.String(length=100), nullable=True),
+    sa.Column('output_path', sa.String(length=500), nullable=True),
+    sa.Column('file_size', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('pdf_jobs', schema=None) as batch_op:
+        batch_op.create_index('ix_pdf_jobs_status_id', ['status', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('pdf_jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_pdf_jobs_status_id')
+
+    op.drop_table('pdf_jobs')
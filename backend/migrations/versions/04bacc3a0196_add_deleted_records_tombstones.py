@@ -0,0 +1,38 @@
+"""Add deleted_records tombstones for delta sync
+
+Revision ID: 04bacc3a0196
+Revises: ab8b1f724864
+Create Date: 2026-10-18 05:27:54.618755
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '04bacc3a0196'
+down_revision = 'ab8b1f724864'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('deleted_records',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('table_name', sa.String(length=50), nullable=False),
+    sa.Column('record_id', sa.Integer(), nullable=False),
+    sa.Column('record_key', sa.String(length=50), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.Column('deleted_by', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['deleted_by'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('deleted_records', schema=None) as batch_op:
+        batch_op.create_index('ix_deleted_records_table_deleted_at_id', ['table_name', 'deleted_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('deleted_records', schema=None) as batch_op:
+        batch_op.drop_index('ix_deleted_records_table_deleted_at_id')
+
+    op.drop_table('deleted_records')
@@ -0,0 +1,38 @@
+"""Add case-insensitive unique index on item_number.description
+
+Revision ID: 1154ddec327c
+Revises: a75148b004b0
+Create Date: 2026-10-18 05:30:07.245811
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1154ddec327c'
+down_revision = 'a75148b004b0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fail with a readable message instead of a bare IntegrityError when
+    # existing rows already collide; they have to be merged by hand first.
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT lower(trim(description)) AS description_key, count(*) AS n "
+        "FROM item_number GROUP BY lower(trim(description)) HAVING count(*) > 1"
+    )).fetchall()
+    if duplicates:
+        listing = ', '.join(f"'{row.description_key}' ({row.n} rows)" for row in duplicates[:10])
+        raise RuntimeError(f"Duplicate item descriptions must be resolved before this migration: {listing}")
+
+    # Expression indexes are supported by both Postgres and SQLite (3.9+)
+    op.create_index(
+        'uq_item_number_description_ci', 'item_number',
+        [sa.text('lower(trim(description))')], unique=True
+    )
+
+
+def downgrade():
+    op.drop_index('uq_item_number_description_ci', table_name='item_number')
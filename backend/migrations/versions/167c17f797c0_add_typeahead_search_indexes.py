@@ -0,0 +1,56 @@
+"""Add trigram and prefix indexes for typeahead search
+
+Revision ID: 167c17f797c0
+Revises: 1154ddec327c
+Create Date: 2026-10-18 05:31:04.771251
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '167c17f797c0'
+down_revision = '1154ddec327c'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, column) - GIN trigram indexes serve ILIKE '%q%'
+TRIGRAM_INDEXES = [
+    ('ix_item_number_item_number_trgm', 'item_number', 'item_number'),
+    ('ix_item_number_description_trgm', 'item_number', 'description'),
+    ('ix_receiving_data_receiving_no_trgm', 'receiving_data', 'receiving_no'),
+    ('ix_receiving_data_item_number_trgm', 'receiving_data', 'item_number'),
+]
+
+# (index name, table, column) - btree on lower(column) serves LIKE 'q%'
+PREFIX_INDEXES = [
+    ('ix_item_number_item_number_lower_prefix', 'item_number', 'item_number'),
+    ('ix_receiving_data_receiving_no_lower_prefix', 'receiving_data', 'receiving_no'),
+]
+
+
+def upgrade():
+    # SQLite has no pg_trgm; the API falls back to an in-process prefix index there
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(name, table, [sa.text(f'{column} gin_trgm_ops')], postgresql_using='gin')
+
+    for name, table, column in PREFIX_INDEXES:
+        op.create_index(name, table, [sa.text(f'lower({column}) text_pattern_ops')])
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for name, table, _ in reversed(PREFIX_INDEXES):
+        op.drop_index(name, table_name=table)
+
+    for name, table, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,33 @@
+"""Add (sort key, id) indexes for the item_number and receiving_no sorts
+
+Revision ID: 4b6d05c106c4
+Revises: 02b24242e404
+Create Date: 2026-10-18 09:12:41.220417
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '4b6d05c106c4'
+down_revision = '02b24242e404'
+branch_labels = None
+depends_on = None
+
+
+# ?sort=item_number / ?sort=receiving_no page on (key, id); the unique
+# indexes on the key alone cannot serve that tuple ordering
+SORT_KEY_INDEXES = [
+    ('ix_item_number_item_number_id', 'item_number', 'item_number'),
+    ('ix_receiving_data_receiving_no_id', 'receiving_data', 'receiving_no'),
+]
+
+
+def upgrade():
+    for name, table, column in SORT_KEY_INDEXES:
+        op.create_index(name, table, [column, 'id'])
+
+
+def downgrade():
+    for name, table, _ in reversed(SORT_KEY_INDEXES):
+        op.drop_index(name, table_name=table)
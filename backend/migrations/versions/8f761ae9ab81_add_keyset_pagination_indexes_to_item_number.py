@@ -0,0 +1,49 @@
+"""Add keyset pagination indexes to item_number
+
+Revision ID: 8f761ae9ab81
+Revises: afab5dae648b
+Create Date: 2026-10-18 05:25:23.484262
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f761ae9ab81'
+down_revision = 'afab5dae648b'
+branch_labels = None
+depends_on = None
+
+
+# (index name, leading equality columns) - every index ends in (display_order, id)
+DISPLAY_ORDER_INDEXES = [
+    ('ix_item_number_display_order_id', []),
+    ('ix_item_number_client_display_order_id', ['client']),
+    ('ix_item_number_protocol_display_order_id', ['protocol_number']),
+    ('ix_item_number_vendor_display_order_id', ['vendor']),
+    ('ix_item_number_obsolete_display_order_id', ['is_obsolete']),
+    ('ix_item_number_study_type_display_order_id', ['study_type']),
+]
+
+
+def _nulls_first(column):
+    # The API orders sort keys ASC NULLS FIRST. Postgres indexes default to
+    # NULLS LAST, so spell it out there; SQLite already sorts NULLs first.
+    if op.get_bind().dialect.name == 'postgresql':
+        return sa.text(f'{column} NULLS FIRST')
+    return column
+
+
+def upgrade():
+    for name, leading_columns in DISPLAY_ORDER_INDEXES:
+        op.create_index(name, 'item_number', leading_columns + [_nulls_first('display_order'), 'id'])
+
+    op.create_index('ix_item_number_updated_at_id', 'item_number', [_nulls_first('updated_at'), 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_item_number_updated_at_id', table_name='item_number')
+
+    for name, _ in reversed(DISPLAY_ORDER_INDEXES):
+        op.drop_index(name, table_name='item_number')
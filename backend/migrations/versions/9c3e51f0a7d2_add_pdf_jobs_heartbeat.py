@@ -0,0 +1,26 @@
+"""Add heartbeat_at to pdf_jobs so long renders are not requeued as stale
+
+Revision ID: 9c3e51f0a7d2
+Revises: 4b6d05c106c4
+Create Date: 2026-10-18 10:05:37.614209
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c3e51f0a7d2'
+down_revision = '4b6d05c106c4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('pdf_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('pdf_jobs', schema=None) as batch_op:
+        batch_op.drop_column('heartbeat_at')
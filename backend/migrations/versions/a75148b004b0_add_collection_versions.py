@@ -0,0 +1,40 @@
+"""Add collection_versions for conditional GET
+
+Revision ID: a75148b004b0
+Revises: 04bacc3a0196
+Create Date: 2026-10-18 05:29:22.941992
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a75148b004b0'
+down_revision = '04bacc3a0196'
+branch_labels = None
+depends_on = None
+
+
+VERSIONED_TABLES = ['item_number', 'receiving_data', 'users', 'roles']
+
+
+def upgrade():
+    collection_versions = op.create_table('collection_versions',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    # Seed one row per table so writers only ever UPDATE
+    now = datetime.utcnow()
+    op.bulk_insert(collection_versions, [
+        {'name': name, 'version': 1, 'updated_at': now} for name in VERSIONED_TABLES
+    ])
+
+
+def downgrade():
+    op.drop_table('collection_versions')
@@ -0,0 +1,57 @@
+"""Add keyset pagination indexes to receiving_data
+
+Revision ID: ab8b1f724864
+Revises: 8f761ae9ab81
+Create Date: 2026-10-18 05:26:39.519263
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ab8b1f724864'
+down_revision = '8f761ae9ab81'
+branch_labels = None
+depends_on = None
+
+
+# (index name, leading equality columns) - every index ends in (display_order, id)
+DISPLAY_ORDER_INDEXES = [
+    ('ix_receiving_data_display_order_id', []),
+    ('ix_receiving_data_item_number_display_order_id', ['item_number']),
+    ('ix_receiving_data_lot_no_display_order_id', ['lot_no']),
+    ('ix_receiving_data_po_no_display_order_id', ['po_no']),
+    ('ix_receiving_data_obsolete_display_order_id', ['is_obsolete']),
+]
+
+# (index name, sort/range column) - serve ?sort= and the *_from / *_to ranges
+RANGE_INDEXES = [
+    ('ix_receiving_data_created_at_id', 'created_at'),
+    ('ix_receiving_data_updated_at_id', 'updated_at'),
+    ('ix_receiving_data_exp_date_id', 'exp_date'),
+]
+
+
+def _nulls_first(column):
+    # The API orders sort keys ASC NULLS FIRST. Postgres indexes default to
+    # NULLS LAST, so spell it out there; SQLite already sorts NULLs first.
+    if op.get_bind().dialect.name == 'postgresql':
+        return sa.text(f'{column} NULLS FIRST')
+    return column
+
+
+def upgrade():
+    for name, leading_columns in DISPLAY_ORDER_INDEXES:
+        op.create_index(name, 'receiving_data', leading_columns + [_nulls_first('display_order'), 'id'])
+
+    for name, column in RANGE_INDEXES:
+        op.create_index(name, 'receiving_data', [_nulls_first(column), 'id'])
+
+
+def downgrade():
+    for name, _ in reversed(RANGE_INDEXES):
+        op.drop_index(name, table_name='receiving_data')
+
+    for name, _ in reversed(DISPLAY_ORDER_INDEXES):
+        op.drop_index(name, table_name='receiving_data')
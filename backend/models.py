@@ -7,6 +7,11 @@ except ImportError:
 from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash, check_password_hash
 
+# Keyset pages order nullable sort keys ASC NULLS FIRST (utils/pagination.py).
+# Postgres indexes default to NULLS LAST, so say so there (as the migrations
+# do); SQLite already sorts NULLs first and ignores postgresql_ops.
+NULLS_FIRST = {'display_order': 'NULLS FIRST'}
+
 class Role(db.Model):
     __tablename__ = 'roles'
     
@@ -99,6 +104,21 @@ class ItemNumber(db.Model):
     updater = db.relationship('User', foreign_keys=[updated_by], backref='updated_items', passive_deletes=True)
     receiving_data = db.relationship('ReceivingData', backref='item', lazy=True)
 
+    # Composite indexes backing keyset pagination on (sort key, id), optionally
+    # narrowed by the equality filters on /api/item/get
+    __table_args__ = (
+        # Case/whitespace-insensitive description uniqueness (Postgres and SQLite)
+        db.Index('uq_item_number_description_ci', db.func.lower(db.func.trim(description)), unique=True),
+        db.Index('ix_item_number_display_order_id', 'display_order', 'id', postgresql_ops=NULLS_FIRST),
+        db.Index('ix_item_number_updated_at_id', 'updated_at', 'id', postgresql_ops={'updated_at': 'NULLS FIRST'}),
+        db.Index('ix_item_number_item_number_id', 'item_number', 'id'),
+        db.Index('ix_item_number_client_display_order_id', 'client', 'display_order', 'id', postgresql_ops=NULLS_FIRST),
+        db.Index('ix_item_number_protocol_display_order_id', 'protocol_number', 'display_order', 'id', postgresql_ops=NULLS_FIRST),
+        db.Index('ix_item_number_vendor_display_order_id', 'vendor', 'display_order', 'id', postgresql_ops=NULLS_FIRST),
+        db.Index('ix_item_number_obsolete_display_order_id', 'is_obsolete', 'display_order', 'id', postgresql_ops=NULLS_FIRST),
+        db.Index('ix_item_number_study_type_display_order_id', 'study_type', 'display_order', 'id', postgresql_ops=NULLS_FIRST),
+    )
+
 class ReceivingData(db.Model):
     __tablename__ = 'receiving_data'
     
@@ -129,3 +149,70 @@ class ReceivingData(db.Model):
     # Relationships
     creator = db.relationship('User', foreign_keys=[created_by], backref='created_receivings', passive_deletes=True)
     updater = db.relationship('User', foreign_keys=[updated_by], backref='updated_receivings', passive_deletes=True)
+
+    # Composite indexes backing keyset pagination on (sort key, id), optionally
+    # narrowed by the filters on /api/receiving/get
+    __table_args__ = (
+        db.Index('ix_receiving_data_display_order_id', 'display_order', 'id', postgresql_ops=NULLS_FIRST),
+        db.Index('ix_receiving_data_created_at_id', 'created_at', 'id', postgresql_ops={'created_at': 'NULLS FIRST'}),
+        db.Index('ix_receiving_data_updated_at_id', 'updated_at', 'id', postgresql_ops={'updated_at': 'NULLS FIRST'}),
+        db.Index('ix_receiving_data_exp_date_id', 'exp_date', 'id', postgresql_ops={'exp_date': 'NULLS FIRST'}),
+        db.Index('ix_receiving_data_receiving_no_id', 'receiving_no', 'id'),
+        db.Index('ix_receiving_data_item_number_display_order_id', 'item_number', 'display_order', 'id', postgresql_ops=NULLS_FIRST),
+        db.Index('ix_receiving_data_lot_no_display_order_id', 'lot_no', 'display_order', 'id', postgresql_ops=NULLS_FIRST),
+        db.Index('ix_receiving_data_po_no_display_order_id', 'po_no', 'display_order', 'id', postgresql_ops=NULLS_FIRST),
+        db.Index('ix_receiving_data_obsolete_display_order_id', 'is_obsolete', 'display_order', 'id', postgresql_ops=NULLS_FIRST),
+    )
+
+class DeletedRecord(db.Model):
+    """Tombstone for a hard-deleted row, read by the /changes delta-sync feeds"""
+    __tablename__ = 'deleted_records'
+
+    id = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(50), nullable=False)
+    record_id = db.Column(db.Integer, nullable=False)
+    record_key = db.Column(db.String(50))  # item_number / receiving_no of the deleted row
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    deleted_by = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_deleted_records_table_deleted_at_id', 'table_name', 'deleted_at', 'id'),
+    )
+
+class CollectionVersion(db.Model):
+    """
+    Change counter per table, bumped right after every committed write
+    (see utils/conditional.py). Gives list endpoints a one-row ETag lookup.
+    """
+    __tablename__ = 'collection_versions'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class PdfJob(db.Model):
+    """
+    Durable queue entry for an asynchronous PDF render (utils/pdf_jobs.py).
+    Workers claim rows by flipping status queued -> running.
+    """
+    __tablename__ = 'pdf_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    form_type = db.Column(db.String(10), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued | running | done | failed
+    payload = db.Column(db.Text, nullable=False)  # JSON request body passed to the generator
+    receiving_no = db.Column(db.String(20))
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    worker_id = db.Column(db.String(100))
+    output_path = db.Column(db.String(500))
+    file_size = db.Column(db.Integer)
+    error = db.Column(db.Text)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)  # bumped by the owning worker while it renders
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_pdf_jobs_status_id', 'status', 'id'),
+    )
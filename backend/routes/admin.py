@@ -1,10 +1,16 @@
 # backend/routes/admin.py
-from flask import Blueprint, request, jsonify, send_file, Response
+from flask import Blueprint, g, request, jsonify, send_file, Response
 from flask_jwt_extended import jwt_required, get_jwt_identity # type: ignore
 from ..utils.role_checker import role_required
 from ..models import User, Role, ItemNumber, ReceivingData
 from ..extensions import db
 from ..utils.audit_logger import log_activity
+from ..utils.conditional import conditional_collection, conditional_response
+from ..utils.pagination import PaginationError
+from ..utils.streaming import is_stream_request, iter_json_array, json_array_offsets, stream_json_array
+from ..utils.item_import import (
+    DEFAULT_CHUNK_SIZE, OPENPYXL_AVAILABLE, import_items, iter_csv_rows, iter_xlsx_rows
+)
 from datetime import datetime, timedelta
 import os
 import json
@@ -59,6 +65,7 @@ bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 @bp.route('/users', methods=['GET'])
 @jwt_required()
 @role_required(['admin'])
+@conditional_collection('users', 'roles')
 def get_users():
     try:
         print("Fetching all users for admin dashboard")
@@ -248,10 +255,68 @@ def export_audit_logs():
         print(f"Error exporting audit logs: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/items/import', methods=['POST'])
+@jwt_required()
+@role_required(['admin'])
+def import_items_file():
+    """
+    Bulk-create items from an uploaded CSV or XLSX file (form field 'file').
+    Headers must match ItemNumber column names. Rows are streamed, validated
+    and inserted in chunks; the response is a per-row error report.
+    Pass ?dry_run=true to validate without inserting.
+    """
+    try:
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            return jsonify({'error': 'No file uploaded'}), 400
+
+        filename = upload.filename.lower()
+        if filename.endswith('.csv'):
+            rows = iter_csv_rows(upload.stream)
+        elif filename.endswith('.xlsx'):
+            if not OPENPYXL_AVAILABLE:
+                return jsonify({'error': 'Excel import not available - openpyxl not installed'}), 400
+            rows = iter_xlsx_rows(upload.stream)
+        else:
+            return jsonify({'error': 'Unsupported file type. Upload a .csv or .xlsx file'}), 400
+
+        try:
+            chunk_size = int(request.args.get('chunk_size', DEFAULT_CHUNK_SIZE))
+        except ValueError:
+            return jsonify({'error': 'chunk_size must be an integer'}), 400
+        dry_run = request.args.get('dry_run', 'false').lower() in ['true', '1', 'yes']
+
+        current_user = get_jwt_identity()
+        user_id = current_user.get('id') if isinstance(current_user, dict) else current_user
+
+        report = import_items(
+            rows,
+            user_id=int(user_id) if user_id else None,
+            chunk_size=max(1, min(chunk_size, 5000)),
+            dry_run=dry_run
+        )
+
+        # One consolidated audit entry instead of one per item
+        if not dry_run:
+            log_activity(
+                action="Import",
+                details=f"Imported {report['imported']} of {report['total_rows']} items from {upload.filename} ({report['failed']} failed)"
+            )
+
+        return jsonify(report), 200
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return jsonify({'error': 'CSV file must be UTF-8 encoded'}), 400
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error importing items: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 # Include other essential routes but remove pandas/reportlab dependencies
 @bp.route('/statistics', methods=['GET'])
 @jwt_required()
 @role_required(['admin'])
+@conditional_collection('users', 'roles', 'item_number', 'receiving_data')
 def get_statistics():
     try:
         # Count users by role
@@ -284,13 +349,58 @@ def get_statistics():
                 'pandas_available': PANDAS_AVAILABLE,
                 'reportlab_available': REPORTLAB_AVAILABLE
             },
-            'timestamp': datetime.now().isoformat()
+            # When the counted data last changed (= Last-Modified), so a
+            # revalidated copy of this body never goes stale
+            'timestamp': (g.get('collection_last_modified') or datetime.utcnow()).isoformat()
         }
         
         return jsonify(statistics), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _audit_log_order(entry):
+    # Newest first by timestamp; entries with equal timestamps keep file order
+    return entry.get('timestamp', '')
+
+
+def _read_sorted_audit_logs(log_file):
+    try:
+        logs = json.load(log_file)
+        if not isinstance(logs, list):
+            logs = []
+    except json.JSONDecodeError:
+        logs = []
+    
+    # Sort logs by timestamp (newest first)
+    logs.sort(key=_audit_log_order, reverse=True)
+    return logs
+
+def _load_sorted_audit_logs(logs_path):
+    with open(logs_path, 'rb') as log_file:
+        return jsonify(_read_sorted_audit_logs(log_file)), 200
+
+def _stream_audit_logs(logs_path):
+    """
+    ?stream=1 variant: element offsets and timestamps are indexed up front,
+    then entries are decoded one at a time in the same order as the
+    timestamp sort above. The body generator opens the file itself, so a
+    response that is never iterated (HEAD, early disconnect) holds no handle.
+    """
+    def entries():
+        with open(logs_path, 'rb') as log_file:
+            try:
+                offsets = json_array_offsets(log_file, key=_audit_log_order)
+            except ValueError:
+                # Not a well-formed ASCII array; the regular loader copes with that
+                log_file.seek(0)
+                yield from _read_sorted_audit_logs(log_file)
+                return
+            keys = offsets[2]
+            positions = sorted(range(len(keys)), key=keys.__getitem__, reverse=True)
+            yield from iter_json_array(log_file, offsets, positions)
+
+    return stream_json_array(entries())
+
 # Add other critical routes without pandas dependencies...
 @bp.route('/audit-logs', methods=['GET'])
 @jwt_required()
@@ -299,21 +409,22 @@ def get_audit_logs():
     try:
         logs_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs', 'audit.json')
         
-        if not os.path.exists(logs_path):
+        try:
+            # The log file's own mtime/size are the validators, checked before parsing it.
+            # log_activity swaps in each new version with os.replace, so a body read just
+            # after a write is newer than its ETag and the next request simply refetches
+            stat = os.stat(logs_path)
+        except FileNotFoundError:
             return jsonify([]), 200
-        
-        with open(logs_path, 'r') as f:
-            try:
-                logs = json.load(f)
-                if not isinstance(logs, list):
-                    logs = []
-            except json.JSONDecodeError:
-                logs = []
-        
-        # Sort logs by timestamp (newest first)
-        logs.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-        
-        return jsonify(logs), 200
+
+        streaming = is_stream_request(request.args)
+        return conditional_response(
+            f'audit-{stat.st_mtime_ns}-{stat.st_size}',
+            datetime.utcfromtimestamp(stat.st_mtime),
+            lambda: _stream_audit_logs(logs_path) if streaming else _load_sorted_audit_logs(logs_path)
+        )
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
     
@@ -322,6 +433,7 @@ def get_audit_logs():
 @bp.route('/users/pending', methods=['GET'])
 @jwt_required()
 @role_required(['admin'])
+@conditional_collection('users', 'roles')
 def get_pending_users():
     try:
         print("🔍 Fetching pending users...")
@@ -1,10 +1,39 @@
 # backend/routes/form.py - Complete file with all endpoints
-from flask import Blueprint, request, jsonify, send_file, render_template
-from flask_jwt_extended import jwt_required # type: ignore
+from flask import Blueprint, Response, current_app, request, jsonify, send_file, render_template, stream_with_context, url_for
+from flask_jwt_extended import get_jwt_identity, jwt_required # type: ignore
 from ..models import ItemNumber, ReceivingData
-from ..utils.html_to_pdf_handler import HTMLToPDFHandler
+from ..utils.audit_logger import log_activity
+from ..utils.role_checker import role_required
+from ..utils.html_to_pdf_handler import PDF_ENGINES, get_pdf_handler
+from ..utils.reportlab_forms import REPORTLAB_AVAILABLE
+from ..utils.generated_sweeper import ensure_generated_sweeper
+from ..utils.pdf_renderer import RendererBusy
+from ..utils.pdf_metrics import StageTimer
+from ..utils.pdf_limiter import (
+    PdfQueueFull, ensure_batch_limiter, ensure_pdf_limiter, pdf_slot_required, queue_full_response
+)
+from ..utils.conditional import conditional_response, row_etag
+from ..utils.form_schemas import FORM_SCHEMAS
+from ..utils.form_data import (
+    FORM_TYPES, PREFILL_BUILDERS, assemble_form_data, assemble_packet_data, load_receiving_with_item,
+    missing_required_fields
+)
+from sqlalchemy.orm import joinedload # type: ignore
+from werkzeug.wsgi import ClosingIterator
+from ..utils.pdf_jobs import enqueue_job, ensure_job_workers, get_user_job, serialize_job
+from ..utils.pdf_batch import (
+    BATCH_FORMATS, DEFAULT_BATCH_MAX_DOCUMENTS, PDFRW_AVAILABLE, batch_workers, build_documents, merge_pdfs,
+    render_documents, stream_zip
+)
+from ..utils.batch_ops import BatchRequestError, batch_condition
+from .receiving import RECEIVING_FILTERS
+from ..utils.pagination import parse_bool_arg
 from datetime import datetime
+import hashlib
+import io
+import json
 import os
+import time
 import traceback
 import platform
 import subprocess
@@ -16,7 +45,15 @@ def handle_pdf_generation_error(error, form_type):
     """Centralized error handling for PDF generation"""
     error_msg = str(error)
     
-    if "wkhtmltopdf" in error_msg.lower():
+    if isinstance(error, RendererBusy):
+        response = jsonify({
+            'error': 'PDF generation service busy',
+            'details': error_msg,
+            'solution': 'Please try again in a few seconds'
+        })
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    elif "wkhtmltopdf" in error_msg.lower():
         return jsonify({
             'error': 'PDF generation service unavailable',
             'details': 'wkhtmltopdf is not properly configured on the server',
@@ -41,6 +78,45 @@ def handle_pdf_generation_error(error, form_type):
             'solution': 'Please try again or contact support'
         }), 500
 
+def _pdf_source(output):
+    """send_file argument for a generate_*_pdf result: the in-memory buffer, or the stored file if it still exists"""
+    if isinstance(output, io.BytesIO):
+        return output
+    return str(output) if output and output.exists() else None
+
+def _pdf_etag(source):
+    """Content hash of a PDF send_file source (buffer or file path) for ETag / If-Range"""
+    hasher = hashlib.sha256()
+    if isinstance(source, io.BytesIO):
+        hasher.update(source.getbuffer())
+    else:
+        with open(source, 'rb') as handle:
+            for chunk in iter(lambda: handle.read(1024 * 1024), b''):
+                hasher.update(chunk)
+    return hasher.hexdigest()
+
+def _send_pdf(source, download_name, metrics=None, timer=None):
+    """
+    send_file for a generated PDF, with a content ETag. With `metrics`, the
+    body going out counts as the 'send' stage of `timer`, and the request is
+    recorded once the server closes it.
+    """
+    started = time.perf_counter()
+    response = send_file(
+        source, as_attachment=True, download_name=download_name, mimetype='application/pdf',
+        conditional=True, etag=_pdf_etag(source)
+    )
+    if metrics is None:
+        return response
+
+    def finish():
+        timer.stages['send'] = time.perf_counter() - started
+        metrics.record(timer)
+
+    # send_file sets direct_passthrough, which bypasses call_on_close callbacks
+    response.response = ClosingIterator(response.response, finish)
+    return response
+
 # =============================================================================
 # DIAGNOSTIC AND TEST ENDPOINTS
 # =============================================================================
@@ -182,16 +258,11 @@ def test_pdf_generation():
         }
         
         # Try to generate PDF
-        pdf_handler = HTMLToPDFHandler()
-        output_path = pdf_handler.generate_501a_pdf(test_data)
-        
-        if output_path and output_path.exists():
-            return send_file(
-                str(output_path),
-                as_attachment=True,
-                download_name="test_501A.pdf",
-                mimetype='application/pdf'
-            )
+        pdf_handler = get_pdf_handler()
+        source = _pdf_source(pdf_handler.generate_501a_pdf(test_data))
+        
+        if source:
+            return _send_pdf(source, "test_501A.pdf")
         else:
             return jsonify({
                 'error': 'PDF file not created',
@@ -216,7 +287,7 @@ def test_pdf_generation():
 def test_501a_template():
     """Test if 501A template renders correctly"""
     try:
-        template_data = {
+        template_data = FORM_SCHEMAS['501A'].context({
             'receiving_no': 'TEST001',
             'item_no': 'ITEM001',
             'item_description': 'Test Item Description',
@@ -226,11 +297,7 @@ def test_501a_template():
             'storage_conditions': 'Room Temperature',
             'total_units_received': '100',
             'controlled_substance': 'No',
-            'locationStatus': {
-                'quarantine': 'checked',
-                'rejected': '',
-                'released': ''
-            },
+            'locationStatus': {'quarantine': True},
             'dateType': 'Received Date',
             'dateValue': '12/25/2024',
             'completedBy': 'Test User',
@@ -246,7 +313,7 @@ def test_501a_template():
                 }
             ],
             'comments': 'Test comments'
-        }
+        })
         
         rendered_html = render_template('501A.html', **template_data)
         return rendered_html, 200, {'Content-Type': 'text/html'}
@@ -262,54 +329,37 @@ def test_501a_template():
 def test_520b_template():
     """Test if 520B template renders correctly"""
     try:
-        template_data = {
-            'item_no': 'TEST001',
-            'tracking_no': 'TRACK001',
-            'client_name': 'Test Client',
-            'item_description': 'Test Item Description',
-            'receiving_no': 'RN001',
-            'lot_no': 'LOT001',
-            'vendor': 'Test Vendor',
-            'storage_conditions_temp': 'Room Temperature',
-            'storage_conditions_other': 'Dry Storage',
-            'po_no': 'PO001',
-            'protocol_no': 'PROT001',
-            'uom': 'Boxes',
-            'total_units': '100',
-            'total_containers': '10',
-            'deliveryAcceptance': [
-                {'name': 'Item numbers match shipping documentation', 'checked': 'checked'},
-                {'name': 'Lot numbers match shipping documentation', 'checked': ''},
-                {'name': 'Quantity matches shipping documentation', 'checked': 'checked'},
-                {'name': 'Shipping container is intact', 'checked': 'checked'},
-                {'name': 'Product container(s) is/are intact', 'checked': ''},
-                {'name': 'Temperature recording device included', 'checked': 'checked'},
-                {'name': 'Temperature has been maintained', 'checked': 'checked'}
-            ],
-            # Add the missing deliveryAcceptanceNA data
-            'deliveryAcceptanceNA': {
-                'material_placed': True,
-                'temperature_maintained': False,
-                'device_included': True
+        template_data = FORM_SCHEMAS['520B'].context({
+            'Item No': 'TEST001',
+            'Tracking No': 'TRACK001',
+            'Client Name': 'Test Client',
+            'Item Description': 'Test Item Description',
+            'RN': 'RN001',
+            'Lot No': 'LOT001',
+            'Vendor': 'Test Vendor',
+            'Storage Conditions:Temperature': 'Room Temperature',
+            'Other': 'Dry Storage',
+            'PO No': 'PO001',
+            'Protocol No': 'PROT001',
+            'UoM': 'Boxes',
+            'Total Units (vendor count)': '100',
+            'Total Storage Containers': '10',
+            'deliveryAcceptance': {
+                'Item numbers match shipping documentation': True,
+                'Quantity matches shipping documentation': True,
+                'Shipping container is intact': True,
+                'Temperature recording device included': True,
+                'Temperature has been maintained': True
             },
-            'documentVerification': [
-                {'name': 'COA #', 'checked': 'checked'},
-                {'name': 'SDS #', 'checked': ''},
-                {'name': 'Invoice', 'checked': 'checked'},
-                {'name': 'Other (Specify)', 'checked': ''}
-            ],
-            'issuesSection': [
-                {'name': 'Quantity discrepancies found', 'checked': ''},
-                {'name': 'Damage to shipping container(s)', 'checked': ''},
-                {'name': 'Damage to product within shipping container', 'checked': ''},
-                {'name': 'Temperature excursion', 'checked': 'checked'}
-            ],
-            'ncmr': 'No',
-            'comments': 'Test comments for 520B form',
+            'deliveryAcceptanceNA': {'material_placed': True, 'device_included': True},
+            'documentVerification': {'COA #': True, 'Invoice': True},
+            'issuesSection': {'Temperature excursion': True},
+            'NCMR': 'No',
+            'Comments': 'Test comments for 520B form',
             'dateType': 'Received Date',
             'dateValue': '12/25/2024',
             'receivingCompletedBy': 'Test User'
-        }
+        })
         
         rendered_html = render_template('520B.html', **template_data)
         return rendered_html, 200, {'Content-Type': 'text/html'}
@@ -325,7 +375,7 @@ def test_520b_template():
 def test_519a_template():
     """Test if 519A template renders correctly"""
     try:
-        template_data = {
+        template_data = FORM_SCHEMAS['519A'].context({
             'receiving_no': 'TEST001',
             'item_no': 'ITEM001',
             'item_description': 'Test Item Description',
@@ -346,7 +396,7 @@ def test_519a_template():
                     'verified_by': 'Supervisor'
                 }
             ]
-        }
+        })
         
         rendered_html = render_template('519A.html', **template_data)
         return rendered_html, 200, {'Content-Type': 'text/html'}
@@ -358,15 +408,361 @@ def test_519a_template():
             'traceback': traceback.format_exc()
         }), 500
 
+# =============================================================================
+# FORM PREFILL
+# =============================================================================
+
+@bp.route('/prefill', methods=['GET'])
+@jwt_required()
+def prefill_form():
+    """
+    Everything a form needs from the database for ?receiving_no=, in one
+    query. ?form=501A|519A|520B limits the response to that form; the field
+    names match the /generate-pdf/<form> request body.
+    """
+    try:
+        receiving_no = request.args.get('receiving_no', '').strip()
+        if not receiving_no:
+            return jsonify({'error': 'receiving_no is required'}), 400
+
+        form_type = request.args.get('form', '').upper()
+        if form_type and form_type not in FORM_TYPES:
+            return jsonify({'error': f"Unknown form '{form_type}'. Expected one of: {', '.join(FORM_TYPES)}"}), 400
+
+        receiving = load_receiving_with_item(receiving_no)
+        if not receiving:
+            return jsonify({'error': 'Receiving data not found'}), 404
+        item = receiving.item
+
+        forms = [form_type] if form_type else list(FORM_TYPES)
+        etag = row_etag('receiving', receiving.id, receiving.updated_at)
+        stamps = [receiving.updated_at]
+        if item is not None:
+            etag = f"{etag}.{row_etag('item', item.id, item.updated_at)}"
+            stamps.append(item.updated_at)
+        stamps = [stamp for stamp in stamps if stamp is not None]
+
+        return conditional_response(
+            f"{etag}.{'-'.join(forms)}",
+            max(stamps) if stamps else None,
+            lambda: jsonify({
+                'receiving_no': receiving.receiving_no,
+                'item_number': receiving.item_number,
+                'item_found': item is not None,
+                'forms': {name: PREFILL_BUILDERS[name](receiving, item) for name in forms}
+            })
+        )
+    except Exception as e:
+        print(f"❌ Error in prefill_form: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+# =============================================================================
+# ASYNCHRONOUS PDF JOBS
+# =============================================================================
+
+def _is_assemble_request():
+    raw = request.args.get('assemble')
+    return raw not in (None, '') and parse_bool_arg(raw, 'assemble')
+
+def _requested_engine():
+    """?engine=wkhtmltopdf|reportlab, or None for the configured PDF_ENGINE"""
+    engine = request.args.get('engine', '').strip().lower()
+    if engine and engine not in PDF_ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Expected one of: {', '.join(PDF_ENGINES)}")
+    return engine or None
+
+def _current_user_id():
+    current_user = get_jwt_identity()
+    user_id = current_user.get('id') if isinstance(current_user, dict) else current_user
+    return int(user_id) if user_id else None
+
+@bp.route('/jobs/<form_type>', methods=['POST'])
+@jwt_required()
+def submit_pdf_job(form_type):
+    """
+    Queue a PDF render and return its job id straight away (202). Takes the
+    same body (and ?assemble=1) as /generate-pdf/<form>; poll
+    /jobs/<id> for the status and fetch /jobs/<id>/file once it is done.
+    Only the user who queued a job (or an admin) can see it.
+    """
+    try:
+        form_type = form_type.upper()
+        if form_type not in FORM_TYPES:
+            return jsonify({'error': f"Unknown form '{form_type}'. Expected one of: {', '.join(FORM_TYPES)}"}), 404
+
+        data = request.get_json(silent=True)
+        if not data:
+            return jsonify({
+                'error': 'No data provided',
+                'details': 'Request body is empty or invalid JSON'
+            }), 400
+
+        try:
+            if _is_assemble_request():
+                data = assemble_form_data(form_type, data)
+        except LookupError as e:
+            return jsonify({'error': 'Receiving data not found', 'details': str(e)}), 404
+        except ValueError as e:
+            return jsonify({'error': 'Invalid request', 'details': str(e)}), 400
+
+        missing_fields = missing_required_fields(form_type, data)
+        if missing_fields:
+            return jsonify({
+                'error': 'Missing required fields',
+                'details': f'Required fields missing: {", ".join(missing_fields)}'
+            }), 400
+
+        ensure_job_workers(current_app._get_current_object())
+        job = enqueue_job(form_type, data, _current_user_id())
+
+        log_activity(
+            action="Queue Form",
+            details=f"Queued {form_type} form for receiving {job.receiving_no or 'unknown'} (job {job.id})"
+        )
+
+        return jsonify({
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': url_for('form.get_pdf_job', job_id=job.id)
+        }), 202
+    except Exception as e:
+        print(f"❌ Error queuing {form_type} PDF job: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_pdf_job(job_id):
+    try:
+        job = get_user_job(job_id, _current_user_id())
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+
+        # Resume the durable queue after a restart
+        if job.status in ('queued', 'running'):
+            ensure_job_workers(current_app._get_current_object())
+
+        result = serialize_job(job)
+        if job.status == 'done':
+            result['download_url'] = url_for('form.download_pdf_job', job_id=job.id)
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/jobs/<int:job_id>/file', methods=['GET'])
+@jwt_required()
+def download_pdf_job(job_id):
+    try:
+        job = get_user_job(job_id, _current_user_id())
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        if job.status != 'done':
+            return jsonify({'error': 'PDF not ready', 'status': job.status}), 409
+        source = job.output_path
+        if source and not os.path.exists(source):
+            # Swept out of generated/ into a day archive
+            archived = ensure_generated_sweeper(current_app).read_archived(Path(source).name, job.finished_at)
+            source = io.BytesIO(archived) if archived is not None else None
+        if not source:
+            return jsonify({'error': 'PDF file no longer available'}), 410
+
+        # Conditional: If-None-Match revalidation and Range requests, so an
+        # interrupted download resumes instead of starting over
+        return send_file(
+            source,
+            as_attachment=True,
+            download_name=f"{job.form_type}_{job.receiving_no or job.id}.pdf",
+            mimetype='application/pdf',
+            conditional=True,
+            etag=_pdf_etag(source)
+        )
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# =============================================================================
+# RECEIVING PACKET
+# =============================================================================
+
+@bp.route('/packet', methods=['POST'])
+@jwt_required()
+@pdf_slot_required
+def generate_packet():
+    """
+    All forms of one receiving as a single multi-section PDF. Body:
+    {"receiving_no": ..., "forms": [...] (default 501A, 519A, 520B),
+     "fields": {"501A": {<manual fields>}, ...}}. The receiving and item are
+    loaded once and the sections rendered by one wkhtmltopdf call.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+
+        forms = [str(form).upper() for form in (data.get('forms') or FORM_TYPES)]
+        unknown = sorted(set(forms) - set(FORM_TYPES))
+        if unknown:
+            return jsonify({'error': f"Unknown form(s): {', '.join(unknown)}"}), 400
+        forms = list(dict.fromkeys(forms))
+
+        fields = data.get('fields') or {}
+        if not isinstance(fields, dict):
+            return jsonify({'error': "'fields' must be an object"}), 400
+
+        try:
+            engine = _requested_engine()
+            forms_data = assemble_packet_data(data.get('receiving_no'), fields, forms)
+        except LookupError as e:
+            return jsonify({'error': 'Receiving data not found', 'details': str(e)}), 404
+        except ValueError as e:
+            return jsonify({'error': 'Invalid request', 'details': str(e)}), 400
+
+        receiving_no = forms_data[forms[0]].get('receiving_no') or forms_data[forms[0]].get('RN')
+        try:
+            output = get_pdf_handler().generate_packet_pdf(forms_data, engine=engine)
+        except Exception as generation_error:
+            print(f"❌ Packet generation failed: {str(generation_error)}")
+            return handle_pdf_generation_error(generation_error, '+'.join(forms))
+
+        log_activity(
+            action="Generate Form",
+            details=f"Generated {'+'.join(forms)} packet for receiving {receiving_no}"
+        )
+
+        return _send_pdf(_pdf_source(output), f"packet_{receiving_no}.pdf")
+    except Exception as e:
+        print(f"❌ Error in packet generation: {str(e)}")
+        print(f"❌ Traceback: {traceback.format_exc()}")
+        return jsonify({'error': str(e)}), 500
+
+# =============================================================================
+# BATCH PDF GENERATION
+# =============================================================================
+
+BATCH_FAILURES_IN_HEADER = 20
+
+@bp.route('/batch', methods=['POST'])
+@jwt_required()
+@role_required(['admin', 'manager'])
+def generate_pdf_batch():
+    """
+    Render forms for many receivings in one request. Body:
+      {"receiving_nos": [...]} and/or {"filter": {...}} (the /api/receiving/get keys),
+      "forms": ["501A", "519A", "520B"] (default all), "format": "zip" | "pdf",
+      "fields": {"501A": {<manual fields applied to every 501A>}, ...}
+    format=zip streams each PDF into the archive as it finishes and ends with
+    manifest.json; format=pdf returns one merged PDF with the batch summary in
+    X-Batch-* headers. A failed document is reported, never fatal. At most
+    PDF_BATCH_CONCURRENCY batches run at once on the host; more get 429.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+
+        forms = [str(form).upper() for form in (data.get('forms') or FORM_TYPES)]
+        unknown = sorted(set(forms) - set(FORM_TYPES))
+        if unknown:
+            return jsonify({'error': f"Unknown form(s): {', '.join(unknown)}"}), 400
+        forms = list(dict.fromkeys(forms))
+
+        try:
+            engine = _requested_engine()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        output_format = str(data.get('format') or 'zip').lower()
+        if output_format not in BATCH_FORMATS:
+            return jsonify({'error': f"format must be one of: {', '.join(BATCH_FORMATS)}"}), 400
+        if output_format == 'pdf' and not PDFRW_AVAILABLE:
+            return jsonify({'error': 'Merged PDF output requires pdfrw'}), 501
+
+        receiving_nos = data.get('receiving_nos') or []
+        fields = data.get('fields') or {}
+        if not isinstance(receiving_nos, list) or not isinstance(fields, dict):
+            return jsonify({'error': "'receiving_nos' must be a list and 'fields' an object"}), 400
+        receiving_nos = list(dict.fromkeys(str(number).strip() for number in receiving_nos if str(number).strip()))
+
+        query = ReceivingData.query.options(joinedload(ReceivingData.item))
+        if receiving_nos:
+            query = query.filter(ReceivingData.receiving_no.in_(receiving_nos))
+        if data.get('filter') or not receiving_nos:
+            try:
+                query = query.filter(batch_condition(ReceivingData, {'filter': data.get('filter')}, RECEIVING_FILTERS))
+            except BatchRequestError as e:
+                return jsonify({'error': 'Invalid batch selection', 'details': str(e)}), 400
+
+        max_documents = current_app.config.get('PDF_BATCH_MAX_DOCUMENTS', DEFAULT_BATCH_MAX_DOCUMENTS)
+        receivings = query.order_by(ReceivingData.display_order, ReceivingData.id).limit(max_documents + 1).all()
+        if receiving_nos:
+            # Keep the order the numbers were given in
+            position = {number: index for index, number in enumerate(receiving_nos)}
+            receivings.sort(key=lambda receiving: position.get(receiving.receiving_no, len(position)))
+
+        documents = build_documents(receivings, receiving_nos, forms, fields)
+        if len(documents) > max_documents:
+            return jsonify({'error': f"Batch too large: at most {max_documents} documents per request"}), 400
+        if not documents:
+            return jsonify({'error': 'No receiving data matched'}), 404
+
+        batch_limiter = ensure_batch_limiter(current_app)
+        try:
+            release_batch_slot = batch_limiter.hold()
+        except PdfQueueFull as e:
+            return queue_full_response(e)
+
+        pdf_handler = get_pdf_handler()
+        started = time.monotonic()
+        workers = batch_workers(pdf_handler, engine, batch_limiter.slots)
+        rendered = render_documents(current_app._get_current_object(), pdf_handler, documents, workers, engine)
+
+        # Logged once rendering is over, with what was actually produced
+        def log_batch(summary):
+            log_activity(
+                action="Generate Form",
+                details=f"Generated batch of {summary['succeeded']} of {summary['documents']} form(s) "
+                        f"({', '.join(forms)}) as {output_format}"
+            )
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if output_format == 'zip':
+            response = Response(
+                stream_with_context(stream_zip(rendered, documents, started, on_complete=log_batch)),
+                mimetype='application/zip'
+            )
+            response.headers['Content-Disposition'] = f'attachment; filename="forms_{timestamp}.zip"'
+            # Held until the server has sent (or given up on) the whole archive
+            response.call_on_close(release_batch_slot)
+            return response
+
+        try:
+            merged, summary = merge_pdfs(rendered, documents, started)
+        finally:
+            release_batch_slot()
+        log_batch(summary)
+        if not summary['succeeded']:
+            return jsonify({
+                'error': 'Every document in the batch failed',
+                'summary': summary,
+                'documents': [document.manifest_entry() for document in documents]
+            }), 502
+        response = _send_pdf(io.BytesIO(merged), f"forms_{timestamp}.pdf")
+        response.headers['X-Batch-Summary'] = json.dumps(summary)
+        # Header-sized preview of the failures; the count is in the summary
+        response.headers['X-Batch-Failures'] = json.dumps([
+            document.manifest_entry() for document in documents if document.error
+        ][:BATCH_FAILURES_IN_HEADER])
+        return response
+    except Exception as e:
+        print(f"❌ Error in batch PDF generation: {str(e)}")
+        print(f"❌ Traceback: {traceback.format_exc()}")
+        return jsonify({'error': str(e)}), 500
+
 # =============================================================================
 # MAIN PDF GENERATION ENDPOINTS
 # =============================================================================
 
 @bp.route('/generate-pdf/501A', methods=['POST'])
 @jwt_required()
+@pdf_slot_required
 def generate_501a():
     try:
         print("🔄 Receiving request for 501A PDF generation")
+        timer = StageTimer('501A', route='generate-pdf')
         
         data = request.get_json()
         if not data:
@@ -376,10 +772,21 @@ def generate_501a():
             }), 400
         
         print("📝 Request data:", data)
+
+        # ?assemble=1: only the receiving number and manual fields are sent;
+        # everything stored in ItemNumber / ReceivingData is loaded here
+        try:
+            engine = _requested_engine()
+            if _is_assemble_request():
+                with timer.stage('assemble'):
+                    data = assemble_form_data('501A', data)
+        except LookupError as e:
+            return jsonify({'error': 'Receiving data not found', 'details': str(e)}), 404
+        except ValueError as e:
+            return jsonify({'error': 'Invalid request', 'details': str(e)}), 400
         
         # Validate required fields
-        required_fields = ['receiving_no', 'item_no']
-        missing_fields = [field for field in required_fields if not data.get(field)]
+        missing_fields = missing_required_fields('501A', data)
         
         if missing_fields:
             return jsonify({
@@ -388,7 +795,7 @@ def generate_501a():
             }), 400
         
         try:
-            pdf_handler = HTMLToPDFHandler()
+            pdf_handler = get_pdf_handler()
         except Exception as handler_error:
             print(f"❌ Failed to initialize PDF handler: {str(handler_error)}")
             return jsonify({
@@ -397,11 +804,12 @@ def generate_501a():
             }), 500
         
         try:
-            output_path = pdf_handler.generate_501a_pdf(data)
-            print(f"✅ PDF generated successfully: {output_path}")
+            output = pdf_handler.generate_501a_pdf(data, engine=engine, timer=timer)
+            print("✅ PDF generated successfully")
         except Exception as generation_error:
             print(f"❌ PDF generation failed: {str(generation_error)}")
             print(f"❌ Traceback: {traceback.format_exc()}")
+            pdf_handler.metrics.record_failure(timer, generation_error)
             return handle_pdf_generation_error(generation_error, "501A")
         
         try:
@@ -413,16 +821,13 @@ def generate_501a():
         except Exception as log_error:
             print(f"⚠️ Logging failed: {str(log_error)}")
         
-        if output_path and output_path.exists():
+        source = _pdf_source(output)
+        if source:
             try:
-                return send_file(
-                    str(output_path),
-                    as_attachment=True,
-                    download_name=f"501A_{data.get('receiving_no', 'unknown')}.pdf",
-                    mimetype='application/pdf'
-                )
+                return _send_pdf(source, f"501A_{data.get('receiving_no', 'unknown')}.pdf", pdf_handler.metrics, timer)
             except Exception as send_error:
                 print(f"❌ Failed to send file: {str(send_error)}")
+                pdf_handler.metrics.record_failure(timer, send_error)
                 return jsonify({
                     'error': 'Failed to send PDF file',
                     'details': str(send_error)
@@ -443,9 +848,11 @@ def generate_501a():
 
 @bp.route('/generate-pdf/520B', methods=['POST'])
 @jwt_required()
+@pdf_slot_required
 def generate_520b():
     try:
         print("🔄 Receiving request for 520B PDF generation")
+        timer = StageTimer('520B', route='generate-pdf')
         
         data = request.get_json()
         if not data:
@@ -455,10 +862,21 @@ def generate_520b():
             }), 400
         
         print("📝 Request data:", data)
+
+        # ?assemble=1: only the receiving number and manual fields are sent;
+        # everything stored in ItemNumber / ReceivingData is loaded here
+        try:
+            engine = _requested_engine()
+            if _is_assemble_request():
+                with timer.stage('assemble'):
+                    data = assemble_form_data('520B', data)
+        except LookupError as e:
+            return jsonify({'error': 'Receiving data not found', 'details': str(e)}), 404
+        except ValueError as e:
+            return jsonify({'error': 'Invalid request', 'details': str(e)}), 400
         
         # Validate required fields for 520B
-        required_fields = ['Item No', 'RN']
-        missing_fields = [field for field in required_fields if not data.get(field)]
+        missing_fields = missing_required_fields('520B', data)
         
         if missing_fields:
             return jsonify({
@@ -467,7 +885,7 @@ def generate_520b():
             }), 400
         
         try:
-            pdf_handler = HTMLToPDFHandler()
+            pdf_handler = get_pdf_handler()
         except Exception as handler_error:
             print(f"❌ Failed to initialize PDF handler: {str(handler_error)}")
             return jsonify({
@@ -476,11 +894,12 @@ def generate_520b():
             }), 500
         
         try:
-            output_path = pdf_handler.generate_520b_pdf(data)
-            print(f"✅ PDF generated successfully: {output_path}")
+            output = pdf_handler.generate_520b_pdf(data, engine=engine, timer=timer)
+            print("✅ PDF generated successfully")
         except Exception as generation_error:
             print(f"❌ PDF generation failed: {str(generation_error)}")
             print(f"❌ Traceback: {traceback.format_exc()}")
+            pdf_handler.metrics.record_failure(timer, generation_error)
             return handle_pdf_generation_error(generation_error, "520B")
         
         try:
@@ -492,16 +911,13 @@ def generate_520b():
         except Exception as log_error:
             print(f"⚠️ Logging failed: {str(log_error)}")
         
-        if output_path and output_path.exists():
+        source = _pdf_source(output)
+        if source:
             try:
-                return send_file(
-                    str(output_path),
-                    as_attachment=True,
-                    download_name=f"520B_{data.get('RN', 'unknown')}.pdf",
-                    mimetype='application/pdf'
-                )
+                return _send_pdf(source, f"520B_{data.get('RN', 'unknown')}.pdf", pdf_handler.metrics, timer)
             except Exception as send_error:
                 print(f"❌ Failed to send file: {str(send_error)}")
+                pdf_handler.metrics.record_failure(timer, send_error)
                 return jsonify({
                     'error': 'Failed to send PDF file',
                     'details': str(send_error)
@@ -522,9 +938,11 @@ def generate_520b():
 
 @bp.route('/generate-pdf/519A', methods=['POST'])
 @jwt_required()
+@pdf_slot_required
 def generate_519a():
     try:
         print("🔄 Receiving request for 519A PDF generation")
+        timer = StageTimer('519A', route='generate-pdf')
         
         data = request.get_json()
         if not data:
@@ -534,10 +952,21 @@ def generate_519a():
             }), 400
         
         print("📝 Request data:", data)
+
+        # ?assemble=1: only the receiving number and manual fields are sent;
+        # everything stored in ItemNumber / ReceivingData is loaded here
+        try:
+            engine = _requested_engine()
+            if _is_assemble_request():
+                with timer.stage('assemble'):
+                    data = assemble_form_data('519A', data)
+        except LookupError as e:
+            return jsonify({'error': 'Receiving data not found', 'details': str(e)}), 404
+        except ValueError as e:
+            return jsonify({'error': 'Invalid request', 'details': str(e)}), 400
         
         # Validate required fields for 519A
-        required_fields = ['receiving_no', 'item_no']
-        missing_fields = [field for field in required_fields if not data.get(field)]
+        missing_fields = missing_required_fields('519A', data)
         
         if missing_fields:
             return jsonify({
@@ -546,7 +975,7 @@ def generate_519a():
             }), 400
         
         try:
-            pdf_handler = HTMLToPDFHandler()
+            pdf_handler = get_pdf_handler()
         except Exception as handler_error:
             print(f"❌ Failed to initialize PDF handler: {str(handler_error)}")
             return jsonify({
@@ -555,11 +984,12 @@ def generate_519a():
             }), 500
         
         try:
-            output_path = pdf_handler.generate_519a_pdf(data)
-            print(f"✅ PDF generated successfully: {output_path}")
+            output = pdf_handler.generate_519a_pdf(data, engine=engine, timer=timer)
+            print("✅ PDF generated successfully")
         except Exception as generation_error:
             print(f"❌ PDF generation failed: {str(generation_error)}")
             print(f"❌ Traceback: {traceback.format_exc()}")
+            pdf_handler.metrics.record_failure(timer, generation_error)
             return handle_pdf_generation_error(generation_error, "519A")
         
         try:
@@ -571,16 +1001,13 @@ def generate_519a():
         except Exception as log_error:
             print(f"⚠️ Logging failed: {str(log_error)}")
         
-        if output_path and output_path.exists():
+        source = _pdf_source(output)
+        if source:
             try:
-                return send_file(
-                    str(output_path),
-                    as_attachment=True,
-                    download_name=f"519A_{data.get('receiving_no', 'unknown')}.pdf",
-                    mimetype='application/pdf'
-                )
+                return _send_pdf(source, f"519A_{data.get('receiving_no', 'unknown')}.pdf", pdf_handler.metrics, timer)
             except Exception as send_error:
                 print(f"❌ Failed to send file: {str(send_error)}")
+                pdf_handler.metrics.record_failure(timer, send_error)
                 return jsonify({
                     'error': 'Failed to send PDF file',
                     'details': str(send_error)
@@ -622,15 +1049,7 @@ def debug_501a_pdf():
         try:
             print("🎨 Debug: Testing template rendering...")
             
-            template_data = {
-                'receiving_no': data.get('receiving_no', 'TEST'),
-                'item_no': data.get('item_no', 'TEST'),
-                'item_description': data.get('item_description', 'TEST'),
-                'client_name': data.get('client_name', 'TEST'),
-                'locationStatus': {'quarantine': '', 'rejected': '', 'released': ''},
-                'transactions': [],
-                'comments': 'Test'
-            }
+            template_data = FORM_SCHEMAS['501A'].context(data)
             
             rendered_html = render_template('501A.html', **template_data)
             print(f"✅ Debug: Template rendered successfully ({len(rendered_html)} chars)")
@@ -703,7 +1122,7 @@ def debug_501a_pdf():
 def pdf_health_check():
     """Check if PDF generation service is working"""
     try:
-        pdf_handler = HTMLToPDFHandler()
+        pdf_handler = get_pdf_handler()
         
         # Test basic functionality
         test_data = {
@@ -719,7 +1138,15 @@ def pdf_health_check():
             'templates_dir': str(pdf_handler.template_dir),
             'generated_dir': str(pdf_handler.generated_dir),
             'generated_dir_writable': pdf_handler.generated_dir.exists() and os.access(pdf_handler.generated_dir, os.W_OK),
-            'template_files': []
+            'template_files': [],
+            'renderer_pool': pdf_handler.renderer.stats(),
+            'engine': pdf_handler.engine,
+            'reportlab_available': REPORTLAB_AVAILABLE,
+            'pdf_cache': pdf_handler.cache.stats(),
+            'optimizer': pdf_handler.optimizer.stats(),
+            'concurrency': ensure_pdf_limiter(current_app).stats(),
+            'batch_concurrency': ensure_batch_limiter(current_app).stats(),
+            'generated_files': ensure_generated_sweeper(current_app).stats()
         }
         
         # List available templates
@@ -735,6 +1162,21 @@ def pdf_health_check():
             'status': 'unhealthy'
         }), 500
 
+@bp.route('/pdf-metrics', methods=['GET'])
+def pdf_metrics():
+    """
+    Stage latency histograms and byte counts per form type for this worker
+    process; ?format=prometheus returns the Prometheus text format
+    """
+    try:
+        metrics = get_pdf_handler().metrics
+        if request.args.get('format') == 'prometheus':
+            return Response(metrics.prometheus(), mimetype='text/plain; version=0.0.4')
+        return jsonify(metrics.snapshot()), 200
+    except Exception as e:
+        print(f"❌ Error reading PDF metrics: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @bp.route('/debug-pdf/520B', methods=['POST'])
 def debug_520b_pdf():
     """Debug version of 520B PDF generation"""
@@ -754,17 +1196,7 @@ def debug_520b_pdf():
         try:
             print("🎨 Debug: Testing template rendering...")
             
-            template_data = {
-                'item_no': data.get('Item No', 'TEST'),
-                'tracking_no': data.get('Tracking No', 'TEST'),
-                'client_name': data.get('Client Name', 'TEST'),
-                'receiving_no': data.get('RN', 'TEST'),
-                'deliveryAcceptance': [],
-                'documentVerification': [],
-                'issuesSection': [],
-                'ncmr': 'No',
-                'comments': 'Test'
-            }
+            template_data = FORM_SCHEMAS['520B'].context(data)
             
             rendered_html = render_template('520B.html', **template_data)
             print(f"✅ Debug: Template rendered successfully ({len(rendered_html)} chars)")
@@ -846,13 +1278,7 @@ def debug_519a_pdf():
         try:
             print("🎨 Debug: Testing template rendering...")
             
-            template_data = {
-                'receiving_no': data.get('receiving_no', 'TEST'),
-                'item_no': data.get('item_no', 'TEST'),
-                'item_description': data.get('item_description', 'TEST'),
-                'lot_no': data.get('lot_no', 'TEST'),
-                'drug_movements': []
-            }
+            template_data = FORM_SCHEMAS['519A'].context(data)
             
             rendered_html = render_template('519A.html', **template_data)
             print(f"✅ Debug: Template rendered successfully ({len(rendered_html)} chars)")
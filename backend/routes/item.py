@@ -1,15 +1,46 @@
 # backend/routes/item.py
 from datetime import datetime
+from functools import partial
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import get_jwt_identity, jwt_required # type: ignore
 from ..utils.role_checker import role_required
 from ..utils.audit_logger import log_activity
+from ..utils.conditional import conditional_collection, conditional_response, row_etag
+from ..utils.change_feed import changes_since, record_deletion
+from ..utils.search_index import parse_search_limit, search_catalog
+from ..utils.streaming import is_stream_request, stream_query
+from ..utils.batch_ops import (
+    BATCH_ACTIONS, BatchRequestError, batch_condition, batch_delete, batch_set_obsolete, batch_summary
+)
+from ..utils.pagination import (
+    PaginationError, apply_filters, apply_sort, is_paginated_request,
+    keyset_page, model_fields, parse_fields, parse_page_size, parse_sort,
+    select_fields, serialize_fields
+)
 from ..models import ItemNumber
 from ..extensions import db
 from sqlalchemy import func # type: ignore
+from sqlalchemy.exc import IntegrityError # type: ignore
 
 bp = Blueprint('item', __name__, url_prefix='/api/item')
 
+# Description uniqueness is enforced by the functional unique index
+# uq_item_number_description_ci on lower(trim(description)). Both sides of the
+# comparison go through the same SQL functions so lookups can use that index.
+DESCRIPTION_INDEX = 'uq_item_number_description_ci'
+
+def _description_key(value):
+    return func.lower(func.trim(value))
+
+def _duplicate_item_error(error):
+    """Map a unique-index violation to the 400 message shown in AddDataForm"""
+    message = str(error.orig)
+    if DESCRIPTION_INDEX in message:
+        return 'An item with this description already exists'
+    if 'item_number' in message and ('unique' in message.lower() or 'duplicate' in message.lower()):
+        return 'An item with this item number already exists'
+    return None
+
 # Add a new endpoint to check for duplicate descriptions
 @bp.route('/check-description', methods=['POST'])
 @jwt_required()
@@ -17,14 +48,16 @@ def check_description():
     data = request.get_json()
     description = data.get('description', '').strip()
     
-    # Case-insensitive check for existing description
-    existing_item = ItemNumber.query.filter(
-        func.lower(ItemNumber.description) == func.lower(description)
-    ).first()
+    # Case-insensitive check for existing description (index lookup)
+    exists = db.session.query(
+        db.session.query(ItemNumber.id).filter(
+            _description_key(ItemNumber.description) == _description_key(description)
+        ).exists()
+    ).scalar()
     
     return jsonify({
-        'exists': existing_item is not None,
-        'message': 'Description already exists' if existing_item else None
+        'exists': exists,
+        'message': 'Description already exists' if exists else None
     })
 
 # backend/routes/item.py
@@ -36,21 +69,14 @@ def create_item():
         current_user = get_jwt_identity()
         data = request.get_json()
 
-        existing_item = ItemNumber.query.filter(
-            func.lower(ItemNumber.description) == func.lower(data['description'].strip())
-        ).first()
-        
-        if existing_item:
-            return jsonify({
-                'error': 'An item with this description already exists'
-            }), 400
-
         new_item = ItemNumber(
             **data,
             created_by=current_user['id'],
             updated_by=current_user['id']
         )
         
+        # A single INSERT - the unique indexes reject duplicates atomically,
+        # so concurrent creates cannot both pass a separate pre-check
         db.session.add(new_item)
         db.session.commit()
 
@@ -61,39 +87,99 @@ def create_item():
         )
 
         return jsonify({'message': 'Item created successfully'}), 201
+    except IntegrityError as e:
+        db.session.rollback()
+        duplicate_message = _duplicate_item_error(e)
+        if duplicate_message:
+            return jsonify({'error': duplicate_message}), 400
+        return jsonify({'error': str(e)}), 500
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 # backend/routes/item.py
+ITEM_FILTERS = {
+    'client': ItemNumber.client,
+    'protocol_number': ItemNumber.protocol_number,
+    'vendor': ItemNumber.vendor,
+    'is_obsolete': ItemNumber.is_obsolete,
+    'study_type': ItemNumber.study_type
+}
+
+# Columns selectable with ?fields=; the same set _serialize_item emits
+ITEM_FIELDS = model_fields(ItemNumber, exclude=('created_by', 'created_at', 'updated_at', 'updated_by', 'is_active'))
+
+# Every sort key is backed by a (column, id) index for keyset paging
+ITEM_SORTS = {
+    'display_order': ItemNumber.display_order,
+    'item_number': ItemNumber.item_number,
+    'updated_at': ItemNumber.updated_at
+}
+
+def _serialize_item(item):
+    return {
+        'id': item.id,
+        'item_number': item.item_number,
+        'description': item.description,
+        'client': item.client,
+        'protocol_number': item.protocol_number,
+        'vendor': item.vendor,
+        'uom': item.uom,
+        'controlled': item.controlled,
+        'temp_storage_conditions': item.temp_storage_conditions,
+        'other_storage_conditions': item.other_storage_conditions,
+        'max_exposure_time': item.max_exposure_time,
+        'temper_time': item.temper_time,
+        'working_exposure_time': item.working_exposure_time,
+        'vendor_code_rev': item.vendor_code_rev,
+        'randomized': item.randomized,
+        'sequential_numbers': item.sequential_numbers,
+        'study_type': item.study_type,
+        'is_obsolete': item.is_obsolete,
+        'display_order': item.display_order
+    }
+
 @bp.route('/get', methods=['GET'])
 @jwt_required()
+@conditional_collection('item_number')
 def get_items():
+    """
+    List items. Supports ?client=&protocol_number=&vendor=&is_obsolete=&study_type=
+    filters and ?sort=[-]display_order|item_number|updated_at. Passing ?limit= or
+    ?cursor= switches to keyset pagination and returns a page envelope.
+    """
     try:
-        
-        items = ItemNumber.query.order_by(ItemNumber.display_order).all()
-        return jsonify([{
-            'id': item.id,
-            'item_number': item.item_number,
-            'description': item.description,
-            'client': item.client,
-            'protocol_number': item.protocol_number,
-            'vendor': item.vendor,
-            'uom': item.uom,
-            'controlled': item.controlled,
-            'temp_storage_conditions': item.temp_storage_conditions,
-            'other_storage_conditions': item.other_storage_conditions,
-            'max_exposure_time': item.max_exposure_time,
-            'temper_time': item.temper_time,
-            'working_exposure_time': item.working_exposure_time,
-            'vendor_code_rev': item.vendor_code_rev,
-            'randomized': item.randomized,
-            'sequential_numbers': item.sequential_numbers,
-            'study_type': item.study_type,
-            'is_obsolete': item.is_obsolete,
-            'display_order': item.display_order
-        } for item in items]), 200
-            
+        sort_name, sort_column, descending = parse_sort(
+            request.args.get('sort'), ITEM_SORTS, 'display_order'
+        )
+        fields = parse_fields(request.args.get('fields'), ITEM_FIELDS)
+        query = apply_filters(ItemNumber.query, request.args, ITEM_FILTERS)
+
+        serialize = _serialize_item
+        if fields is not None:
+            query = select_fields(query, fields, ITEM_FIELDS, ItemNumber.id, sort_column)
+            serialize = partial(serialize_fields, fields)
+
+        if not is_paginated_request(request.args):
+            query = apply_sort(query, sort_column, ItemNumber.id, descending)
+            if is_stream_request(request.args):
+                return stream_query(query, serialize)
+            return jsonify([serialize(item) for item in query.all()]), 200
+
+        limit = parse_page_size(request.args.get('limit'))
+        items, next_cursor = keyset_page(
+            query, sort_name, sort_column, ItemNumber.id, descending,
+            request.args.get('cursor'), limit
+        )
+        return jsonify({
+            'items': [serialize(item) for item in items],
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None,
+            'limit': limit
+        }), 200
+
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error in get_items: {str(e)}")
         print(f"Exception type: {type(e)}")
@@ -101,6 +187,25 @@ def get_items():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/changes', methods=['GET'])
+@jwt_required()
+def get_item_changes():
+    """
+    Delta-sync feed: items updated and tombstones for items deleted after
+    ?since=<watermark>. Omit since to bootstrap; keep calling with the returned
+    watermark while has_more is true.
+    """
+    try:
+        return jsonify(changes_since(
+            ItemNumber, 'item_number', _serialize_item,
+            request.args.get('since'), request.args.get('limit')
+        )), 200
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error in get_item_changes: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @bp.route('/update/<int:id>', methods=['PUT'])
 @jwt_required()
 @role_required(['admin'])
@@ -129,6 +234,12 @@ def update_item(id):
         )
 
         return jsonify({'message': 'Item updated successfully'}), 200
+    except IntegrityError as e:
+        db.session.rollback()
+        duplicate_message = _duplicate_item_error(e)
+        if duplicate_message:
+            return jsonify({'error': duplicate_message}), 400
+        return jsonify({'error': str(e)}), 500
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -138,6 +249,7 @@ def update_item(id):
 @role_required(['admin'])
 def delete_item(id):
     item = ItemNumber.query.get_or_404(id)
+    record_deletion(item, item.item_number)
     db.session.delete(item)
     db.session.commit()
 
@@ -150,14 +262,58 @@ def delete_item(id):
 
     return jsonify({'message': 'Item deleted successfully'}), 200
 
+def _serialize_item_number(item):
+    return {
+        'item_number': item.item_number,
+        'description': item.description,
+        'is_obsolete': item.is_obsolete
+    }
+
 @bp.route('/numbers', methods=['GET'])
+@conditional_collection('item_number')
 def get_item_numbers():
-    items = ItemNumber.query.all()
-    return jsonify([{
+    try:
+        query = ItemNumber.query.with_entities(ItemNumber.item_number, ItemNumber.description, ItemNumber.is_obsolete)
+        if is_stream_request(request.args):
+            return stream_query(query, _serialize_item_number)
+        return jsonify([_serialize_item_number(item) for item in query.all()])
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+
+def _serialize_item_detail(item):
+    return {
+        'id': item.id,
         'item_number': item.item_number,
         'description': item.description,
-        'is_obsolete': item.is_obsolete
-    } for item in items])
+        'client': item.client,
+        'protocol_number': item.protocol_number,
+        'vendor': item.vendor,
+        'uom': item.uom,
+        'controlled': item.controlled,
+        'temp_storage_conditions': item.temp_storage_conditions,
+        'other_storage_conditions': item.other_storage_conditions,
+        'max_exposure_time': item.max_exposure_time,  # Added
+        'temper_time': item.temper_time,             # Added
+        'working_exposure_time': item.working_exposure_time  # Added
+    }
+
+@bp.route('/search', methods=['GET'])
+@jwt_required()
+def search_items():
+    """
+    Typeahead: top ?limit= items whose number starts with ?q=, then, for
+    3+ characters, whose number or description contains it
+    """
+    try:
+        results = search_catalog(
+            ItemNumber, ItemNumber.item_number, ItemNumber.description,
+            [ItemNumber.item_number, ItemNumber.description, ItemNumber.is_obsolete],
+            request.args.get('q'), parse_search_limit(request.args.get('limit'))
+        )
+        return jsonify(results), 200
+    except Exception as e:
+        print(f"Error in search_items: {str(e)}")
+        return jsonify({'error': str(e)}), 500
 
 @bp.route('/get/<item_number>', methods=['GET'])
 @jwt_required()
@@ -166,22 +322,12 @@ def get_item_detail(item_number):
         item = ItemNumber.query.filter_by(item_number=item_number).first()
         if not item:
             return jsonify({'error': 'Item not found'}), 404
-            
-        return jsonify({
-            'id': item.id,
-            'item_number': item.item_number,
-            'description': item.description,
-            'client': item.client,
-            'protocol_number': item.protocol_number,
-            'vendor': item.vendor,
-            'uom': item.uom,
-            'controlled': item.controlled,
-            'temp_storage_conditions': item.temp_storage_conditions,
-            'other_storage_conditions': item.other_storage_conditions,
-            'max_exposure_time': item.max_exposure_time,  # Added
-            'temper_time': item.temper_time,             # Added
-            'working_exposure_time': item.working_exposure_time  # Added
-        })
+
+        return conditional_response(
+            row_etag('item', item.id, item.updated_at),
+            item.updated_at,
+            lambda: jsonify(_serialize_item_detail(item))
+        )
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -207,4 +353,55 @@ def toggle_item_obsolete(id):
         })
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+# Batch variants of toggle-obsolete / delete. The body selects rows with
+# {"ids": [...]} and/or {"filter": {...}} (same keys as ITEM_FILTERS) and the
+# change is applied as one set-based statement.
+def _batch_items(action):
+    data = request.get_json(silent=True) or {}
+    try:
+        condition = batch_condition(ItemNumber, data, ITEM_FILTERS)
+        if action == 'delete':
+            rows = batch_delete(ItemNumber, ItemNumber.item_number, condition)
+        else:
+            rows = batch_set_obsolete(ItemNumber, ItemNumber.item_number, condition, action == 'obsolete')
+        db.session.commit()
+    except BatchRequestError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'One or more items are still referenced by receiving records'}), 409
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error in batch {action} items: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+    audit_action, verb = BATCH_ACTIONS[action]
+    if rows:
+        log_activity(action=audit_action, details=batch_summary(verb, 'items', rows, data))
+
+    return jsonify({
+        'message': f"{verb} {len(rows)} items",
+        'count': len(rows),
+        'ids': [row_id for row_id, _ in rows],
+        'item_numbers': [item_number for _, item_number in rows]
+    }), 200
+
+@bp.route('/batch/obsolete', methods=['POST'])
+@jwt_required()
+@role_required(['admin'])
+def batch_obsolete_items():
+    return _batch_items('obsolete')
+
+@bp.route('/batch/activate', methods=['POST'])
+@jwt_required()
+@role_required(['admin'])
+def batch_activate_items():
+    return _batch_items('activate')
+
+@bp.route('/batch/delete', methods=['POST'])
+@jwt_required()
+@role_required(['admin'])
+def batch_delete_items():
+    return _batch_items('delete')
@@ -1,10 +1,24 @@
 # backend/routes/receiving.py
 from datetime import datetime
+from functools import partial
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import get_jwt_identity, jwt_required # type: ignore
 from ..models import ReceivingData, ItemNumber
 from ..extensions import db
 from ..utils.role_checker import role_required
+from ..utils.conditional import conditional_collection, conditional_response, row_etag
+from ..utils.change_feed import changes_since
+from ..utils.search_index import parse_search_limit, search_catalog
+from ..utils.streaming import is_stream_request, stream_query
+from ..utils.audit_logger import log_activity
+from ..utils.batch_ops import (
+    BATCH_ACTIONS, BatchRequestError, batch_condition, batch_delete, batch_set_obsolete, batch_summary
+)
+from ..utils.pagination import (
+    PaginationError, apply_filters, apply_range_filters, apply_sort,
+    is_paginated_request, keyset_page, model_fields, parse_fields, parse_page_size,
+    parse_sort, select_fields, serialize_fields
+)
 
 bp = Blueprint('receiving', __name__, url_prefix='/api/receiving')
 
@@ -31,44 +45,147 @@ def create_receiving():
         print(f"Error creating receiving data: {str(e)}")  # Debug print
         return jsonify({'error': str(e)}), 500
 
+RECEIVING_FILTERS = {
+    'item_number': ReceivingData.item_number,
+    'lot_no': ReceivingData.lot_no,
+    'po_no': ReceivingData.po_no,
+    'is_obsolete': ReceivingData.is_obsolete
+}
+
+# Queried as ?exp_date_from=&exp_date_to= and ?created_at_from=&created_at_to=
+RECEIVING_RANGES = {
+    'exp_date': ReceivingData.exp_date,
+    'created_at': ReceivingData.created_at
+}
+
+# Columns selectable with ?fields=; the same set _serialize_receiving emits
+RECEIVING_FIELDS = model_fields(ReceivingData, exclude=('created_by', 'created_at', 'updated_at', 'updated_by', 'is_active'))
+
+# Every sort key is backed by a (column, id) index for keyset paging
+RECEIVING_SORTS = {
+    'display_order': ReceivingData.display_order,
+    'receiving_no': ReceivingData.receiving_no,
+    'created_at': ReceivingData.created_at,
+    'exp_date': ReceivingData.exp_date,
+    'updated_at': ReceivingData.updated_at
+}
+
+def _serialize_receiving(rd):
+    return {
+        'id': rd.id,
+        'item_number': rd.item_number,
+        'receiving_no': rd.receiving_no,
+        'tracking_number': rd.tracking_number,
+        'lot_no': rd.lot_no,
+        'po_no': rd.po_no,
+        'total_units_vendor': rd.total_units_vendor,
+        'total_storage_containers': rd.total_storage_containers,
+        'exp_date': rd.exp_date,
+        'ncmr': rd.ncmr,
+        'total_units_received': rd.total_units_received,
+        'temp_device_in_alarm': rd.temp_device_in_alarm,
+        'ncmr2': rd.ncmr2,
+        'temp_device_deactivated': rd.temp_device_deactivated,
+        'temp_device_returned_to_courier': rd.temp_device_returned_to_courier,
+        'comments_for_520b': rd.comments_for_520b,
+        'is_obsolete': rd.is_obsolete,
+        'display_order': rd.display_order
+    }
+
 @bp.route('/get', methods=['GET'])
 @jwt_required()
+@conditional_collection('receiving_data')
 def get_receiving():
+    """
+    List receiving records. Supports ?item_number=&lot_no=&po_no=&is_obsolete=
+    filters, exp_date / created_at ranges and
+    ?sort=[-]display_order|receiving_no|created_at|exp_date|updated_at.
+    Passing ?limit= or ?cursor= switches to keyset pagination; ?fields=a,b
+    selects (and serializes) only those columns plus id. Without pagination,
+    ?stream=1 writes the array incrementally from a server-side cursor.
+    """
     try:
-        receiving_data = ReceivingData.query.order_by(ReceivingData.display_order).all()
-        
-        return jsonify([{
-            'id': rd.id,
-            'item_number': rd.item_number,
-            'receiving_no': rd.receiving_no,
-            'tracking_number': rd.tracking_number,
-            'lot_no': rd.lot_no,
-            'po_no': rd.po_no,
-            'total_units_vendor': rd.total_units_vendor,
-            'total_storage_containers': rd.total_storage_containers,
-            'exp_date': rd.exp_date,
-            'ncmr': rd.ncmr,
-            'total_units_received': rd.total_units_received,
-            'temp_device_in_alarm': rd.temp_device_in_alarm,
-            'ncmr2': rd.ncmr2,
-            'temp_device_deactivated': rd.temp_device_deactivated,
-            'temp_device_returned_to_courier': rd.temp_device_returned_to_courier,
-            'comments_for_520b': rd.comments_for_520b,
-            'is_obsolete': rd.is_obsolete,
-            'display_order': rd.display_order
-        } for rd in receiving_data]), 200
-            
+        sort_name, sort_column, descending = parse_sort(
+            request.args.get('sort'), RECEIVING_SORTS, 'display_order'
+        )
+        fields = parse_fields(request.args.get('fields'), RECEIVING_FIELDS)
+        query = apply_filters(ReceivingData.query, request.args, RECEIVING_FILTERS)
+        query = apply_range_filters(query, request.args, RECEIVING_RANGES)
+
+        serialize = _serialize_receiving
+        if fields is not None:
+            query = select_fields(query, fields, RECEIVING_FIELDS, ReceivingData.id, sort_column)
+            serialize = partial(serialize_fields, fields)
+
+        if not is_paginated_request(request.args):
+            query = apply_sort(query, sort_column, ReceivingData.id, descending)
+            if is_stream_request(request.args):
+                return stream_query(query, serialize)
+            return jsonify([serialize(rd) for rd in query.all()]), 200
+
+        limit = parse_page_size(request.args.get('limit'))
+        receiving_data, next_cursor = keyset_page(
+            query, sort_name, sort_column, ReceivingData.id, descending,
+            request.args.get('cursor'), limit
+        )
+        return jsonify({
+            'items': [serialize(rd) for rd in receiving_data],
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None,
+            'limit': limit
+        }), 200
+
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error in get_receiving: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/changes', methods=['GET'])
+@jwt_required()
+def get_receiving_changes():
+    """
+    Delta-sync feed: receiving records updated or deleted after
+    ?since=<watermark>. Omit since to bootstrap; keep calling with the
+    returned watermark while has_more is true.
+    """
+    try:
+        return jsonify(changes_since(
+            ReceivingData, 'receiving_no', _serialize_receiving,
+            request.args.get('since'), request.args.get('limit')
+        )), 200
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error in get_receiving_changes: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @bp.route('/numbers', methods=['GET'])
+@conditional_collection('receiving_data')
 def get_receiving_numbers():
     receiving_data = ReceivingData.query.all()
     return jsonify([{
         'receiving_no': data.receiving_no
     } for data in receiving_data])
 
+@bp.route('/search', methods=['GET'])
+@jwt_required()
+def search_receiving():
+    """
+    Typeahead: top ?limit= receivings whose receiving number starts with
+    ?q=, then, for 3+ characters, whose receiving or item number contains it
+    """
+    try:
+        results = search_catalog(
+            ReceivingData, ReceivingData.receiving_no, ReceivingData.item_number,
+            [ReceivingData.receiving_no, ReceivingData.item_number, ReceivingData.is_obsolete],
+            request.args.get('q'), parse_search_limit(request.args.get('limit'))
+        )
+        return jsonify(results), 200
+    except Exception as e:
+        print(f"Error in search_receiving: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @bp.route('/update/<int:id>', methods=['PUT'])
 @jwt_required()
 @role_required(['admin', 'manager'])
@@ -93,6 +210,20 @@ def update_receiving(id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
     
+def _serialize_receiving_detail(receiving):
+    return {
+        'id': receiving.id,
+        'receiving_no': receiving.receiving_no,
+        'tracking_number': receiving.tracking_number,
+        'lot_no': receiving.lot_no,
+        'po_no': receiving.po_no,
+        'total_units_vendor': receiving.total_units_vendor,
+        'total_storage_containers': receiving.total_storage_containers,
+        'exp_date': receiving.exp_date,
+        'ncmr': receiving.ncmr,
+        'total_units_received': receiving.total_units_received
+    }
+
 @bp.route('/get/<receiving_no>', methods=['GET'])
 @jwt_required()
 def get_receiving_detail(receiving_no):
@@ -100,19 +231,12 @@ def get_receiving_detail(receiving_no):
         receiving = ReceivingData.query.filter_by(receiving_no=receiving_no).first()
         if not receiving:
             return jsonify({'error': 'Receiving data not found'}), 404
-            
-        return jsonify({
-            'id': receiving.id,
-            'receiving_no': receiving.receiving_no,
-            'tracking_number': receiving.tracking_number,
-            'lot_no': receiving.lot_no,
-            'po_no': receiving.po_no,
-            'total_units_vendor': receiving.total_units_vendor,
-            'total_storage_containers': receiving.total_storage_containers,
-            'exp_date': receiving.exp_date,
-            'ncmr': receiving.ncmr,
-            'total_units_received': receiving.total_units_received
-        })
+
+        return conditional_response(
+            row_etag('receiving', receiving.id, receiving.updated_at),
+            receiving.updated_at,
+            lambda: jsonify(_serialize_receiving_detail(receiving))
+        )
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -130,4 +254,53 @@ def toggle_receiving_obsolete(id):
         })
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+# Batch variants of toggle-obsolete plus a batch delete. The body selects rows
+# with {"ids": [...]} and/or {"filter": {...}} (same keys as RECEIVING_FILTERS)
+# and the change is applied as one set-based statement.
+def _batch_receivings(action):
+    data = request.get_json(silent=True) or {}
+    try:
+        condition = batch_condition(ReceivingData, data, RECEIVING_FILTERS)
+        if action == 'delete':
+            rows = batch_delete(ReceivingData, ReceivingData.receiving_no, condition)
+        else:
+            rows = batch_set_obsolete(ReceivingData, ReceivingData.receiving_no, condition, action == 'obsolete')
+        db.session.commit()
+    except BatchRequestError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error in batch {action} receivings: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+    audit_action, verb = BATCH_ACTIONS[action]
+    if rows:
+        log_activity(action=audit_action, details=batch_summary(verb, 'receiving records', rows, data))
+
+    return jsonify({
+        'message': f"{verb} {len(rows)} receiving records",
+        'count': len(rows),
+        'ids': [row_id for row_id, _ in rows],
+        'receiving_nos': [receiving_no for _, receiving_no in rows]
+    }), 200
+
+@bp.route('/batch/obsolete', methods=['POST'])
+@jwt_required()
+@role_required(['admin', 'manager'])
+def batch_obsolete_receivings():
+    return _batch_receivings('obsolete')
+
+@bp.route('/batch/activate', methods=['POST'])
+@jwt_required()
+@role_required(['admin', 'manager'])
+def batch_activate_receivings():
+    return _batch_receivings('activate')
+
+@bp.route('/batch/delete', methods=['POST'])
+@jwt_required()
+@role_required(['admin'])
+def batch_delete_receivings():
+    return _batch_receivings('delete')
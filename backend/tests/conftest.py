@@ -1,5 +1,6 @@
 import pytest
 import os
+from flask import Flask
 from backend import create_app
 from extensions import db
 from models import User, Role
@@ -41,4 +42,17 @@ def auth_headers(client):
     })
     token = response.json['token']
     
-    return {'Authorization': f'Bearer {token}'}
\ No newline at end of file
+    return {'Authorization': f'Bearer {token}'}
+
+@pytest.fixture
+def sqlite_app():
+    """Minimal app bound to an in-memory SQLite database"""
+    from backend.extensions import db as backend_db
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    backend_db.init_app(app)
+    with app.app_context():
+        backend_db.create_all()
+        yield app
+        backend_db.session.remove()
+        backend_db.drop_all()
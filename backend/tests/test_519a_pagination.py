@@ -0,0 +1,17 @@
+# tests/test_519a_pagination.py
+from backend.utils.html_to_pdf_handler import paginate_movements
+
+
+def test_movements_are_chunked_with_cumulative_et_carried_forward():
+    movements = [{'exposure_time': 5, 'cumulative_et': 5 * (i + 1)} for i in range(7)]
+    pages = list(paginate_movements(movements, 3))
+
+    assert [len(chunk) for chunk, _ in pages] == [3, 3, 1]
+    assert [carried for _, carried in pages] == [None, '15', '30']
+    assert pages[1][0][0] is movements[3]
+
+
+def test_running_total_falls_back_to_exposure_times():
+    movements = [{'exposure_time': '10 (min)'}, {'exposure_time': 2.5}, {'cumulative_et': 40}, {'exposure_time': 'n/a'}, {}]
+    assert [carried for _, carried in paginate_movements(movements, 2)] == [None, '12.5', '40']
+    assert list(paginate_movements([], 20)) == []
@@ -0,0 +1,76 @@
+# tests/test_batch_ops.py
+import pytest
+from backend.extensions import db
+from backend.models import DeletedRecord, ItemNumber
+from backend.routes import item as item_routes
+from backend.utils import batch_ops
+from backend.utils.batch_ops import AUDIT_KEY_PREVIEW, BatchRequestError, batch_condition, batch_summary
+from backend.utils.conditional import collection_versions
+
+
+@pytest.mark.parametrize('body', [None, {}, {'ids': []}, {'filter': {'protocol_number': ''}}, {'filter': {'bogus': 'x'}}])
+def test_batch_condition_rejects_empty_or_unknown_selection(body):
+    with pytest.raises(BatchRequestError):
+        batch_condition(ItemNumber, body, {'protocol_number': ItemNumber.protocol_number})
+
+
+def test_batch_summary_lists_scope_and_truncates_keys():
+    rows = [(i, f'K{i}') for i in range(AUDIT_KEY_PREVIEW + 5)]
+    summary = batch_summary('Obsoleted', 'items', rows, {'filter': {'protocol_number': 'P-1'}})
+    assert summary.startswith(f'Obsoleted {len(rows)} items (protocol_number=P-1): K0, K1')
+    assert summary.endswith('... and 5 more')
+
+
+@pytest.fixture
+def audit(sqlite_app, monkeypatch):
+    """Items P1-0..2 and P2-0, no JWT, and the audit entries the batch routes write"""
+    for protocol_number, count in (('P1', 3), ('P2', 1)):
+        for i in range(count):
+            db.session.add(ItemNumber(
+                item_number=f'{protocol_number}-{i}', description=f'{protocol_number} item {i}', client='Acme',
+                protocol_number=protocol_number, vendor='V', uom='EA', controlled='No',
+                temp_storage_conditions='RT', vendor_code_rev='A', randomized='No',
+                sequential_numbers='No', study_type='Clinical', is_obsolete=False
+            ))
+    db.session.commit()
+
+    entries = []
+    monkeypatch.setattr(batch_ops, '_current_user_id', lambda: None)
+    monkeypatch.setattr(item_routes, 'log_activity', lambda action, details: entries.append((action, details)))
+    return entries
+
+
+def _batch(app, action, body):
+    with app.test_request_context(json=body):
+        response, status = item_routes._batch_items(action)
+        return status, response.get_json()
+
+
+def _item_version():
+    return collection_versions(['item_number'])['item_number'][0]
+
+
+def test_batch_obsolete_updates_matching_rows_once(sqlite_app, audit):
+    version = _item_version()
+    status, body = _batch(sqlite_app, 'obsolete', {'filter': {'protocol_number': 'P1'}})
+
+    assert status == 200 and sorted(body['item_numbers']) == ['P1-0', 'P1-1', 'P1-2']
+    assert {item.item_number for item in ItemNumber.query.filter_by(is_obsolete=True)} == {'P1-0', 'P1-1', 'P1-2'}
+    assert audit == [('Obsolete', 'Obsoleted 3 items (protocol_number=P1): ' + ', '.join(body['item_numbers']))]
+    assert _item_version() == version + 1
+
+    # Rows already obsolete are not touched, logged or counted again
+    status, body = _batch(sqlite_app, 'obsolete', {'filter': {'protocol_number': 'P1'}})
+    assert (status, body['count'], len(audit)) == (200, 0, 1)
+
+
+def test_batch_delete_returns_rows_and_writes_tombstones(sqlite_app, audit):
+    ids = [item.id for item in ItemNumber.query.filter_by(protocol_number='P1')][:2]
+    version = _item_version()
+    status, body = _batch(sqlite_app, 'delete', {'ids': ids})
+
+    assert status == 200 and sorted(body['ids']) == sorted(ids)
+    assert ItemNumber.query.count() == 2
+    assert sorted(row.record_id for row in DeletedRecord.query) == sorted(ids)
+    assert len(audit) == 1 and audit[0][0] == 'Delete'
+    assert _item_version() == version + 1
@@ -0,0 +1,33 @@
+# tests/test_form_data.py
+from types import SimpleNamespace
+import pytest
+from backend.utils.form_data import PREFILL_BUILDERS, assemble_form_data
+
+RECEIVING = SimpleNamespace(
+    receiving_no='RN0001', item_number='ITEM001', lot_no='L1', po_no=None, tracking_number='T1',
+    total_units_received=12, total_units_vendor=3, total_storage_containers=2,
+    temp_device_in_alarm=None, temp_device_deactivated='Yes', temp_device_returned_to_courier=None
+)
+ITEM = SimpleNamespace(
+    description='Aspirin', client='Acme', vendor='V', uom='EA', controlled='No', protocol_number='P1',
+    temp_storage_conditions='2-8C', other_storage_conditions=None,
+    max_exposure_time=60, temper_time=15, working_exposure_time=30
+)
+
+
+def test_prefill_keys_match_generate_request_bodies():
+    assert PREFILL_BUILDERS['501A'](RECEIVING, ITEM)['total_units_received'] == '12 EA'
+    form_519a = PREFILL_BUILDERS['519A'](RECEIVING, ITEM)
+    assert form_519a['temp_device_alarm'] == 'No' and form_519a['temp_device_deactivated'] == 'Yes'
+    form_520b = PREFILL_BUILDERS['520B'](RECEIVING, ITEM)
+    assert form_520b['RN'] == 'RN0001' and form_520b['PO No'] == '' and form_520b['Protocol No'] == 'P1'
+
+
+def test_prefill_without_item_leaves_item_fields_blank():
+    form = PREFILL_BUILDERS['501A'](RECEIVING, None)
+    assert form['item_no'] == 'ITEM001' and form['item_description'] == '' and form['total_units_received'] == '12'
+
+
+def test_assemble_requires_receiving_number():
+    with pytest.raises(ValueError):
+        assemble_form_data('520B', {'Comments': 'no RN given'})
@@ -0,0 +1,32 @@
+# tests/test_form_schemas.py
+from backend.utils.form_schemas import FORM_SCHEMAS
+
+
+def test_520b_body_maps_to_template_context():
+    context = FORM_SCHEMAS['520B'].context({
+        'RN': 'RN0001', 'Item No': 'ITEM001',
+        'deliveryAcceptance': {'Shipping container is intact': 'yes', 'Temperature has been maintained': False},
+        'deliveryAcceptanceNA': {'device_included': True},
+        'documentVerification': None
+    })
+
+    assert context['receiving_no'] == 'RN0001' and context['ncmr'] == 'N/A' and context['comments'] == ''
+    checked = {box['name']: box['checked'] for box in context['deliveryAcceptance']}
+    assert len(checked) == 7 and checked['Shipping container is intact'] == 'checked'
+    assert checked['Temperature has been maintained'] == ''
+    assert context['deliveryAcceptanceNA'] == {'material_placed': '', 'temperature_maintained': '', 'device_included': 'checked'}
+    assert [box['checked'] for box in context['documentVerification']] == ['', '', '', '']
+
+
+def test_519a_rows_and_minutes():
+    context = FORM_SCHEMAS['519A'].context({
+        'max_exposure_time': 60, 'drug_movements': [{'destination': 'Freezer A', 'note': 'dropped'}]
+    })
+    assert context['max_exposure_time'] == '60 (min)' and context['temper_time'] == ' (min)'
+    assert context['drug_movements'][0]['destination'] == 'Freezer A'
+    assert set(context['drug_movements'][0]) == set(FORM_SCHEMAS['519A'].fields['drug_movements'].columns)
+
+
+def test_missing_required_fields():
+    assert FORM_SCHEMAS['520B'].missing({'RN': 'RN0001', 'Item No': ''}) == ['Item No']
+    assert FORM_SCHEMAS['501A'].missing({'receiving_no': 'RN0001', 'item_no': 'ITEM001'}) == []
@@ -0,0 +1,67 @@
+# tests/test_generated_sweeper.py
+import os
+import time
+from datetime import datetime
+from backend.utils.generated_sweeper import GeneratedSweeper
+
+
+def _pdf(directory, name, age_hours, now, content=b'%PDF-1.4 test'):
+    path = directory / name
+    path.write_bytes(content)
+    os.utime(path, (now - age_hours * 3600, now - age_hours * 3600))
+    return path
+
+
+def test_sweep_archives_old_pdfs_and_keeps_them_retrievable(tmp_path):
+    now = time.time()
+    _pdf(tmp_path, '501A_RN1_old.pdf', 48, now, b'%PDF old')
+    _pdf(tmp_path, 'test_501A_debug.pdf', 48, now)
+    recent = _pdf(tmp_path, '501A_RN2_new.pdf', 1, now)
+
+    sweeper = GeneratedSweeper(tmp_path, retention_hours=24)
+    result = sweeper.sweep(now)
+
+    assert (result['archived'], result['deleted_files']) == (1, 1)
+    assert [p.name for p in tmp_path.glob('*.pdf')] == [recent.name]
+    assert sweeper.read_archived('501A_RN1_old.pdf') == b'%PDF old'
+    assert sweeper.read_archived('501A_RN2_new.pdf') is None
+    assert sweeper.stats()['archives'] == 1
+
+
+def test_sweep_drops_expired_archives_and_their_index_entries(tmp_path):
+    now = time.time()
+    _pdf(tmp_path, 'a.pdf', 48, now)
+    sweeper = GeneratedSweeper(tmp_path, retention_hours=24, archive_retention_days=30)
+    sweeper.sweep(now)
+
+    result = sweeper.sweep(now + 40 * 86400)
+    assert result['deleted_archives'] == 1
+    assert sweeper.find_archived('a.pdf') is None
+
+
+def test_over_budget_sweep_keeps_protected_job_outputs(tmp_path):
+    now = time.time()
+    job_output = _pdf(tmp_path, '501A_RN1_job.pdf', 2, now, b'x' * 100)
+    _pdf(tmp_path, '501A_RN2_copy.pdf', 1, now, b'x' * 100)
+
+    sweeper = GeneratedSweeper(tmp_path, max_bytes=150, protected=lambda: {job_output.name})
+    result = sweeper.sweep(now)
+
+    assert result['deleted_files'] == 1
+    assert [p.name for p in tmp_path.glob('*.pdf')] == [job_output.name]
+
+
+def test_archived_lookup_reads_only_the_index_of_the_hinted_day(tmp_path):
+    now = time.time()
+    for age_days in (3, 10):
+        _pdf(tmp_path, f'501A_RN{age_days}.pdf', age_days * 24, now)
+    sweeper = GeneratedSweeper(tmp_path, retention_hours=24)
+    sweeper.sweep(now)
+    indexes = sorted(path.name for path in (tmp_path / 'archive').glob('*.jsonl'))
+    assert len(indexes) == 2
+
+    finished = datetime.fromtimestamp(now - 3 * 86400)
+    # Would fail to parse if the lookup read the older day's index
+    (tmp_path / 'archive' / indexes[0]).write_text('"501A_RN3.pdf" not json\n')
+    assert sweeper.read_archived('501A_RN3.pdf', finished) == b'%PDF-1.4 test'
+    assert sweeper.find_archived('501A_RN10.pdf', finished) is None
@@ -0,0 +1,49 @@
+# tests/test_item_import.py
+import io
+from backend.models import ItemNumber
+from backend.utils.conditional import conditional_collection
+from backend.utils.item_import import REQUIRED_COLUMNS, import_items, iter_csv_rows, validate_row
+from backend.utils.search_index import search_catalog
+
+
+def test_csv_rows_normalize_headers_and_skip_blank_lines():
+    stream = io.BytesIO(b'\xef\xbb\xbfItem Number,Description\nA-1,First\n,\nA-2,Second\n')
+    assert list(iter_csv_rows(stream)) == [
+        {'item_number': 'A-1', 'description': 'First'},
+        {'item_number': 'A-2', 'description': 'Second'},
+    ]
+
+
+def test_validate_row_coerces_and_reports_errors():
+    row = {name: 'x' for name in REQUIRED_COLUMNS}
+    row.update(item_number=' A-1 ', is_obsolete='yes')
+    clean, errors = validate_row(row)
+    assert errors == []
+    assert clean['item_number'] == 'A-1' and clean['is_obsolete'] is True
+
+    _, errors = validate_row({'item_number': 'A-2', 'is_obsolete': 'maybe'})
+    assert 'description is required' in errors
+    assert 'is_obsolete must be true or false' in errors
+
+
+def _catalog_etag(app):
+    with app.test_request_context('/api/item/get'):
+        return conditional_collection('item_number')(lambda: ('[]', 200))().get_etag()[0]
+
+
+def _search(q):
+    columns = [ItemNumber.item_number, ItemNumber.description]
+    return search_catalog(ItemNumber, ItemNumber.item_number, ItemNumber.description, columns, q, 10)
+
+
+def test_import_invalidates_list_etags_and_search_index(sqlite_app):
+    etag = _catalog_etag(sqlite_app)
+    assert _search('IMP') == []
+
+    rows = [dict({name: 'x' for name in REQUIRED_COLUMNS}, item_number=f'IMP-{i}', description=f'Imported {i}')
+            for i in range(5)]
+    report = import_items(rows, chunk_size=2)
+
+    assert report['imported'] == 5
+    assert _catalog_etag(sqlite_app) != etag
+    assert [row['item_number'] for row in _search('imp')] == [f'IMP-{i}' for i in range(5)]
@@ -0,0 +1,105 @@
+# tests/test_pagination.py
+import pytest
+
+from backend.extensions import db
+from backend.models import ItemNumber
+from backend.utils.pagination import (
+    PaginationError, apply_filters, decode_cursor, encode_cursor, keyset_page, model_fields,
+    parse_fields, parse_sort, select_fields, serialize_fields
+)
+
+ITEM_SORTS = {'display_order': ItemNumber.display_order, 'item_number': ItemNumber.item_number}
+
+
+@pytest.fixture
+def items(sqlite_app):
+    for i in range(25):
+        db.session.add(ItemNumber(
+            item_number=f'ITEM{i:03d}', description=f'Item {i}', client='Acme' if i % 2 else 'Globex',
+            protocol_number='P1', vendor='V', uom='EA', controlled='No',
+            temp_storage_conditions='RT', vendor_code_rev='A', randomized='No',
+            sequential_numbers='No', study_type='Clinical', is_obsolete=False,
+            # A few NULL display orders to exercise NULLS FIRST paging
+            display_order=None if i < 3 else i % 5
+        ))
+    db.session.commit()
+
+
+def _walk_pages(sort, limit, filters=None):
+    sort_name, column, descending = parse_sort(sort, ITEM_SORTS, 'display_order')
+    seen, cursor = [], None
+    while True:
+        query = apply_filters(ItemNumber.query, filters or {}, {'client': ItemNumber.client})
+        rows, cursor = keyset_page(query, sort_name, column, ItemNumber.id, descending, cursor, limit)
+        seen.extend(row.id for row in rows)
+        if not cursor:
+            return seen
+
+
+@pytest.mark.parametrize('sort', ['display_order', '-display_order', 'item_number', '-item_number'])
+def test_keyset_pages_cover_every_row_once(items, sort):
+    ids = _walk_pages(sort, limit=4)
+    assert len(ids) == 25
+    assert len(set(ids)) == 25
+
+
+def test_keyset_pages_respect_filters(items):
+    ids = _walk_pages('display_order', limit=3, filters={'client': 'Acme'})
+    assert len(ids) == 12
+    assert all(db.session.get(ItemNumber, i).client == 'Acme' for i in ids)
+
+
+def test_cursor_round_trip_and_sort_mismatch():
+    cursor = encode_cursor('display_order', None, 7)
+    assert decode_cursor(cursor, 'display_order', ItemNumber.display_order) == (None, 7)
+    with pytest.raises(PaginationError):
+        decode_cursor(cursor, 'item_number', ItemNumber.item_number)
+    with pytest.raises(PaginationError):
+        parse_sort('description', ITEM_SORTS, 'display_order')
+
+
+def test_range_filters_include_whole_upper_day(items):
+    from datetime import datetime
+    from backend.models import ReceivingData
+    from backend.utils.pagination import apply_range_filters
+
+    for day in (1, 2, 3):
+        db.session.add(ReceivingData(
+            item_number='ITEM001', receiving_no=f'RN{day}', created_at=datetime(2025, 2, day, 18, 30)
+        ))
+    db.session.commit()
+
+    ranges = {'created_at': ReceivingData.created_at}
+    query = apply_range_filters(ReceivingData.query, {'created_at_from': '2025-02-02', 'created_at_to': '2025-02-03'}, ranges)
+    assert sorted(rd.receiving_no for rd in query) == ['RN2', 'RN3']
+    with pytest.raises(PaginationError):
+        apply_range_filters(ReceivingData.query, {'created_at_from': 'yesterday'}, ranges)
+
+
+def test_sparse_fieldset_selects_only_requested_columns(items):
+    allowed = model_fields(ItemNumber, exclude=('created_by', 'updated_by'))
+    fields = parse_fields('item_number, is_obsolete,item_number', allowed)
+    assert fields == ['item_number', 'is_obsolete']
+
+    query = select_fields(ItemNumber.query, fields, allowed, ItemNumber.id, ItemNumber.display_order)
+    assert 'description' not in str(query.statement)
+    rows, cursor = keyset_page(query, 'display_order', ItemNumber.display_order, ItemNumber.id, False, None, 5)
+    assert cursor is not None
+    assert serialize_fields(fields, rows[0]) == {'id': rows[0].id, 'item_number': rows[0].item_number, 'is_obsolete': False}
+
+    assert parse_fields('', allowed) is None
+    with pytest.raises(PaginationError):
+        parse_fields('item_number,created_by', allowed)
+
+
+def test_cursor_predicate_is_a_row_value_comparison():
+    from sqlalchemy.dialects import postgresql
+    from backend.utils.pagination import _after_cursor
+
+    def sql(column, value, descending):
+        return str(_after_cursor(column, ItemNumber.id, value, 7, descending).compile(dialect=postgresql.dialect()))
+
+    assert sql(ItemNumber.item_number, 'A', False).startswith('(item_number.item_number, item_number.id) > (')
+    assert 'IS NULL' not in sql(ItemNumber.item_number, 'A', True)
+    # display_order is nullable: NULLs sort last descending, so they still follow
+    assert sql(ItemNumber.display_order, 3, True).endswith('OR item_number.display_order IS NULL')
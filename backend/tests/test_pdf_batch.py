@@ -0,0 +1,49 @@
+# tests/test_pdf_batch.py
+import io
+import json
+import time
+import zipfile
+from flask import Flask
+from backend.utils.pdf_batch import BatchDocument, batch_workers, render_documents, stream_zip
+
+
+class FakeHandler:
+    engine = 'wkhtmltopdf'
+
+    class renderer:
+        size = 4
+        queue_size = 8
+
+    def generate_501a_pdf(self, data, engine=None):
+        if data['receiving_no'] == 'BAD':
+            raise Exception('PDF generation failed: boom')
+        return io.BytesIO(b'%PDF-' + data['receiving_no'].encode())
+
+
+def test_batch_zip_holds_each_pdf_and_a_manifest_of_failures():
+    documents = [
+        BatchDocument('501A', 'RN1', {'receiving_no': 'RN1'}),
+        BatchDocument('501A', 'BAD', {'receiving_no': 'BAD'}),
+        BatchDocument('501A', 'RN/2', {'receiving_no': 'RN2'}),
+        BatchDocument('501A', 'MISSING', error='Receiving data not found'),
+    ]
+    rendered = render_documents(Flask(__name__), FakeHandler(), documents, workers=2)
+    summaries = []
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(
+        stream_zip(rendered, documents, time.monotonic(), on_complete=summaries.append)
+    )))
+
+    assert sorted(archive.namelist()) == ['501A_RN1.pdf', '501A_RN_2.pdf', 'manifest.json']
+    assert archive.read('501A_RN_2.pdf') == b'%PDF-RN2'
+    manifest = json.loads(archive.read('manifest.json'))
+    assert manifest['summary']['succeeded'] == 2 and manifest['summary']['failed'] == 2
+    assert summaries == [manifest['summary']]
+    failed = {entry['receiving_no']: entry['error'] for entry in manifest['documents'] if entry['status'] == 'failed'}
+    assert failed == {'BAD': 'PDF generation failed: boom', 'MISSING': 'Receiving data not found'}
+
+
+def test_batch_threads_leave_half_the_renderer_queue_free():
+    assert batch_workers(FakeHandler()) == 4
+    assert batch_workers(FakeHandler(), batches=2) == 2
+    assert batch_workers(FakeHandler(), batches=8) == 1
+    assert batch_workers(FakeHandler(), engine='reportlab') == 1
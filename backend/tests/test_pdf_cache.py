@@ -0,0 +1,45 @@
+# tests/test_pdf_cache.py
+from backend.utils.pdf_cache import PdfCache
+
+
+def test_key_ignores_key_order_but_tracks_template_contents(tmp_path):
+    template = tmp_path / 'form.html'
+    template.write_text('<p>{{ a }}</p>')
+    cache = PdfCache(tmp_path / 'cache', 1024)
+
+    key = cache.key(template, {'a': 1, 'b': [1, 2]})
+    assert key == cache.key(template, {'b': [1, 2], 'a': 1})
+    assert key != cache.key(template, {'a': 2, 'b': [1, 2]})
+
+    template.write_text('<p>{{ a }}!</p>')
+    assert key != cache.key(template, {'a': 1, 'b': [1, 2]})
+
+
+def test_least_recently_used_entries_are_evicted_over_budget(tmp_path):
+    cache = PdfCache(tmp_path, 250)
+    assert cache.get('a') is None
+    cache.put('a', b'a' * 100)
+    cache.put('b', b'b' * 100)
+    assert cache.get('a') == b'a' * 100
+
+    cache.put('c', b'c' * 100)
+    assert cache.get('b') is None and not (tmp_path / 'b.pdf').exists()
+    assert cache.get('a') and cache.get('c')
+    assert cache.put('huge', b'x' * 300) is False
+
+    stats = cache.stats()
+    assert stats['entries'] == 2 and stats['bytes'] == 200 and stats['evictions'] == 1
+    assert (stats['hits'], stats['misses']) == (3, 2)
+    assert PdfCache(tmp_path, 250).stats()['entries'] == 2
+
+
+def test_budget_is_shared_by_every_instance_on_the_directory(tmp_path):
+    # One PdfCache per gunicorn worker, all on the same directory
+    first, second = PdfCache(tmp_path, 250), PdfCache(tmp_path, 250)
+    first.put('a', b'a' * 100)
+    second.put('b', b'b' * 100)
+    assert first.get('b') == b'b' * 100
+
+    second.put('c', b'c' * 100)
+    assert first.get('a') is None and second.get('a') is None
+    assert first.stats()['bytes'] == second.stats()['bytes'] == 200
@@ -0,0 +1,79 @@
+# tests/test_pdf_jobs.py
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from backend.extensions import db
+from backend.models import PdfJob, Role, User
+from backend.utils.pdf_jobs import claim_next_job, enqueue_job, get_user_job, requeue_stale_jobs, run_job
+
+
+def test_jobs_are_claimed_once_in_order(sqlite_app):
+    first = enqueue_job('501A', {'receiving_no': 'RN1', 'item_no': 'A'})
+    second = enqueue_job('520B', {'RN': 'RN2', 'Item No': 'B'})
+
+    claimed = claim_next_job('w1')
+    assert claimed.id == first.id and claimed.status == 'running'
+    assert claimed.attempts == 1 and claimed.worker_id == 'w1'
+    assert claim_next_job('w2').id == second.id
+    assert claim_next_job('w3') is None
+
+
+def test_stale_running_jobs_are_requeued_or_failed(sqlite_app):
+    retry = enqueue_job('501A', {'receiving_no': 'RN1'})
+    exhausted = enqueue_job('501A', {'receiving_no': 'RN2'})
+    long_ago = datetime.utcnow() - timedelta(hours=1)
+    for job, attempts in ((retry, 1), (exhausted, 3)):
+        job.status, job.started_at, job.attempts = 'running', long_ago, attempts
+    db.session.commit()
+
+    assert requeue_stale_jobs(stale_seconds=300, max_attempts=3) == 1
+    db.session.expire_all()
+    assert db.session.get(PdfJob, retry.id).status == 'queued'
+    assert db.session.get(PdfJob, exhausted.id).status == 'failed'
+
+
+def test_jobs_are_visible_to_their_owner_and_admins_only(sqlite_app):
+    admin_role, user_role = Role(name='admin'), Role(name='user')
+    owner, other, admin = (
+        User(username=name, email=f'{name}@example.com', password_hash='x', role=role)
+        for name, role in (('owner', user_role), ('other', user_role), ('admin', admin_role))
+    )
+    db.session.add_all([owner, other, admin])
+    db.session.commit()
+    job = enqueue_job('501A', {'receiving_no': 'RN1'}, owner.id)
+
+    assert get_user_job(job.id, owner.id) is job
+    assert get_user_job(job.id, admin.id) is job
+    assert get_user_job(job.id, other.id) is None
+    assert get_user_job(job.id, None) is None
+
+
+class FakeHandler:
+    def __init__(self, directory):
+        self.directory = directory
+
+    def generate_501a_pdf(self, data, as_path=False):
+        path = self.directory / f"{data['receiving_no']}_{len(list(self.directory.iterdir()))}.pdf"
+        path.write_bytes(b'%PDF-test')
+        return path
+
+
+def test_worker_that_lost_its_job_to_a_requeue_drops_its_result(sqlite_app, tmp_path):
+    sqlite_app.extensions['pdf_handler'] = FakeHandler(tmp_path)
+    job = enqueue_job('501A', {'receiving_no': 'RN1'})
+    claimed = claim_next_job('w1')
+    # What w1 holds while its render outlives the stale limit without a heartbeat
+    slow = SimpleNamespace(id=claimed.id, worker_id='w1', attempts=1, form_type='501A', payload=claimed.payload)
+    claimed.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+    db.session.commit()
+    assert requeue_stale_jobs(stale_seconds=300, max_attempts=3) == 1
+    taken_over = claim_next_job('w2')
+
+    run_job(slow)
+    db.session.expire_all()
+    assert db.session.get(PdfJob, job.id).status == 'running' and not list(tmp_path.iterdir())
+
+    run_job(taken_over)
+    db.session.expire_all()
+    done = db.session.get(PdfJob, job.id)
+    assert done.status == 'done' and done.worker_id == 'w2' and done.file_size == 9
@@ -0,0 +1,63 @@
+# tests/test_pdf_limiter.py
+import time
+import pytest
+from backend.utils.pdf_limiter import FCNTL_AVAILABLE, PdfQueueFull, PdfSlotLimiter, worker_bounded
+
+pytestmark = pytest.mark.skipif(not FCNTL_AVAILABLE, reason='flock() is POSIX only')
+
+
+def test_slots_are_shared_between_limiters_on_the_same_directory(tmp_path):
+    # Two limiters on one directory stand in for two gunicorn workers
+    first = PdfSlotLimiter(tmp_path, slots=1, queue_size=1, wait_seconds=0.1)
+    second = PdfSlotLimiter(tmp_path, slots=1, queue_size=1, wait_seconds=0.1)
+
+    with first.slot():
+        assert second.stats()['active'] == 1
+
+        started = time.monotonic()
+        with pytest.raises(PdfQueueFull, match='Timed out'):
+            with second.slot():
+                pass
+        assert time.monotonic() - started >= 0.1
+
+        ticket = first._try_lock('queue-0.lock')
+        with pytest.raises(PdfQueueFull, match='already waiting') as rejected:
+            with second.slot():
+                pass
+        assert rejected.value.retry_after >= 1
+        assert second.stats()['queue_depth'] == 1
+        ticket.close()
+
+    with second.slot():
+        pass
+
+    stats = second.stats()
+    assert (stats['active'], stats['queue_depth']) == (0, 0)
+    assert (stats['admitted'], stats['rejected'], stats['timeouts']) == (1, 2, 1)
+    assert first.stats()['rejected_all_workers'] == 2
+
+
+def test_a_held_slot_is_released_once(tmp_path):
+    # /batch holds its slot past the view, until the streamed archive closes
+    limiter = PdfSlotLimiter(tmp_path, slots=1, queue_size=0)
+    release = limiter.hold()
+    with pytest.raises(PdfQueueFull, match='already waiting'):
+        limiter.hold()
+    release()
+    release()
+    assert limiter.stats()['active'] == 0
+    limiter.hold()()
+
+
+def test_zero_slots_disables_the_limit(tmp_path):
+    limiter = PdfSlotLimiter(tmp_path / 'slots', slots=0)
+    with limiter.slot(), limiter.slot():
+        pass
+    assert not limiter.enabled and not (tmp_path / 'slots').exists()
+
+
+def test_slots_and_queue_leave_the_worker_reserve_free():
+    assert worker_bounded(4, 2, workers=8, reserve=2) == (4, 2)
+    assert worker_bounded(4, 16, workers=8, reserve=2) == (4, 2)
+    assert worker_bounded(4, 16, workers=4, reserve=1) == (3, 0)
+    assert worker_bounded(4, 16, workers=1, reserve=2) == (1, 0)
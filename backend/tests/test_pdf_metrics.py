@@ -0,0 +1,41 @@
+# tests/test_pdf_metrics.py
+from backend.utils.pdf_metrics import PdfMetrics, StageTimer
+from backend.utils.pdf_renderer import RendererBusy
+
+
+def _timer(form_type, render_seconds, size):
+    timer = StageTimer(form_type, route='generate-pdf')
+    timer.stages.update(template=0.002, render=render_seconds)
+    timer.bytes = size
+    return timer
+
+
+def test_stage_histograms_and_byte_counts_per_form():
+    metrics = PdfMetrics(log=False)
+    metrics.record(_timer('520B', 0.04, 1000))
+    metrics.record(_timer('520B', 0.3, 3000))
+    metrics.record_failure(StageTimer('520B'), RendererBusy('queue full'))
+    metrics.record_failure(StageTimer('501A'), Exception('boom'))
+
+    forms = metrics.snapshot()['forms']
+    form = forms['520B']
+    assert (form['requests'], form['busy'], form['failures']) == (3, 1, 0)
+    assert (form['bytes'], form['max_bytes']) == (4000, 3000)
+    render = form['stages']['render']
+    assert render['count'] == 2 and render['buckets']['50'] == 1 and render['buckets']['500'] == 2
+    assert render['p50_ms'] == 50 and render['p95_ms'] == 500
+    assert list(form['stages']) == ['template', 'render', 'total']
+    assert forms['501A']['failures'] == 1
+
+    text = metrics.prometheus()
+    assert 'pdf_stage_duration_milliseconds_bucket{form="520B",stage="render",le="+Inf"} 2' in text
+    assert 'pdf_bytes_total{form="520B"} 4000' in text
+
+
+def test_stage_timer_accumulates_repeated_stages():
+    timer = StageTimer('501A')
+    with timer.stage('cache'):
+        pass
+    with timer.stage('cache'):
+        pass
+    assert list(timer.stages) == ['cache'] and timer.stages['cache'] >= 0
@@ -0,0 +1,40 @@
+# tests/test_pdf_optimize.py
+import io
+import pytest
+from backend.utils.pdf_optimize import PdfOptimizer, dedupe_resources
+
+pdfrw = pytest.importorskip('pdfrw')
+canvas = pytest.importorskip('reportlab.pdfgen.canvas')
+
+
+def _reportlab_pdf(text):
+    buffer = io.BytesIO()
+    page = canvas.Canvas(buffer)
+    page.setFont('Helvetica', 12)
+    page.drawString(72, 720, text)
+    page.save()
+    return buffer.getvalue()
+
+
+def test_optimize_drops_ascii85_and_keeps_the_pages():
+    original = _reportlab_pdf('Temperature Exposure Record ' * 20)
+    assert b'ASCII85Decode' in original
+
+    optimizer = PdfOptimizer(linearize=False)
+    optimized = optimizer.optimize(original)
+
+    assert b'ASCII85Decode' not in optimized and len(optimized) < len(original)
+    assert len(pdfrw.PdfReader(fdata=optimized).pages) == 1
+    assert optimizer.stats()['optimized'] == 1
+
+
+def test_identical_fonts_of_joined_documents_are_stored_once():
+    pages = [pdfrw.PdfReader(fdata=_reportlab_pdf(f'Document {i}')).pages[0] for i in range(3)]
+    assert dedupe_resources(pages) == 2
+    assert pages[0].Resources.Font.F1 is pages[2].Resources.Font.F1
+
+
+def test_unreadable_pdf_is_returned_unchanged():
+    optimizer = PdfOptimizer(linearize=False)
+    assert optimizer.optimize(b'not a pdf') == b'not a pdf'
+    assert optimizer.stats()['failures'] == 1
@@ -0,0 +1,76 @@
+# tests/test_pdf_renderer.py
+import threading
+import time
+import pytest
+from backend.utils.pdf_renderer import RESOURCE_AVAILABLE, RendererBusy, RendererError, RendererPool, RendererTimeout
+
+
+def test_render_uses_warm_process_and_refills_pool():
+    pool = RendererPool(['cat'], size=2)
+    try:
+        pool.warm_up()
+        assert pool.stats()['warm'] == 2
+        assert pool.render('<html>ok</html>') == b'<html>ok</html>'
+        # The replacement is started by a background thread
+        deadline = time.monotonic() + 5
+        while pool.stats()['warm'] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stats = pool.stats()
+        assert stats['renders'] == 1 and stats['warm'] == 2 and stats['busy'] == 0
+    finally:
+        pool.close()
+
+
+def test_hung_render_is_killed_and_failure_raised():
+    pool = RendererPool(['sh', '-c', 'sleep 5'], size=1, timeout=0.3)
+    try:
+        with pytest.raises(RendererTimeout):
+            pool.render('x')
+        with pytest.raises(RendererError):
+            RendererPool(['sh', '-c', 'exit 3'], size=1).render('x')
+        assert pool.stats()['timeouts'] == 1
+    finally:
+        pool.close()
+
+
+def test_full_queue_rejects_extra_requests():
+    pool = RendererPool(['sh', '-c', 'sleep 0.3; cat'], size=1, queue_size=1, timeout=5)
+    results = []
+
+    def render():
+        try:
+            results.append(pool.render('ok'))
+        except RendererBusy:
+            results.append('busy')
+
+    threads = [threading.Thread(target=render) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pool.close()
+
+    assert sorted(results, key=str) == [b'ok', b'ok', 'busy']
+    assert pool.stats()['rejected'] == 1
+
+
+def test_render_many_passes_documents_as_file_inputs_in_order():
+    # Stands in for "wkhtmltopdf [options] <input>... -": concatenates the file inputs
+    pool = RendererPool(['sh', '-c', 'for f in "$@"; do [ "$f" = - ] || cat "$f"; done', 'sh', '-', '-'], size=1)
+    try:
+        assert pool.render_many(['<p>501A</p>', b'<p>519A</p>', '<p>520B</p>']) == b'<p>501A</p><p>519A</p><p>520B</p>'
+        assert pool.stats()['renders'] == 1
+    finally:
+        pool.close()
+
+
+@pytest.mark.skipif(not RESOURCE_AVAILABLE, reason='prlimit() is Linux only')
+def test_memory_limit_is_applied_to_spawned_processes():
+    import resource
+    pool = RendererPool(['cat'], size=1, memory_limit_mb=512)
+    try:
+        process, _ = pool._spawn()
+        assert resource.prlimit(process.pid, resource.RLIMIT_AS) == (512 * 1024 * 1024,) * 2
+        pool._kill(process)
+    finally:
+        pool.close()
@@ -0,0 +1,25 @@
+# tests/test_reportlab_forms.py
+import pytest
+from backend.utils import reportlab_forms
+
+pdfrw = pytest.importorskip('pdfrw')
+pytestmark = pytest.mark.skipif(not reportlab_forms.REPORTLAB_AVAILABLE, reason='reportlab not installed')
+
+
+def test_render_forms_starts_each_form_on_a_new_page():
+    pages = [
+        ('501A', {'receiving_no': 'RN1', 'locationStatus': {'quarantine': 'checked'}, 'transactions': []}),
+        ('519A', {'receiving_no': 'RN1', 'drug_movements': []}),
+        ('520B', {'receiving_no': 'RN1', 'deliveryAcceptanceNA': {}, 'documentVerification': [], 'issuesSection': []})
+    ]
+    pdf = reportlab_forms.render_forms(pages)
+
+    assert pdf.startswith(b'%PDF')
+    assert len(pdfrw.PdfReader(fdata=pdf).pages) == 3
+
+
+def test_long_transaction_table_flows_onto_more_pages():
+    transactions = [{'date': '2026-01-01', 'reason': f'Dispense <{i}> & co', 'quantity': 1} for i in range(150)]
+    pdf = reportlab_forms.render_forms([('501A', {'receiving_no': 'RN1', 'transactions': transactions})])
+
+    assert len(pdfrw.PdfReader(fdata=pdf).pages) > 1
@@ -0,0 +1,60 @@
+# tests/test_search_index.py
+from backend.utils.search_index import PrefixIndex, parse_search_limit, MAX_SEARCH_LIMIT
+
+ROWS = [
+    {'item_number': 'AB-100', 'description': 'Aspirin tablets 5mg'},
+    {'item_number': 'XAB-7', 'description': 'Placebo capsule'},
+    {'item_number': 'Z9', 'description': 'Absorbent pad'},
+]
+
+
+def _search(q, limit=10):
+    return [row['item_number'] for row in PrefixIndex(ROWS, 'item_number', 'description').search(q, limit)]
+
+
+def test_prefix_matches_rank_before_substrings_of_key_and_description():
+    assert _search('ab-') == ['AB-100', 'XAB-7']
+    assert _search('sorb') == ['Z9']
+    assert _search('b-1') == ['AB-100']
+
+
+def test_short_queries_match_key_prefixes_only():
+    # As on Postgres, where a query shorter than a trigram skips the substring match
+    assert _search('ab') == ['AB-100']
+    assert _search('9') == []
+
+
+def test_search_is_case_insensitive_and_limited():
+    assert _search('PLAC') == ['XAB-7']
+    assert _search('ab-', limit=1) == ['AB-100']
+    assert _search('nothing') == []
+
+
+def test_search_limit_is_clamped():
+    assert parse_search_limit('0') == 1
+    assert parse_search_limit('100000') == MAX_SEARCH_LIMIT
+    assert parse_search_limit('abc') == 20
+
+
+def test_fallback_index_is_not_shared_between_apps(sqlite_app):
+    from flask import Flask
+    from backend.extensions import db
+    from backend.models import ReceivingData
+    from backend.utils.search_index import search_catalog
+
+    def add_and_search(receiving_no):
+        db.session.add(ReceivingData(item_number='ITEM001', receiving_no=receiving_no))
+        db.session.commit()
+        columns = [ReceivingData.receiving_no, ReceivingData.item_number]
+        rows = search_catalog(ReceivingData, ReceivingData.receiving_no, ReceivingData.item_number, columns, 'RN', 5)
+        return [row['receiving_no'] for row in rows]
+
+    assert add_and_search('RN1') == ['RN1']
+
+    # Same table and collection version, different database
+    other = Flask(__name__)
+    other.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    db.init_app(other)
+    with other.app_context():
+        db.create_all()
+        assert add_and_search('RN2') == ['RN2']
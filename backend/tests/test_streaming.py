@@ -0,0 +1,25 @@
+# tests/test_streaming.py
+import json
+from flask import Flask
+from backend.utils.streaming import iter_json_array, json_array_offsets, stream_json_array
+
+
+def test_stream_json_array_matches_jsonify_output():
+    app = Flask(__name__)
+    rows = [{'id': i, 'name': f'row {i}'} for i in range(250)]
+    with app.test_request_context():
+        response = stream_json_array(iter(rows))
+        assert response.is_streamed
+        body = response.get_data()
+    assert json.loads(body) == rows
+
+
+def test_json_array_offsets_read_back_in_any_order(tmp_path):
+    path = tmp_path / 'audit.json'
+    entries = [{'id': i, 'details': 'x' * (i * 500)} for i in range(300)]
+    path.write_text(json.dumps(entries, indent=4))
+
+    with open(path, 'rb') as f:
+        offsets = json_array_offsets(f, key=lambda entry: entry['id'] % 7)
+        assert len(offsets[0]) == 300 and offsets[2][:8] == [0, 1, 2, 3, 4, 5, 6, 0]
+        assert list(iter_json_array(f, offsets, range(299, -1, -1))) == entries[::-1]
@@ -4,6 +4,7 @@ from flask_jwt_extended import get_jwt_identity # type: ignore
 from datetime import datetime
 import os
 import json
+import tempfile
 
 def log_activity(action, details, username=None, user_id=None):
     try:
@@ -47,9 +48,12 @@ def log_activity(action, details, username=None, user_id=None):
         # Add new log entry
         logs.append(log_entry)
         
-        # Write logs back to file
-        with open(logs_path, 'w') as f:
+        # Write logs back to file. A temporary file swapped in with
+        # os.replace means readers never see a half-written log.
+        handle, temp_path = tempfile.mkstemp(dir=logs_dir, prefix='audit.', suffix='.tmp')
+        with os.fdopen(handle, 'w') as f:
             json.dump(logs, f, indent=4)
+        os.replace(temp_path, logs_path)
             
         print(f"Activity logged: {action} by {username}")
         return True
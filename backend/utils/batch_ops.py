@@ -0,0 +1,113 @@
+# backend/utils/batch_ops.py
+from datetime import datetime
+from flask_jwt_extended import get_jwt_identity # type: ignore
+from sqlalchemy import delete, insert, update # type: ignore
+from ..extensions import db
+from ..models import DeletedRecord
+from .pagination import PaginationError, apply_filters
+
+# action -> (audit log action, past-tense verb for messages)
+BATCH_ACTIONS = {
+    'obsolete': ('Obsolete', 'Obsoleted'),
+    'activate': ('Activate', 'Activated'),
+    'delete': ('Delete', 'Deleted')
+}
+
+# Keys listed in an audit entry before it is summarised as "... and N more"
+AUDIT_KEY_PREVIEW = 20
+
+
+class BatchRequestError(ValueError):
+    """Raised for a batch body that names no rows or uses unknown filters"""
+
+
+def _current_user_id():
+    current_user = get_jwt_identity()
+    user_id = current_user.get('id') if isinstance(current_user, dict) else current_user
+    return int(user_id) if user_id else None
+
+
+def batch_condition(model, data, filterable_columns):
+    """
+    WHERE clause for a batch body of the form {"ids": [...]} and/or
+    {"filter": {<column>: <value>, ...}} using the same whitelist as /get.
+    An empty selection is rejected so a batch can never hit every row.
+    """
+    data = data or {}
+    ids = data.get('ids') or []
+    filters = data.get('filter') or {}
+
+    if not isinstance(ids, list) or not isinstance(filters, dict):
+        raise BatchRequestError("'ids' must be a list and 'filter' an object")
+
+    unknown = sorted(set(filters) - set(filterable_columns))
+    if unknown:
+        raise BatchRequestError(f"Unsupported filter(s): {', '.join(unknown)}")
+
+    filters = {name: value for name, value in filters.items() if value not in (None, '')}
+    if not ids and not filters:
+        raise BatchRequestError("Provide 'ids' or at least one 'filter' value")
+
+    try:
+        ids = [int(row_id) for row_id in ids]
+    except (TypeError, ValueError):
+        raise BatchRequestError("'ids' must be integers")
+
+    query = model.query
+    if ids:
+        query = query.filter(model.id.in_(ids))
+    try:
+        query = apply_filters(query, {name: str(value) for name, value in filters.items()}, filterable_columns)
+    except PaginationError as e:
+        raise BatchRequestError(str(e))
+    return query.whereclause
+
+
+def batch_set_obsolete(model, key_column, condition, is_obsolete):
+    """
+    Set is_obsolete on every matching row in one UPDATE ... RETURNING.
+    Returns [(id, key), ...] of the rows that changed.
+    """
+    result = db.session.execute(
+        update(model)
+        .where(condition, model.is_obsolete.isnot(is_obsolete))
+        .values(is_obsolete=is_obsolete, updated_at=datetime.utcnow(), updated_by=_current_user_id())
+        .returning(model.id, key_column)
+        .execution_options(synchronize_session=False)
+    )
+    return [tuple(row) for row in result]
+
+
+def batch_delete(model, key_column, condition):
+    """
+    Delete every matching row in one DELETE ... RETURNING and write their
+    change-feed tombstones in a single executemany INSERT.
+    Returns [(id, key), ...] of the deleted rows.
+    """
+    deleted = [tuple(row) for row in db.session.execute(
+        delete(model)
+        .where(condition)
+        .returning(model.id, key_column)
+        .execution_options(synchronize_session=False)
+    )]
+    if deleted:
+        now, user_id = datetime.utcnow(), _current_user_id()
+        db.session.execute(insert(DeletedRecord), [{
+            'table_name': model.__tablename__,
+            'record_id': row_id,
+            'record_key': key,
+            'deleted_at': now,
+            'deleted_by': user_id
+        } for row_id, key in deleted])
+    return deleted
+
+
+def batch_summary(verb, noun, rows, data):
+    """One audit line for the whole batch, e.g. 'Obsoleted 3 items (protocol_number=P-1): A, B, C'"""
+    filters = (data or {}).get('filter') or {}
+    scope = ', '.join(f"{name}={value}" for name, value in sorted(filters.items()))
+    keys = [str(key) for _, key in rows]
+    preview = ', '.join(keys[:AUDIT_KEY_PREVIEW])
+    if len(keys) > AUDIT_KEY_PREVIEW:
+        preview += f" ... and {len(keys) - AUDIT_KEY_PREVIEW} more"
+    return f"{verb} {len(rows)} {noun}" + (f" ({scope})" if scope else '') + (f": {preview}" if preview else '')
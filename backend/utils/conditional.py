@@ -0,0 +1,159 @@
+# backend/utils/conditional.py
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+from flask import g, make_response, request
+from sqlalchemy import event, insert, update # type: ignore
+from sqlalchemy.exc import IntegrityError # type: ignore
+from sqlalchemy.orm import Session # type: ignore
+from ..models import CollectionVersion, ItemNumber, ReceivingData, Role, User
+
+# Tables whose writes bump their collection version
+VERSIONED_TABLES = {model.__tablename__ for model in (ItemNumber, ReceivingData, User, Role)}
+
+
+def _bump_versions(connection, names):
+    """Increment the version row of each name on `connection`"""
+    now = datetime.utcnow()
+    for name in sorted(names):
+        result = connection.execute(
+            update(CollectionVersion.__table__)
+            .where(CollectionVersion.__table__.c.name == name)
+            .values(version=CollectionVersion.__table__.c.version + 1, updated_at=now)
+        )
+        if result.rowcount:
+            continue
+        try:
+            with connection.begin_nested():
+                connection.execute(insert(CollectionVersion.__table__).values(name=name, version=1, updated_at=now))
+        except IntegrityError:
+            # Another transaction created the row first
+            connection.execute(
+                update(CollectionVersion.__table__)
+                .where(CollectionVersion.__table__.c.name == name)
+                .values(version=CollectionVersion.__table__.c.version + 1, updated_at=now)
+            )
+
+
+def _pending_versions(session):
+    return session.info.setdefault('pending_collection_versions', set())
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_after_flush(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        tablename = getattr(obj, '__tablename__', None)
+        if tablename in VERSIONED_TABLES:
+            _pending_versions(session).add(tablename)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_on_bulk_statement(orm_execute_state):
+    # Bulk insert()/update()/delete() statements bypass the unit of work
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.local_table.name in VERSIONED_TABLES:
+        _pending_versions(orm_execute_state.session).add(mapper.local_table.name)
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_after_commit(session):
+    """
+    Bump the versions written by the committed transaction in a short
+    transaction of its own, so concurrent writers never queue on the
+    counter rows while their own transaction is open. Readers can only see
+    the new version after the data it stands for.
+    """
+    if session.get_nested_transaction() is not None:
+        # A released savepoint; the enclosing transaction may still roll back
+        return
+    names = session.info.pop('pending_collection_versions', None)
+    if not names:
+        return
+    try:
+        with session.get_bind().begin() as connection:
+            _bump_versions(connection, names)
+    except Exception as e:
+        # The data is committed; a missed bump only delays cache revalidation
+        print(f"⚠️ Collection version bump failed for {sorted(names)}: {str(e)}")
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _discard_after_rollback(session, transaction):
+    # after_commit has already taken the names of a committed transaction
+    if transaction.parent is None:
+        session.info.pop('pending_collection_versions', None)
+
+
+def collection_versions(names):
+    """Return {name: (version, updated_at)} in one primary-key lookup"""
+    rows = CollectionVersion.query.filter(CollectionVersion.name.in_(names)).all()
+    versions = {name: (0, None) for name in names}
+    for row in rows:
+        versions[row.name] = (row.version, row.updated_at)
+    return versions
+
+
+def _http_datetime(value):
+    """Naive UTC datetime -> aware, second-precision (HTTP dates have no fractions)"""
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def _is_not_modified(etag, last_modified):
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def conditional_response(etag, last_modified, build_response):
+    """
+    Answer with 304 when the client's validators match, otherwise call
+    build_response() and attach ETag / Last-Modified to its 200 response.
+    """
+    last_modified = _http_datetime(last_modified)
+
+    if request.method in ('GET', 'HEAD') and _is_not_modified(etag, last_modified):
+        response = make_response('', 304)
+    else:
+        response = make_response(build_response())
+        if response.status_code != 200:
+            return response
+
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Authenticated data: browsers may keep it but must revalidate every time
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def row_etag(prefix, row_id, updated_at):
+    stamp = updated_at.isoformat() if updated_at else 'none'
+    return f'{prefix}-{row_id}-{stamp}'
+
+
+def conditional_collection(*names):
+    """
+    Decorator for list endpoints backed by the given tables. The ETag combines
+    each collection version with the full query string, so every filter or page
+    gets its own validator, and a 304 is sent before the view runs. The
+    Last-Modified value is left in g.collection_last_modified for the view.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            versions = collection_versions(list(names))
+            token = '|'.join(f'{name}:{versions[name][0]}' for name in names)
+            etag = hashlib.sha1(f'{token}|{request.full_path}'.encode('utf-8')).hexdigest()
+            stamps = [stamp for _, stamp in versions.values() if stamp is not None]
+            last_modified = max(stamps) if stamps else None
+            g.collection_last_modified = last_modified
+            return conditional_response(etag, last_modified, lambda: fn(*args, **kwargs))
+        return wrapper
+    return decorator
@@ -0,0 +1,152 @@
+# backend/utils/form_data.py
+from sqlalchemy.orm import joinedload # type: ignore
+from ..models import ReceivingData
+from .form_schemas import FORM_SCHEMAS
+
+FORM_TYPES = ('501A', '519A', '520B')
+
+# Request-body key holding the receiving number of each form
+RECEIVING_KEYS = {'501A': 'receiving_no', '519A': 'receiving_no', '520B': 'RN'}
+
+# Fields a /generate-pdf/<form> body must carry before rendering
+REQUIRED_FIELDS = {form_type: schema.required for form_type, schema in FORM_SCHEMAS.items()}
+
+# HTMLToPDFHandler method rendering each form
+GENERATOR_METHODS = {
+    '501A': 'generate_501a_pdf',
+    '519A': 'generate_519a_pdf',
+    '520B': 'generate_520b_pdf'
+}
+
+# Fields only a person can supply (checkboxes, dates, signatures, log rows).
+# In server-assembly mode these are the only keys taken from the request.
+MANUAL_FIELDS = {
+    '501A': ('locationStatus', 'dateType', 'dateValue', 'completedBy', 'transactions', 'comments'),
+    '519A': ('date_time_received', 'container_no', 'record_created_by', 'record_created_date', 'drug_movements'),
+    '520B': (
+        'deliveryAcceptance', 'deliveryAcceptanceNA', 'deliveryCompletedBy', 'dateType', 'dateValue',
+        'receivingCompletedBy', 'documentVerification', 'issuesSection', 'NCMR', 'Comments'
+    )
+}
+
+
+def load_receiving_with_item(receiving_no):
+    """ReceivingData row and its ItemNumber (via the `item` backref) in one JOIN"""
+    return (ReceivingData.query
+            .options(joinedload(ReceivingData.item))
+            .filter_by(receiving_no=receiving_no)
+            .first())
+
+
+def _value(row, attribute, default=''):
+    value = getattr(row, attribute, None) if row is not None else None
+    return default if value is None else value
+
+
+# Each builder returns the database-backed fields of a form, keyed exactly as
+# the matching /generate-pdf/<form> request body (and its template) expects.
+
+def prefill_501a(receiving, item):
+    units = _value(receiving, 'total_units_received')
+    return {
+        'receiving_no': receiving.receiving_no,
+        'item_no': receiving.item_number,
+        'item_description': _value(item, 'description'),
+        'client_name': _value(item, 'client'),
+        'vendor_name': _value(item, 'vendor'),
+        'lot_no': _value(receiving, 'lot_no'),
+        'storage_conditions': _value(item, 'temp_storage_conditions'),
+        'other_storage_conditions': _value(item, 'other_storage_conditions'),
+        # Shown with its unit of measure, as Form501A does
+        'total_units_received': f"{units} {_value(item, 'uom')}".strip(),
+        'controlled_substance': _value(item, 'controlled')
+    }
+
+
+def prefill_519a(receiving, item):
+    return {
+        'receiving_no': receiving.receiving_no,
+        'item_no': receiving.item_number,
+        'item_description': _value(item, 'description'),
+        'lot_no': _value(receiving, 'lot_no'),
+        'storage_conditions': _value(item, 'temp_storage_conditions'),
+        'other_storage_conditions': _value(item, 'other_storage_conditions'),
+        'max_exposure_time': _value(item, 'max_exposure_time'),
+        'temper_time': _value(item, 'temper_time'),
+        'working_exposure_time': _value(item, 'working_exposure_time'),
+        'temp_device_alarm': _value(receiving, 'temp_device_in_alarm', 'No'),
+        'temp_device_deactivated': _value(receiving, 'temp_device_deactivated', 'No'),
+        'temp_device_returned': _value(receiving, 'temp_device_returned_to_courier', 'No'),
+        'total_units_per_container': _value(receiving, 'total_units_vendor')
+    }
+
+
+def prefill_520b(receiving, item):
+    return {
+        'Item No': receiving.item_number,
+        'Tracking No': _value(receiving, 'tracking_number'),
+        'Client Name': _value(item, 'client'),
+        'Item Description': _value(item, 'description'),
+        'Storage Conditions:Temperature': _value(item, 'temp_storage_conditions'),
+        'Other': _value(item, 'other_storage_conditions'),
+        'RN': receiving.receiving_no,
+        'Lot No': _value(receiving, 'lot_no'),
+        'PO No': _value(receiving, 'po_no'),
+        'Protocol No': _value(item, 'protocol_number'),
+        'Vendor': _value(item, 'vendor'),
+        'UoM': _value(item, 'uom'),
+        'Total Units (vendor count)': _value(receiving, 'total_units_vendor'),
+        'Total Storage Containers': _value(receiving, 'total_storage_containers')
+    }
+
+
+PREFILL_BUILDERS = {
+    '501A': prefill_501a,
+    '519A': prefill_519a,
+    '520B': prefill_520b
+}
+
+
+def assemble_form_data(form_type, data):
+    """
+    Build a complete /generate-pdf/<form> body from the receiving number and
+    the manual fields in `data`; every database-backed field comes from one
+    joined query, never from the client. Raises ValueError when the
+    receiving number is missing and LookupError when it is unknown.
+    """
+    data = data or {}
+    receiving_no = str(data.get(RECEIVING_KEYS[form_type]) or data.get('receiving_no') or '').strip()
+    if not receiving_no:
+        raise ValueError(f"Required fields missing: {RECEIVING_KEYS[form_type]}")
+
+    receiving = load_receiving_with_item(receiving_no)
+    if not receiving:
+        raise LookupError(f"Receiving data not found: {receiving_no}")
+    return _assemble(form_type, receiving, data)
+
+
+def _assemble(form_type, receiving, data):
+    assembled = {name: data[name] for name in MANUAL_FIELDS[form_type] if name in data}
+    assembled.update(PREFILL_BUILDERS[form_type](receiving, receiving.item))
+    return assembled
+
+
+def assemble_packet_data(receiving_no, fields=None, forms=FORM_TYPES):
+    """
+    Request bodies for several forms of one receiving from a single joined
+    query; `fields` maps each form to its manual fields. Returns
+    {form: body} in `forms` order and raises like assemble_form_data.
+    """
+    fields = fields or {}
+    receiving_no = str(receiving_no or '').strip()
+    if not receiving_no:
+        raise ValueError("Required fields missing: receiving_no")
+
+    receiving = load_receiving_with_item(receiving_no)
+    if not receiving:
+        raise LookupError(f"Receiving data not found: {receiving_no}")
+    return {form_type: _assemble(form_type, receiving, fields.get(form_type) or {}) for form_type in forms}
+
+
+def missing_required_fields(form_type, data):
+    return FORM_SCHEMAS[form_type].missing(data)
@@ -0,0 +1,184 @@
+# backend/utils/form_schemas.py
+"""
+Declarative field schemas of forms 501A, 519A and 520B.
+
+Each schema lists the template-context fields of a form and where each one
+comes from in the /generate-pdf/<form> request body. A schema is compiled
+once, at import, into a mapper (request body -> template context, one pass
+over the fields) and a validator (missing required fields). The HTML
+templates, the ReportLab engine and the form routes all use this context,
+so adding a form means adding a schema here.
+"""
+
+
+def checkbox(value):
+    """'checked' or '' for the templates' checkbox inputs"""
+    if isinstance(value, bool):
+        return 'checked' if value else ''
+    return 'checked' if str(value).lower() in ('true', 'yes', '1') else ''
+
+
+def minutes(value):
+    return f"{value} (min)"
+
+
+def _mapping(value):
+    return value if isinstance(value, dict) else {}
+
+
+class Text:
+    """body[source] (default `default`), optionally passed through `convert`"""
+
+    def __init__(self, key, source=None, default='', convert=None):
+        self.key = key
+        self.source = source or key
+        self.default = default
+        self.convert = convert
+
+    def compile(self):
+        source, default, convert = self.source, self.default, self.convert
+        if convert is None:
+            return lambda body: body.get(source, default)
+        return lambda body: convert(body.get(source, default))
+
+
+class Checks:
+    """
+    A group of checkboxes sent as {name: bool} under body[source]. Rendered
+    as [{'name', 'checked'}] in `names` order, or as {name: 'checked'|''}
+    when `as_list` is false.
+    """
+
+    def __init__(self, key, names, source=None, as_list=True):
+        self.key = key
+        self.names = tuple(names)
+        self.source = source or key
+        self.as_list = as_list
+
+    def compile(self):
+        source, names = self.source, self.names
+        if self.as_list:
+            def get(body):
+                values = _mapping(body.get(source))
+                return [{'name': name, 'checked': checkbox(values.get(name, False))} for name in names]
+        else:
+            def get(body):
+                values = _mapping(body.get(source))
+                return {name: checkbox(values.get(name, False)) for name in names}
+        return get
+
+
+class Rows:
+    """A list of row dicts under body[source], each reduced to `columns` (default '')"""
+
+    def __init__(self, key, columns, source=None):
+        self.key = key
+        self.columns = tuple(columns)
+        self.source = source or key
+
+    def row(self, row):
+        return {column: row.get(column, '') for column in self.columns}
+
+    def compile(self):
+        source, row = self.source, self.row
+        return lambda body: [row(item) for item in body.get(source) or []]
+
+
+class FormSchema:
+    def __init__(self, form_type, fields, required=()):
+        self.form_type = form_type
+        self.fields = {field.key: field for field in fields}
+        self.required = tuple(required)
+        self._getters = tuple((field.key, field.compile()) for field in fields)
+
+    def context(self, body):
+        """Template context of the form from a request body"""
+        return {key: get(body) for key, get in self._getters}
+
+    def missing(self, body):
+        """Required request-body fields that are absent or empty"""
+        return [name for name in self.required if not body.get(name)]
+
+
+MOVEMENT_COLUMNS = ('destination', 'date', 'time', 'exposure_time', 'cumulative_et', 'completed_by', 'verified_by')
+
+FORM_SCHEMAS = {
+    '501A': FormSchema('501A', [
+        Text('receiving_no'),
+        Text('item_no'),
+        Text('item_description'),
+        Text('client_name'),
+        Text('vendor_name'),
+        Text('lot_no'),
+        Text('storage_conditions'),
+        Text('other_storage_conditions'),
+        Text('total_units_received'),
+        Text('controlled_substance'),
+        Checks('locationStatus', ('quarantine', 'rejected', 'released'), as_list=False),
+        Text('dateType'),
+        Text('dateValue'),
+        Text('completedBy'),
+        Text('transactions', default=[]),
+        Text('comments')
+    ], required=('receiving_no', 'item_no')),
+
+    '519A': FormSchema('519A', [
+        Text('receiving_no'),
+        Text('item_no'),
+        Text('item_description'),
+        Text('lot_no'),
+        Text('storage_conditions'),
+        Text('date_time_received'),
+        Text('other_storage_conditions'),
+        Text('temp_device_alarm'),
+        Text('temp_device_deactivated'),
+        Text('temp_device_returned'),
+        Text('max_exposure_time', convert=minutes),
+        Text('temper_time', convert=minutes),
+        Text('working_exposure_time', convert=minutes),
+        Text('container_no'),
+        Text('total_units_per_container'),
+        Text('record_created_by'),
+        Text('record_created_date'),
+        Rows('drug_movements', MOVEMENT_COLUMNS)
+    ], required=('receiving_no', 'item_no')),
+
+    '520B': FormSchema('520B', [
+        Text('item_no', 'Item No'),
+        Text('tracking_no', 'Tracking No'),
+        Text('client_name', 'Client Name'),
+        Text('item_description', 'Item Description'),
+        Text('storage_conditions_temp', 'Storage Conditions:Temperature'),
+        Text('storage_conditions_other', 'Other'),
+        Text('receiving_no', 'RN'),
+        Text('lot_no', 'Lot No'),
+        Text('po_no', 'PO No'),
+        Text('protocol_no', 'Protocol No'),
+        Text('vendor', 'Vendor'),
+        Text('uom', 'UoM'),
+        Text('total_units', 'Total Units (vendor count)'),
+        Text('total_containers', 'Total Storage Containers'),
+        Checks('deliveryAcceptance', (
+            'Item numbers match shipping documentation',
+            'Lot numbers match shipping documentation',
+            'Quantity matches shipping documentation',
+            'Shipping container is intact',
+            'Product container(s) is/are intact',
+            'Temperature recording device included',
+            'Temperature has been maintained'
+        )),
+        Checks('deliveryAcceptanceNA', ('material_placed', 'temperature_maintained', 'device_included'), as_list=False),
+        Text('dateType'),
+        Text('dateValue'),
+        Text('receivingCompletedBy'),
+        Checks('documentVerification', ('COA #', 'SDS #', 'Invoice', 'Other (Specify)')),
+        Checks('issuesSection', (
+            'Quantity discrepancies found',
+            'Damage to shipping container(s)',
+            'Damage to product within shipping container',
+            'Temperature excursion'
+        )),
+        Text('ncmr', 'NCMR', default='N/A'),
+        Text('comments', 'Comments')
+    ], required=('Item No', 'RN'))
+}
@@ -0,0 +1,324 @@
+# backend/utils/generated_sweeper.py
+import json
+import os
+import re
+import threading
+import time
+import traceback
+import zipfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Try to import fcntl with fallback (POSIX only; keeps gunicorn workers from sweeping at once)
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+GENERATED_DIR = Path(__file__).parent.parent / 'generated'
+
+DEFAULT_RETENTION_HOURS = 24          # live PDFs older than this are archived
+DEFAULT_ARCHIVE_RETENTION_DAYS = 90   # day archives older than this are deleted
+DEFAULT_GENERATED_MAX_MB = 2048       # live PDFs + archives (the cache has its own budget)
+DEFAULT_SWEEP_INTERVAL_SECONDS = 900
+
+# Never touch a file younger than this: it may still be being written or sent
+MIN_FILE_AGE_SECONDS = 300
+
+# "<prefix>_YYYYMMDD_HHMMSS[_<suffix>].pdf", as written by HTMLToPDFHandler._write_generated
+NAME_DATE = re.compile(r'_(\d{8})_\d{6}(?:_[0-9a-f]+)?\.pdf$')
+
+# Leftovers of the /debug-pdf and /test-pdf endpoints, deleted rather than archived
+DEBUG_FILE_PREFIX = 'test_'
+
+
+class GeneratedSweeper:
+    """
+    Keeps generated/ bounded.
+
+    Each sweep moves PDFs older than the retention period into per-day ZIP
+    archives under generated/archive (YYYY-MM-DD.zip, by file mtime) and
+    records them in that day's index (YYYY-MM-DD.jsonl), so an archived PDF
+    can still be found by its original name without reading every index. Archives past their own retention are
+    deleted, then the oldest archives (and, as a last resort, the oldest
+    live files) go until everything fits in `max_bytes`. `protected` returns
+    the names of live files that must never be deleted that way (PDF job
+    outputs still to be downloaded); they wait to be archived instead.
+    """
+
+    def __init__(self, generated_dir, retention_hours=DEFAULT_RETENTION_HOURS,
+                 archive_retention_days=DEFAULT_ARCHIVE_RETENTION_DAYS,
+                 max_bytes=DEFAULT_GENERATED_MAX_MB * 1024 * 1024, protected=None):
+        self.generated_dir = Path(generated_dir)
+        self.archive_dir = self.generated_dir / 'archive'
+        self.retention_seconds = retention_hours * 3600
+        self.archive_retention_days = archive_retention_days
+        self.max_bytes = max_bytes
+        self.protected = protected
+
+        self._lock = threading.Lock()
+        self._last_sweep = None
+        self._totals = {'sweeps': 0, 'archived': 0, 'deleted_files': 0, 'deleted_archives': 0}
+
+    # -- scanning -----------------------------------------------------------
+
+    def _live_files(self):
+        """(mtime, size, path) of the PDFs directly in generated/, oldest first"""
+        files = []
+        if not self.generated_dir.exists():
+            return files
+        with os.scandir(self.generated_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith('.pdf'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+        return sorted(files)
+
+    def _archives(self):
+        """(day, size, path) of the day archives, oldest first"""
+        if not self.archive_dir.exists():
+            return []
+        return sorted(
+            (path.stem, path.stat().st_size, path)
+            for path in self.archive_dir.glob('????-??-??.zip')
+        )
+
+    # -- index --------------------------------------------------------------
+
+    def _index_path(self, day):
+        return self.archive_dir / f"{day}.jsonl"
+
+    def _append_index(self, day, records):
+        with open(self._index_path(day), 'a', encoding='utf-8') as index:
+            for record in records:
+                index.write(json.dumps(record) + '\n')
+
+    def _candidate_days(self, name, day=None):
+        """
+        Days whose index may list `name`, most likely first: around `day` (a
+        date or datetime, such as a job's finished_at), else around the date
+        _write_generated stamped into the name, else every archived day
+        """
+        if day is None:
+            stamp = NAME_DATE.search(name)
+            if stamp:
+                day = datetime.strptime(stamp.group(1), '%Y%m%d')
+        if day is None:
+            return sorted((path.stem for path in self.archive_dir.glob('????-??-??.jsonl')), reverse=True)
+        # Archive days follow local file mtimes; the hint may be UTC or a little earlier
+        return [(day + timedelta(days=offset)).strftime('%Y-%m-%d') for offset in (0, 1, -1)]
+
+    def find_archived(self, name, day=None):
+        """
+        Index record of an archived PDF by its original file name, or None.
+        Only the day indexes near `day` (or the date in the name) are read.
+        """
+        for candidate in self._candidate_days(name, day):
+            try:
+                index = open(self._index_path(candidate), encoding='utf-8')
+            except FileNotFoundError:
+                continue
+            found = None
+            with index:
+                for line in index:
+                    if f'"{name}"' in line:
+                        record = json.loads(line)
+                        if record['name'] == name:
+                            found = record
+            if found:
+                return found
+        return None
+
+    def read_archived(self, name, day=None):
+        """Bytes of an archived PDF, or None if it is not (or no longer) archived"""
+        record = self.find_archived(name, day)
+        if not record:
+            return None
+        try:
+            with zipfile.ZipFile(self.archive_dir / record['archive']) as archive:
+                return archive.read(record['member'])
+        except (FileNotFoundError, KeyError):
+            return None
+
+    # -- sweeping -----------------------------------------------------------
+
+    def _archive(self, files):
+        """Move files into their day archive; returns how many were archived"""
+        by_day = {}
+        for mtime, size, path in files:
+            by_day.setdefault(datetime.fromtimestamp(mtime).strftime('%Y-%m-%d'), []).append((mtime, size, path))
+
+        archived = 0
+        for day, day_files in sorted(by_day.items()):
+            archive_name = f"{day}.zip"
+            records = []
+            with zipfile.ZipFile(self.archive_dir / archive_name, 'a', zipfile.ZIP_DEFLATED) as archive:
+                members = set(archive.namelist())
+                for mtime, size, path in day_files:
+                    # Already stored by a sweep that stopped before deleting it
+                    if path.name not in members:
+                        archive.write(path, path.name)
+                        members.add(path.name)
+                        records.append({
+                            'name': path.name, 'archive': archive_name, 'member': path.name,
+                            'size': size, 'mtime': int(mtime)
+                        })
+            self._append_index(day, records)
+            for _, _, path in day_files:
+                path.unlink(missing_ok=True)
+                archived += 1
+        return archived
+
+    def _sweep(self, now):
+        result = {'archived': 0, 'deleted_files': 0, 'deleted_archives': 0}
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+
+        settled = [f for f in self._live_files() if now - f[0] >= MIN_FILE_AGE_SECONDS]
+        debug_files = [f for f in settled if f[2].name.startswith(DEBUG_FILE_PREFIX)]
+        for _, _, path in debug_files:
+            path.unlink(missing_ok=True)
+        result['deleted_files'] += len(debug_files)
+
+        expired = [f for f in settled if not f[2].name.startswith(DEBUG_FILE_PREFIX)
+                   and now - f[0] >= self.retention_seconds]
+        result['archived'] = self._archive(expired)
+
+        # Archives past retention, then the oldest ones while over budget
+        cutoff_day = datetime.fromtimestamp(now - self.archive_retention_days * 86400).strftime('%Y-%m-%d')
+        archives = self._archives()
+        live = self._live_files()
+        total = sum(size for _, size, _ in archives) + sum(size for _, size, _ in live)
+        removed = []
+        for day, size, path in archives:
+            if day >= cutoff_day and total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            self._index_path(day).unlink(missing_ok=True)
+            removed.append(path.name)
+            total -= size
+        result['deleted_archives'] = len(removed)
+
+        # Still over budget with no archives left: drop the oldest live PDFs
+        # no job points at
+        keep = self.protected() if self.protected and total > self.max_bytes else set()
+        for mtime, size, path in live:
+            if total <= self.max_bytes or now - mtime < MIN_FILE_AGE_SECONDS:
+                break
+            if path.name in keep:
+                continue
+            path.unlink(missing_ok=True)
+            result['deleted_files'] += 1
+            total -= size
+
+        result['total_bytes'] = total
+        return result
+
+    def sweep(self, now=None):
+        """Run one sweep unless another thread or process is already sweeping"""
+        now = time.time() if now is None else now
+        # Nothing persisted yet (in-memory rendering only)
+        if not self.generated_dir.exists():
+            return None
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            self.archive_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.archive_dir / '.lock', 'w') as lock_file:
+                if FCNTL_AVAILABLE:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        return None
+                started = time.monotonic()
+                result = self._sweep(now)
+            result.update(
+                finished_at=datetime.utcnow().isoformat(),
+                duration_ms=round((time.monotonic() - started) * 1000, 1)
+            )
+            self._last_sweep = result
+            self._totals['sweeps'] += 1
+            for name in ('archived', 'deleted_files', 'deleted_archives'):
+                self._totals[name] += result[name]
+            return result
+        finally:
+            self._lock.release()
+
+    def stats(self):
+        live = self._live_files()
+        archives = self._archives()
+        return {
+            'live_files': len(live),
+            'live_bytes': sum(size for _, size, _ in live),
+            'archives': len(archives),
+            'archive_bytes': sum(size for _, size, _ in archives),
+            'oldest_archive': archives[0][0] if archives else None,
+            'max_bytes': self.max_bytes,
+            'retention_hours': self.retention_seconds / 3600,
+            'archive_retention_days': self.archive_retention_days,
+            'last_sweep': self._last_sweep,
+            'totals': dict(self._totals)
+        }
+
+
+class _SweeperThread(threading.Thread):
+
+    def __init__(self, sweeper, interval):
+        super().__init__(name='generated-sweeper', daemon=True)
+        self.sweeper = sweeper
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while True:
+            try:
+                self.sweeper.sweep()
+            except Exception as e:
+                print(f"❌ Generated directory sweep failed: {str(e)}")
+                traceback.print_exc()
+            if self._stop_event.wait(self.interval):
+                return
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_sweeper_lock = threading.Lock()
+
+
+def ensure_generated_sweeper(app, generated_dir=GENERATED_DIR, protected=None):
+    """This process's sweeper for `generated_dir`, created once (see start_generated_sweeper)"""
+    sweeper = app.extensions.get('generated_sweeper')
+    if sweeper is None:
+        with _sweeper_lock:
+            sweeper = app.extensions.get('generated_sweeper')
+            if sweeper is None:
+                config = app.config
+                sweeper = GeneratedSweeper(
+                    generated_dir,
+                    retention_hours=config.get('PDF_RETENTION_HOURS', DEFAULT_RETENTION_HOURS),
+                    archive_retention_days=config.get('PDF_ARCHIVE_RETENTION_DAYS', DEFAULT_ARCHIVE_RETENTION_DAYS),
+                    max_bytes=int(config.get('PDF_GENERATED_MAX_MB', DEFAULT_GENERATED_MAX_MB)) * 1024 * 1024,
+                    protected=protected
+                )
+                app.extensions['generated_sweeper'] = sweeper
+    return sweeper
+
+
+def start_generated_sweeper(app, generated_dir=GENERATED_DIR, protected=None):
+    """
+    Create the sweeper and start its background thread once per process.
+    Called from app setup, so generated/ is swept whether or not it existed
+    when the first PDF was written.
+    """
+    sweeper = ensure_generated_sweeper(app, generated_dir, protected)
+    with _sweeper_lock:
+        interval = app.config.get('PDF_SWEEP_INTERVAL_SECONDS', DEFAULT_SWEEP_INTERVAL_SECONDS)
+        if interval and 'generated_sweeper_thread' not in app.extensions:
+            thread = _SweeperThread(sweeper, interval)
+            thread.start()
+            app.extensions['generated_sweeper_thread'] = thread
+    return sweeper
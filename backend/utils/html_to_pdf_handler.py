@@ -1,18 +1,91 @@
 # backend/utils/html_to_pdf_handler.py - Replace your entire file with this:
-from flask import render_template
+from flask import current_app, render_template
 import pdfkit # type: ignore
 from pathlib import Path
 from datetime import datetime
+import io
+import math
 import os
+import threading
+import uuid
+from contextlib import contextmanager
+from itertools import islice
+from .form_schemas import FORM_SCHEMAS
+from .generated_sweeper import GENERATED_DIR
+from .pdf_cache import DEFAULT_CACHE_MAX_MB, PdfCache
+from .pdf_metrics import PdfMetrics, StageTimer
+from .pdf_optimize import PdfOptimizer
+from . import reportlab_forms
+from .pdf_renderer import (
+    DEFAULT_MAX_IDLE_SECONDS, DEFAULT_MEMORY_LIMIT_MB, DEFAULT_POOL_SIZE,
+    DEFAULT_QUEUE_SIZE, DEFAULT_RENDER_TIMEOUT, RendererBusy, RendererPool
+)
+
+# Try to import pdfrw with fallback (joins the chunks of a paginated 519A)
+try:
+    from pdfrw import PdfReader, PdfWriter # type: ignore
+    PDFRW_AVAILABLE = True
+except ImportError:
+    PDFRW_AVAILABLE = False
+
+# 'wkhtmltopdf': Jinja templates rendered by the wkhtmltopdf process pool
+# 'reportlab': the same forms drawn in-process by utils/reportlab_forms.py
+PDF_ENGINES = ('wkhtmltopdf', 'reportlab')
+DEFAULT_PDF_ENGINE = 'wkhtmltopdf'
+
+# Long 519A drug-movement histories are rendered a few pages at a time
+DEFAULT_519A_ROWS_PER_PAGE = 20
+DEFAULT_519A_PAGES_PER_RENDER = 10
+DEFAULT_519A_PAGINATE_ABOVE = 100
+
+
+def _minutes(value):
+    """Leading number of an exposure time such as 15, '15' or '15 (min)', or None"""
+    try:
+        return float(str(value).split()[0])
+    except (ValueError, IndexError):
+        return None
+
+
+def paginate_movements(movements, rows_per_page):
+    """
+    Split 519A drug movements into pages of `rows_per_page`, yielding
+    (chunk, carried_forward) where carried_forward is the cumulative
+    exposure time at the end of the previous pages (None on the first).
+    The running total follows each row's cumulative ET when it has one and
+    adds its exposure time otherwise. Rows are only read, never copied.
+    """
+    movements = iter(movements)
+    running, carried = None, None
+    while True:
+        chunk = list(islice(movements, rows_per_page))
+        if not chunk:
+            return
+        yield chunk, carried
+        for movement in chunk:
+            cumulative = _minutes(movement.get('cumulative_et', ''))
+            if cumulative is not None:
+                running = cumulative
+            else:
+                exposure = _minutes(movement.get('exposure_time', ''))
+                if exposure is not None:
+                    running = (running or 0) + exposure
+        carried = None if running is None else f"{running:g}"
 
 class HTMLToPDFHandler:
-    def __init__(self):
+    def __init__(self, config=None):
+        config = config or {}
         self.template_dir = Path(__file__).parent.parent / 'templates'
-        self.generated_dir = Path(__file__).parent.parent / 'generated'
-        self.generated_dir.mkdir(exist_ok=True)
+        self.generated_dir = GENERATED_DIR
+        # PDFs are rendered in memory; generated/ is only written to by the
+        # cache and, when PDF_PERSIST_GENERATED is on, the archive sink
+        self.persist_generated = bool(config.get('PDF_PERSIST_GENERATED', False))
+        self.engine = config.get('PDF_ENGINE', DEFAULT_PDF_ENGINE)
+        if self.engine not in PDF_ENGINES:
+            raise ValueError(f"Unknown PDF_ENGINE '{self.engine}'. Expected one of: {', '.join(PDF_ENGINES)}")
         
         # ✅ FIXED: Use the wkhtmltopdf we know exists on Render from diagnostics
-        self.config = pdfkit.configuration(wkhtmltopdf='/usr/bin/wkhtmltopdf')
+        self.config = pdfkit.configuration(wkhtmltopdf=config.get('WKHTMLTOPDF_PATH', '/usr/bin/wkhtmltopdf'))
         
         self.pdf_options = {
             'page-size': 'A4',
@@ -27,195 +100,327 @@ class HTMLToPDFHandler:
             'print-media-type': None
         }
 
-    def _format_boolean_value(self, value):
-        """Helper to safely handle boolean values"""
-        if isinstance(value, bool):
-            return 'checked' if value else ''
-        return 'checked' if str(value).lower() in ['true', 'yes', '1'] else ''
+        # Same argv pdfkit.from_string builds (HTML on stdin, PDF on stdout),
+        # run through a pool of pre-started wkhtmltopdf processes
+        command = pdfkit.PDFKit('', 'string', options=self.pdf_options, configuration=self.config).command()
+        self.renderer = RendererPool(
+            command,
+            size=config.get('PDF_RENDERER_POOL_SIZE', DEFAULT_POOL_SIZE),
+            queue_size=config.get('PDF_RENDERER_QUEUE_SIZE', DEFAULT_QUEUE_SIZE),
+            timeout=config.get('PDF_RENDER_TIMEOUT', DEFAULT_RENDER_TIMEOUT),
+            memory_limit_mb=config.get('PDF_RENDERER_MEMORY_MB', DEFAULT_MEMORY_LIMIT_MB),
+            max_idle_seconds=config.get('PDF_RENDERER_MAX_IDLE_SECONDS', DEFAULT_MAX_IDLE_SECONDS),
+            env=self.config.environ
+        )
 
-    def generate_501a_pdf(self, data):
+        # Identical template + data → identical PDF, served without rendering
+        self.cache = PdfCache(
+            self.generated_dir / 'cache',
+            int(config.get('PDF_CACHE_MAX_MB', DEFAULT_CACHE_MAX_MB)) * 1024 * 1024
+        )
+
+        # Resource dedupe, stream compression and (with qpdf) linearization
+        self.optimizer = PdfOptimizer(
+            enabled=config.get('PDF_OPTIMIZE', True),
+            linearize=config.get('PDF_LINEARIZE', True),
+            qpdf_path=config.get('QPDF_PATH')
+        )
+
+        # Stage timings, latency histograms and byte counts per form type
+        self.metrics = PdfMetrics(log=config.get('PDF_METRICS_LOG', True))
+
+        self.rows_per_page_519a = int(config.get('PDF_519A_ROWS_PER_PAGE', DEFAULT_519A_ROWS_PER_PAGE))
+        self.pages_per_render_519a = int(config.get('PDF_519A_PAGES_PER_RENDER', DEFAULT_519A_PAGES_PER_RENDER))
+        self.paginate_above_519a = int(config.get('PDF_519A_PAGINATE_ABOVE', DEFAULT_519A_PAGINATE_ABOVE))
+
+    @contextmanager
+    def _timed(self, form_type, timer):
+        """
+        The caller's StageTimer (a route records it once the response is
+        sent), or a new one recorded here when the call ends (batch, jobs)
+        """
+        if timer is not None:
+            yield timer
+            return
+        timer = StageTimer(form_type)
         try:
-            print(f"🔄 Generating 501A PDF for receiving: {data.get('receiving_no', 'unknown')}")
-            
-            template_data = {
-                'receiving_no': data.get('receiving_no', ''),
-                'item_no': data.get('item_no', ''),
-                'item_description': data.get('item_description', ''),
-                'client_name': data.get('client_name', ''),
-                'vendor_name': data.get('vendor_name', ''),
-                'lot_no': data.get('lot_no', ''),
-                'storage_conditions': data.get('storage_conditions', ''),
-                'other_storage_conditions': data.get('other_storage_conditions', ''),
-                'total_units_received': data.get('total_units_received', ''),
-                'controlled_substance': data.get('controlled_substance', ''),
-                'locationStatus': {
-                    'quarantine': self._format_boolean_value(data.get('locationStatus', {}).get('quarantine', False)),
-                    'rejected': self._format_boolean_value(data.get('locationStatus', {}).get('rejected', False)),
-                    'released': self._format_boolean_value(data.get('locationStatus', {}).get('released', False))
-                },
-                'dateType': data.get('dateType', ''),
-                'dateValue': data.get('dateValue', ''),
-                'completedBy': data.get('completedBy', ''),
-                'transactions': data.get('transactions', []),
-                'comments': data.get('comments', '')
-            }
-            
-            print(f"📝 Rendering template with data keys: {list(template_data.keys())}")
-            rendered_html = render_template('501A.html', **template_data)
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_path = self.generated_dir / f"501A_{data.get('receiving_no', 'unknown')}_{timestamp}.pdf"
-            
-            print(f"🎯 Generating PDF to: {output_path}")
-            
-            pdfkit.from_string(
-                rendered_html,
-                str(output_path),
-                options=self.pdf_options,
-                configuration=self.config
+            yield timer
+        except Exception as e:
+            self.metrics.record_failure(timer, e)
+            raise
+        self.metrics.record(timer)
+
+    def _write_generated(self, file_prefix, pdf_bytes):
+        self.generated_dir.mkdir(exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Unique per call: a job's output must not be overwritten by the next render of the same receiving
+        output_path = self.generated_dir / f"{file_prefix}_{timestamp}_{uuid.uuid4().hex[:8]}.pdf"
+        output_path.write_bytes(pdf_bytes)
+        return output_path
+
+    def _render_pdf(self, form_type, template_data, file_prefix, as_path=False, engine=None, timer=None):
+        return self._render_pages(
+            [(form_type, template_data)], file_prefix, as_path=as_path, engine=engine, timer=timer
+        )
+
+    def _render_with_wkhtmltopdf(self, pages, timer):
+        with timer.stage('template'):
+            rendered = [render_template(f"{form_type}.html", **template_data) for form_type, template_data in pages]
+        with timer.stage('render'):
+            if len(rendered) == 1:
+                return self.renderer.render(rendered[0])
+            return self.renderer.render_many(rendered)
+
+    def _render_engine(self, pages, engine, timer):
+        """PDF bytes for `pages` from one call to `engine`"""
+        if engine == 'reportlab':
+            if not reportlab_forms.REPORTLAB_AVAILABLE:
+                raise Exception("ReportLab engine selected but reportlab is not installed")
+            with timer.stage('render'):
+                pdf_bytes = reportlab_forms.render_forms(pages)
+        else:
+            pdf_bytes = self._render_with_wkhtmltopdf(pages, timer)
+        if not pdf_bytes:
+            raise Exception("PDF renderer returned no output")
+        return pdf_bytes
+
+    def _resolve_engine(self, engine, timer):
+        engine = engine or self.engine
+        if engine not in PDF_ENGINES:
+            raise ValueError(f"Unknown PDF engine '{engine}'. Expected one of: {', '.join(PDF_ENGINES)}")
+        timer.engine = engine
+        return engine
+
+    def _cached_render(self, form_types, key_data, render, file_prefix, as_path, engine, timer):
+        """
+        Serve a PDF from the cache, or produce it with `render()`, optimize
+        it and copy the bytes to the enabled sinks (cache, archive). Returns
+        an io.BytesIO, or with `as_path` a file Path of its own under
+        generated/ (never the cache file, which may be evicted at any time).
+        """
+        key = None
+        pdf_bytes = None
+        if self.cache.enabled:
+            # The ReportLab "template" is the module that draws the forms
+            sources = (
+                [self.template_dir / f"{form_type}.html" for form_type in form_types]
+                if engine == 'wkhtmltopdf' else [Path(reportlab_forms.__file__)]
             )
+            if engine != 'wkhtmltopdf':
+                key_data = {engine: key_data}
+            if self.optimizer.signature:
+                key_data = {'optimized': self.optimizer.signature, 'data': key_data}
+            with timer.stage('cache'):
+                key = self.cache.key(sources, key_data)
+                pdf_bytes = self.cache.get(key)
+            timer.cache_hit = pdf_bytes is not None
+            if pdf_bytes is not None:
+                print(f"♻️ PDF cache hit: {key}.pdf")
+
+        if pdf_bytes is None:
+            pdf_bytes = render()
+            print(f"✅ PDF rendered in memory ({len(pdf_bytes)} bytes)")
+            if self.optimizer.enabled:
+                with timer.stage('optimize'):
+                    pdf_bytes = self.optimizer.optimize(pdf_bytes)
+            if key:
+                try:
+                    with timer.stage('cache'):
+                        self.cache.put(key, pdf_bytes)
+                except OSError as e:
+                    # Read-only or full storage must not fail the request
+                    print(f"⚠️ PDF cache write failed: {str(e)}")
+            if self.persist_generated and not as_path:
+                with timer.stage('write'):
+                    self._write_generated(file_prefix, pdf_bytes)
+        timer.bytes = len(pdf_bytes)
+
+        if as_path:
+            with timer.stage('write'):
+                return self._write_generated(file_prefix, pdf_bytes)
+        return io.BytesIO(pdf_bytes)
+
+    def _render_pages(self, pages, file_prefix, as_path=False, engine=None, timer=None):
+        """
+        Render `pages`, a list of (form type, template data), into one PDF
+        with a single renderer call and return it as an io.BytesIO, or as a
+        file Path when `as_path` is set (background jobs download it later).
+        `engine` is one of PDF_ENGINES, defaulting to PDF_ENGINE. Stage
+        times and the PDF size go into `timer` when one is given.
+        A cache hit skips all rendering. On a miss the bytes are copied to
+        the enabled sinks (cache, archive) but the response is served from
+        memory.
+        """
+        timer = timer or StageTimer(pages[0][0])
+        engine = self._resolve_engine(engine, timer)
+        key_data = pages[0][1] if len(pages) == 1 else [template_data for _, template_data in pages]
+        return self._cached_render(
+            [form_type for form_type, _ in pages], key_data,
+            lambda: self._render_engine(pages, engine, timer),
+            file_prefix, as_path, engine, timer
+        )
+
+    def _render_519a_paginated(self, data, file_prefix, as_path=False, engine=None, timer=None):
+        """
+        519A with a long drug-movement history, rendered
+        `pages_per_render_519a` pages per renderer call so the renderer's
+        memory depends on the page size, not the history length. Every page
+        repeats the form header and table header, shows "Page n of m" and,
+        after the first, the cumulative ET carried forward. The parts are
+        joined with pdfrw.
+        """
+        timer = timer or StageTimer('519A')
+        engine = self._resolve_engine(engine, timer)
+        movements = data.get('drug_movements') or []
+        rows_per_page = self.rows_per_page_519a
+        page_count = max(1, math.ceil(len(movements) / rows_per_page))
+        movement_row = FORM_SCHEMAS['519A'].fields['drug_movements'].row
+
+        def render():
+            with timer.stage('template_data'):
+                header = self.template_data('519A', dict(data, drug_movements=[]))
+            writer = PdfWriter()
+            batch = []
+
+            def flush():
+                pdf_bytes = self._render_engine(batch, engine, timer)
+                with timer.stage('merge'):
+                    writer.addpages(PdfReader(fdata=pdf_bytes).pages)
+                batch.clear()
+
+            for page_number, (chunk, carried) in enumerate(paginate_movements(movements, rows_per_page), 1):
+                context = dict(
+                    header, page_number=page_number, page_count=page_count,
+                    drug_movements=[movement_row(movement) for movement in chunk]
+                )
+                if page_number > 1:
+                    context['carried_forward_et'] = carried or ''
+                batch.append(('519A', context))
+                if len(batch) == self.pages_per_render_519a:
+                    flush()
+            if batch:
+                flush()
+
+            with timer.stage('merge'):
+                output = io.BytesIO()
+                writer.write(output)
+            return output.getvalue()
+
+        key_data = {'paginated': rows_per_page, 'data': data}
+        print(f"📄 Rendering 519A as {page_count} pages, {self.pages_per_render_519a} per renderer call")
+        return self._cached_render(['519A'], key_data, render, file_prefix, as_path, engine, timer)
+
+    def template_data(self, form_type, data):
+        """Template context of a form from its /generate-pdf/<form> request body"""
+        return FORM_SCHEMAS[form_type].context(data)
+
+    def generate_501a_pdf(self, data, as_path=False, engine=None, timer=None):
+        try:
+            print(f"🔄 Generating 501A PDF for receiving: {data.get('receiving_no', 'unknown')}")
             
-            if not output_path.exists():
-                raise Exception("PDF file was not created")
-                
-            file_size = output_path.stat().st_size
-            print(f"✅ PDF generated successfully: {output_path} ({file_size} bytes)")
-            
-            return output_path
+            with self._timed('501A', timer) as timer:
+                with timer.stage('template_data'):
+                    template_data = self.template_data('501A', data)
+
+                print(f"📝 Rendering template with data keys: {list(template_data.keys())}")
+                return self._render_pdf(
+                    '501A', template_data, f"501A_{data.get('receiving_no', 'unknown')}",
+                    as_path=as_path, engine=engine, timer=timer
+                )
             
+        except RendererBusy:
+            # Overload, not a rendering fault: let the route answer 503
+            raise
         except Exception as e:
             print(f"❌ Error generating 501A PDF: {str(e)}")
             import traceback
             print(f"📍 Traceback: {traceback.format_exc()}")
             raise Exception(f"PDF generation failed: {str(e)}")
 
-    def generate_520b_pdf(self, data):
+    def generate_520b_pdf(self, data, as_path=False, engine=None, timer=None):
         try:
             print(f"🔄 Generating 520B PDF for item: {data.get('Item No', 'unknown')}")
             
-            template_data = {
-                'item_no': data.get('Item No', ''),
-                'tracking_no': data.get('Tracking No', ''),
-                'client_name': data.get('Client Name', ''),
-                'item_description': data.get('Item Description', ''),
-                'storage_conditions_temp': data.get('Storage Conditions:Temperature', ''),
-                'storage_conditions_other': data.get('Other', ''),
-                'receiving_no': data.get('RN', ''),
-                'lot_no': data.get('Lot No', ''),
-                'po_no': data.get('PO No', ''),
-                'protocol_no': data.get('Protocol No', ''),
-                'vendor': data.get('Vendor', ''),
-                'uom': data.get('UoM', ''),
-                'total_units': data.get('Total Units (vendor count)', ''),
-                'total_containers': data.get('Total Storage Containers', ''),
-                'deliveryAcceptance': [
-                    {'name': 'Item numbers match shipping documentation', 'checked': self._format_boolean_value(data.get('deliveryAcceptance', {}).get('Item numbers match shipping documentation', False))},
-                    {'name': 'Lot numbers match shipping documentation', 'checked': self._format_boolean_value(data.get('deliveryAcceptance', {}).get('Lot numbers match shipping documentation', False))},
-                    {'name': 'Quantity matches shipping documentation', 'checked': self._format_boolean_value(data.get('deliveryAcceptance', {}).get('Quantity matches shipping documentation', False))},
-                    {'name': 'Shipping container is intact', 'checked': self._format_boolean_value(data.get('deliveryAcceptance', {}).get('Shipping container is intact', False))},
-                    {'name': 'Product container(s) is/are intact', 'checked': self._format_boolean_value(data.get('deliveryAcceptance', {}).get('Product container(s) is/are intact', False))},
-                    {'name': 'Temperature recording device included', 'checked': self._format_boolean_value(data.get('deliveryAcceptance', {}).get('Temperature recording device included', False))},
-                    {'name': 'Temperature has been maintained', 'checked': self._format_boolean_value(data.get('deliveryAcceptance', {}).get('Temperature has been maintained', False))}
-                ],
-                # Add the missing deliveryAcceptanceNA data
-                'deliveryAcceptanceNA': {
-                    'material_placed': self._format_boolean_value(data.get('deliveryAcceptanceNA', {}).get('material_placed', False)),
-                    'temperature_maintained': self._format_boolean_value(data.get('deliveryAcceptanceNA', {}).get('temperature_maintained', False)),
-                    'device_included': self._format_boolean_value(data.get('deliveryAcceptanceNA', {}).get('device_included', False))
-                },
-                'dateType': data.get('dateType', ''),
-                'dateValue': data.get('dateValue', ''),
-                'receivingCompletedBy': data.get('receivingCompletedBy', ''),
-                'documentVerification': [
-                    {'name': 'COA #', 'checked': self._format_boolean_value(data.get('documentVerification', {}).get('COA #', False))},
-                    {'name': 'SDS #', 'checked': self._format_boolean_value(data.get('documentVerification', {}).get('SDS #', False))},
-                    {'name': 'Invoice', 'checked': self._format_boolean_value(data.get('documentVerification', {}).get('Invoice', False))},
-                    {'name': 'Other (Specify)', 'checked': self._format_boolean_value(data.get('documentVerification', {}).get('Other (Specify)', False))}
-                ],
-                'issuesSection': [
-                    {'name': 'Quantity discrepancies found', 'checked': self._format_boolean_value(data.get('issuesSection', {}).get('Quantity discrepancies found', False))},
-                    {'name': 'Damage to shipping container(s)', 'checked': self._format_boolean_value(data.get('issuesSection', {}).get('Damage to shipping container(s)', False))},
-                    {'name': 'Damage to product within shipping container', 'checked': self._format_boolean_value(data.get('issuesSection', {}).get('Damage to product within shipping container', False))},
-                    {'name': 'Temperature excursion', 'checked': self._format_boolean_value(data.get('issuesSection', {}).get('Temperature excursion', False))}
-                ],
-                'ncmr': data.get('NCMR', 'N/A'),
-                'comments': data.get('Comments', '')
-            }
-            
-            rendered_html = render_template('520B.html', **template_data)
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_path = self.generated_dir / f"520B_{data.get('RN', 'unknown')}_{timestamp}.pdf"
-            
-            pdfkit.from_string(
-                rendered_html,
-                str(output_path),
-                options=self.pdf_options,
-                configuration=self.config
-            )
-            
-            if not output_path.exists():
-                raise Exception("PDF file was not created")
-                
-            return output_path
+            with self._timed('520B', timer) as timer:
+                with timer.stage('template_data'):
+                    template_data = self.template_data('520B', data)
+
+                return self._render_pdf(
+                    '520B', template_data, f"520B_{data.get('RN', 'unknown')}",
+                    as_path=as_path, engine=engine, timer=timer
+                )
             
+        except RendererBusy:
+            raise
         except Exception as e:
             print(f"❌ Error generating 520B PDF: {str(e)}")
             raise Exception(f"PDF generation failed: {str(e)}")
 
-    def generate_519a_pdf(self, data):
+    def generate_519a_pdf(self, data, as_path=False, engine=None, timer=None):
         try:
             print(f"🔄 Generating 519A PDF for receiving: {data.get('receiving_no', 'unknown')}")
             
-            template_data = {
-                'receiving_no': data.get('receiving_no', ''),
-                'item_no': data.get('item_no', ''),
-                'item_description': data.get('item_description', ''),
-                'lot_no': data.get('lot_no', ''),
-                'storage_conditions': data.get('storage_conditions', ''),
-                'date_time_received': data.get('date_time_received', ''),
-                'other_storage_conditions': data.get('other_storage_conditions', ''),
-                'temp_device_alarm': data.get('temp_device_alarm', ''),
-                'temp_device_deactivated': data.get('temp_device_deactivated', ''),
-                'temp_device_returned': data.get('temp_device_returned', ''),
-                'max_exposure_time': str(data.get('max_exposure_time', '')) + ' (min)',
-                'temper_time': str(data.get('temper_time', '')) + ' (min)',
-                'working_exposure_time': str(data.get('working_exposure_time', '')) + ' (min)',
-                'container_no': data.get('container_no', ''),
-                'total_units_per_container': data.get('total_units_per_container', ''),
-                'record_created_by': data.get('record_created_by', ''),
-                'record_created_date': data.get('record_created_date', ''),
-                'drug_movements': [
-                    {
-                        'destination': movement.get('destination', ''),
-                        'date': movement.get('date', ''),
-                        'time': movement.get('time', ''),
-                        'exposure_time': movement.get('exposure_time', ''),
-                        'cumulative_et': movement.get('cumulative_et', ''),
-                        'completed_by': movement.get('completed_by', ''),
-                        'verified_by': movement.get('verified_by', '')
-                    }
-                    for movement in data.get('drug_movements', [])
-                ]
-            }
-            
-            rendered_html = render_template('519A.html', **template_data)
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_path = self.generated_dir / f"519A_{data.get('receiving_no', 'unknown')}_{timestamp}.pdf"
-            
-            pdfkit.from_string(
-                rendered_html,
-                str(output_path),
-                options=self.pdf_options,
-                configuration=self.config
-            )
-            
-            if not output_path.exists():
-                raise Exception("PDF file was not created")
-                
-            return output_path
+            with self._timed('519A', timer) as timer:
+                movements = data.get('drug_movements') or []
+                if PDFRW_AVAILABLE and self.paginate_above_519a and len(movements) > self.paginate_above_519a:
+                    return self._render_519a_paginated(
+                        data, f"519A_{data.get('receiving_no', 'unknown')}",
+                        as_path=as_path, engine=engine, timer=timer
+                    )
+
+                with timer.stage('template_data'):
+                    template_data = self.template_data('519A', data)
+
+                return self._render_pdf(
+                    '519A', template_data, f"519A_{data.get('receiving_no', 'unknown')}",
+                    as_path=as_path, engine=engine, timer=timer
+                )
             
+        except RendererBusy:
+            raise
         except Exception as e:
             print(f"❌ Error generating 519A PDF: {str(e)}")
-            raise Exception(f"PDF generation failed: {str(e)}")
\ No newline at end of file
+            raise Exception(f"PDF generation failed: {str(e)}")
+
+    def generate_packet_pdf(self, forms_data, as_path=False, engine=None, timer=None):
+        """
+        One PDF holding a section per form, e.g. {'501A': body, '519A': body,
+        '520B': body} (bodies as for /generate-pdf/<form>), rendered in that
+        order by a single renderer call.
+        """
+        try:
+            with self._timed('packet', timer) as timer:
+                with timer.stage('template_data'):
+                    pages = [
+                        (form_type, self.template_data(form_type, data))
+                        for form_type, data in forms_data.items()
+                    ]
+                receiving_no = pages[0][1].get('receiving_no') or 'unknown'
+                print(f"🔄 Generating {'+'.join(forms_data)} packet for receiving: {receiving_no}")
+                return self._render_pages(
+                    pages, f"packet_{receiving_no}", as_path=as_path, engine=engine, timer=timer
+                )
+
+        except RendererBusy:
+            raise
+        except Exception as e:
+            print(f"❌ Error generating packet PDF: {str(e)}")
+            raise Exception(f"PDF generation failed: {str(e)}")
+
+
+_handler_lock = threading.Lock()
+
+def get_pdf_handler():
+    """
+    The app's shared HTMLToPDFHandler (and its renderer pool), created on
+    first use and kept in app.extensions instead of being rebuilt per request
+    """
+    handler = current_app.extensions.get('pdf_handler')
+    if handler is None:
+        with _handler_lock:
+            handler = current_app.extensions.get('pdf_handler')
+            if handler is None:
+                handler = HTMLToPDFHandler(current_app.config)
+                handler.renderer.warm_up()
+                current_app.extensions['pdf_handler'] = handler
+    return handler
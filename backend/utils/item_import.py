@@ -0,0 +1,231 @@
+# backend/utils/item_import.py
+import codecs
+import csv
+import time
+from datetime import datetime
+from itertools import islice
+from sqlalchemy import func, insert, or_ # type: ignore
+from sqlalchemy.exc import IntegrityError # type: ignore
+from ..extensions import db
+from ..models import ItemNumber
+
+# Try to import openpyxl with fallback (only needed for .xlsx uploads)
+try:
+    import openpyxl # type: ignore
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+_TYPE_NAMES = {bool: 'true or false', int: 'an integer', str: 'text'}
+
+# Columns managed by the server rather than the uploaded file
+_SERVER_COLUMNS = {'id', 'created_by', 'created_at', 'updated_at', 'updated_by', 'is_active', 'display_order'}
+
+
+def _importable_columns():
+    """{name: Column} for every ItemNumber column an upload may set"""
+    return {
+        column.name: column
+        for column in ItemNumber.__table__.columns
+        if column.name not in _SERVER_COLUMNS
+    }
+
+
+IMPORT_COLUMNS = _importable_columns()
+REQUIRED_COLUMNS = [name for name, column in IMPORT_COLUMNS.items() if not column.nullable and column.default is None]
+
+# (name, python type, max length, required) resolved once rather than per cell
+_COLUMN_SPECS = [
+    (name, column.type.python_type, getattr(column.type, 'length', None), name in REQUIRED_COLUMNS)
+    for name, column in IMPORT_COLUMNS.items()
+]
+
+_TRUE_VALUES = frozenset(('true', '1', 'yes'))
+_BOOL_VALUES = _TRUE_VALUES | frozenset(('false', '0', 'no'))
+
+
+def _normalize_header(header):
+    return str(header or '').strip().lower().replace(' ', '_')
+
+
+def _description_key(description):
+    # Mirrors lower(trim(description)) of the uq_item_number_description_ci index
+    return description.strip(' ').lower()
+
+
+def iter_csv_rows(stream, encoding='utf-8-sig'):
+    """Yield dicts from a binary CSV stream without reading it all into memory"""
+    reader = csv.reader(codecs.iterdecode(stream, encoding))
+    headers = [_normalize_header(h) for h in next(reader, [])]
+    for values in reader:
+        if not any(value.strip() for value in values):
+            continue
+        yield dict(zip(headers, values))
+
+
+def iter_xlsx_rows(stream):
+    """Yield dicts from the first sheet of an .xlsx upload in read-only mode"""
+    if not OPENPYXL_AVAILABLE:
+        raise ValueError('Excel import not available - openpyxl not installed')
+    workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [_normalize_header(h) for h in next(rows, [])]
+        for values in rows:
+            if not any(value not in (None, '') for value in values):
+                continue
+            yield dict(zip(headers, ('' if value is None else value for value in values)))
+    finally:
+        workbook.close()
+
+
+def validate_row(raw):
+    """
+    Check one uploaded row against the ItemNumber column definitions.
+    Returns (clean_values, errors).
+    """
+    clean, errors = {}, []
+    for name, python_type, max_length, required in _COLUMN_SPECS:
+        value = raw.get(name, '')
+        if isinstance(value, str):
+            value = value.strip()
+
+        if value == '' or value is None:
+            if required:
+                errors.append(f"{name} is required")
+            continue
+
+        try:
+            if python_type is bool:
+                lowered = str(value).strip().lower()
+                if lowered not in _BOOL_VALUES:
+                    raise ValueError
+                value = lowered in _TRUE_VALUES
+            elif python_type is int:
+                value = int(float(value)) if isinstance(value, (int, float)) else int(str(value))
+            elif not isinstance(value, str):
+                value = str(value)
+        except (TypeError, ValueError):
+            errors.append(f"{name} must be {_TYPE_NAMES.get(python_type, python_type.__name__)}")
+            continue
+
+        if max_length and isinstance(value, str) and len(value) > max_length:
+            errors.append(f"{name} exceeds {max_length} characters")
+            continue
+
+        clean[name] = value
+    return clean, errors
+
+
+def _existing_keys(chunk):
+    """One query per chunk: which item numbers / description keys already exist"""
+    item_numbers = [row['item_number'] for _, row in chunk]
+    description_keys = [_description_key(row['description']) for _, row in chunk]
+    description_expr = func.lower(func.trim(ItemNumber.description))
+
+    existing = db.session.query(ItemNumber.item_number, description_expr).filter(or_(
+        ItemNumber.item_number.in_(item_numbers),
+        description_expr.in_(description_keys)
+    )).all()
+    return {row[0] for row in existing}, {row[1] for row in existing}
+
+
+def _insert_chunk(rows, report):
+    """
+    executemany INSERT for a validated chunk; isolates bad rows on conflict.
+    An ORM-enabled insert(ItemNumber), not a Core table insert, so the
+    collection-version listener sees it and cached lists and the search
+    index are invalidated.
+    """
+    if not rows:
+        return
+    try:
+        db.session.execute(insert(ItemNumber), [values for _, values in rows])
+        db.session.commit()
+        report['imported'] += len(rows)
+        return
+    except IntegrityError:
+        db.session.rollback()
+
+    # Rare path: a conflict the set-based check could not see (e.g. a
+    # concurrent import). Retry row by row in savepoints to find it.
+    for row_number, values in rows:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(ItemNumber), [values])
+            report['imported'] += 1
+        except IntegrityError as e:
+            _add_error(report, row_number, values.get('item_number'), [f"Duplicate item: {e.orig}"])
+    db.session.commit()
+
+
+def _add_error(report, row_number, item_number, errors):
+    report['failed'] += 1
+    if len(report['errors']) < MAX_REPORTED_ERRORS:
+        report['errors'].append({'row': row_number, 'item_number': item_number, 'errors': errors})
+    else:
+        report['errors_truncated'] = True
+
+
+def import_items(rows, user_id=None, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+    """
+    Validate and insert an iterable of uploaded rows chunk by chunk.
+
+    Each chunk costs one duplicate-check SELECT and one executemany INSERT,
+    and is committed on its own so a failure never rolls back earlier chunks.
+    Row numbers in the report are 1-based data rows (the header is row 0).
+    """
+    started = time.perf_counter()
+    report = {'total_rows': 0, 'imported': 0, 'failed': 0, 'errors': [], 'errors_truncated': False, 'dry_run': dry_run}
+    seen_item_numbers, seen_descriptions = set(), set()
+    now = datetime.utcnow()
+
+    numbered_rows = enumerate(rows, start=1)
+    while True:
+        batch = list(islice(numbered_rows, chunk_size))
+        if not batch:
+            break
+
+        chunk = []
+        for row_number, raw in batch:
+            report['total_rows'] += 1
+            clean, errors = validate_row(raw)
+            if errors:
+                _add_error(report, row_number, raw.get('item_number'), errors)
+            else:
+                chunk.append((row_number, clean))
+        if not chunk:
+            continue
+
+        existing_numbers, existing_descriptions = _existing_keys(chunk)
+
+        to_insert = []
+        for row_number, clean in chunk:
+            description_key = _description_key(clean['description'])
+            errors = []
+            if clean['item_number'] in existing_numbers or clean['item_number'] in seen_item_numbers:
+                errors.append('An item with this item number already exists')
+            if description_key in existing_descriptions or description_key in seen_descriptions:
+                errors.append('An item with this description already exists')
+            if errors:
+                _add_error(report, row_number, clean['item_number'], errors)
+                continue
+
+            seen_item_numbers.add(clean['item_number'])
+            seen_descriptions.add(description_key)
+            clean.update(created_by=user_id, updated_by=user_id, created_at=now, updated_at=now)
+            clean.setdefault('is_obsolete', False)
+            to_insert.append((row_number, clean))
+
+        if dry_run:
+            report['imported'] += len(to_insert)
+        else:
+            _insert_chunk(to_insert, report)
+
+    elapsed = time.perf_counter() - started
+    report['elapsed_seconds'] = round(elapsed, 3)
+    report['rows_per_second'] = round(report['total_rows'] / elapsed, 1) if elapsed else None
+    return report
@@ -0,0 +1,256 @@
+# backend/utils/pagination.py
+import base64
+import json
+from datetime import date, datetime, timedelta
+from sqlalchemy import and_, or_, tuple_ # type: ignore
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+class PaginationError(ValueError):
+    """Raised for malformed pagination, sort or filter query parameters"""
+
+
+def parse_bool_arg(value, name):
+    """Parse a boolean query string value ('true'/'false', '1'/'0', 'yes'/'no')"""
+    lowered = str(value).strip().lower()
+    if lowered in ['true', '1', 'yes']:
+        return True
+    if lowered in ['false', '0', 'no']:
+        return False
+    raise PaginationError(f"Invalid boolean value for '{name}': {value}")
+
+
+def parse_page_size(raw_limit):
+    """Clamp the requested page size to [1, MAX_PAGE_SIZE]"""
+    if raw_limit in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(raw_limit)
+    except (TypeError, ValueError):
+        raise PaginationError(f"Invalid limit: {raw_limit}")
+    if limit < 1:
+        raise PaginationError("limit must be a positive integer")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_sort(raw_sort, sortable_columns, default_sort):
+    """
+    Resolve a ?sort= value such as 'item_number' or '-updated_at'
+
+    Returns (sort_name, column, descending). Only whitelisted columns are
+    accepted since every sort key needs a matching (column, id) index.
+    """
+    raw_sort = (raw_sort or default_sort).strip()
+    descending = raw_sort.startswith('-')
+    sort_name = raw_sort.lstrip('-')
+    if sort_name not in sortable_columns:
+        raise PaginationError(
+            f"Cannot sort by '{sort_name}'. Allowed: {', '.join(sorted(sortable_columns))}"
+        )
+    return sort_name, sortable_columns[sort_name], descending
+
+
+def _to_json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _coerce_value(value, column):
+    """Convert a JSON / query string value to the column's Python type"""
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def _from_json_value(value, column):
+    if value is None:
+        return None
+    try:
+        return _coerce_value(value, column)
+    except (TypeError, ValueError):
+        raise PaginationError("Invalid cursor")
+
+
+def encode_cursor(sort_name, sort_value, row_id):
+    """Opaque cursor holding the sort key and id of the last row on a page"""
+    payload = json.dumps([sort_name, _to_json_value(sort_value), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort_name, sort_column):
+    """Decode a cursor and check it was issued for the same sort order"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        row_id = int(row_id)
+    except (ValueError, TypeError):
+        raise PaginationError("Invalid cursor")
+    if cursor_sort != sort_name:
+        raise PaginationError("Cursor was issued for a different sort order")
+    return _from_json_value(value, sort_column), row_id
+
+
+def _is_nullable(sort_column):
+    return getattr(sort_column.expression, 'nullable', True)
+
+
+def _after_cursor(sort_column, id_column, last_value, last_id, descending):
+    """
+    Keyset predicate for rows strictly after (last_value, last_id).
+
+    A row-value comparison (sort, id) > (:value, :id), which Postgres runs as
+    a single index range scan. NULL sort values are ordered first ascending /
+    last descending, so nullable columns (display_order, dates) get extra
+    NULL branches; NOT NULL columns never do.
+    """
+    after = tuple_(sort_column, id_column) > tuple_(last_value, last_id)
+    before = tuple_(sort_column, id_column) < tuple_(last_value, last_id)
+    if not _is_nullable(sort_column):
+        return before if descending else after
+
+    if not descending:
+        if last_value is None:
+            return or_(
+                and_(sort_column.is_(None), id_column > last_id),
+                sort_column.isnot(None)
+            )
+        return after
+
+    if last_value is None:
+        return and_(sort_column.is_(None), id_column < last_id)
+    return or_(before, sort_column.is_(None))
+
+
+def apply_filters(query, args, filterable_columns):
+    """Apply exact-match filters for every whitelisted column present in args"""
+    for name, column in filterable_columns.items():
+        raw_value = args.get(name)
+        if raw_value is None or raw_value == '':
+            continue
+        if column.type.python_type is bool:
+            query = query.filter(column == parse_bool_arg(raw_value, name))
+        else:
+            query = query.filter(column == raw_value)
+    return query
+
+
+def apply_range_filters(query, args, range_columns):
+    """
+    Apply inclusive ?<name>_from= / ?<name>_to= bounds for whitelisted
+    date, datetime or numeric columns. A plain date given as the upper bound
+    of a datetime column covers that whole day.
+    """
+    for name, column in range_columns.items():
+        lower = args.get(f'{name}_from')
+        upper = args.get(f'{name}_to')
+        try:
+            if lower:
+                query = query.filter(column >= _coerce_value(lower, column))
+            if upper:
+                upper_value = _coerce_value(upper, column)
+                if column.type.python_type is datetime and len(upper.strip()) == 10:
+                    query = query.filter(column < upper_value + timedelta(days=1))
+                else:
+                    query = query.filter(column <= upper_value)
+        except (TypeError, ValueError):
+            raise PaginationError(f"Invalid range for '{name}': {lower or ''}..{upper or ''}")
+    return query
+
+
+def apply_sort(query, sort_column, id_column, descending):
+    # NULL placement is only spelled out for nullable columns, so NOT NULL
+    # keys keep the plain ordering their (column, id) index is built with
+    if not _is_nullable(sort_column):
+        if descending:
+            return query.order_by(sort_column.desc(), id_column.desc())
+        return query.order_by(sort_column.asc(), id_column.asc())
+    if descending:
+        return query.order_by(sort_column.desc().nulls_last(), id_column.desc())
+    return query.order_by(sort_column.asc().nulls_first(), id_column.asc())
+
+
+def keyset_page(query, sort_name, sort_column, id_column, descending, cursor, limit):
+    """
+    Fetch one page of `query` ordered by (sort_column, id_column).
+
+    Returns (rows, next_cursor). One extra row is fetched to know whether
+    another page exists, so no COUNT(*) is ever issued.
+    """
+    if cursor:
+        last_value, last_id = decode_cursor(cursor, sort_name, sort_column)
+        query = query.filter(_after_cursor(sort_column, id_column, last_value, last_id, descending))
+
+    rows = apply_sort(query, sort_column, id_column, descending).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = cursor_for_row(sort_name, sort_column, id_column, rows[-1])
+    return rows, next_cursor
+
+
+def cursor_for_row(sort_name, sort_column, id_column, row):
+    """Cursor pointing just past `row` in (sort_column, id_column) order"""
+    return encode_cursor(sort_name, getattr(row, sort_column.key), getattr(row, id_column.key))
+
+
+def is_paginated_request(args):
+    """Pagination is opt-in so existing clients keep receiving a plain array"""
+    return 'limit' in args or 'cursor' in args
+
+
+def model_fields(model, exclude=()):
+    """{name: column attribute} for every column of `model` not in exclude, in table order"""
+    return {
+        column.key: getattr(model, column.key)
+        for column in model.__table__.columns
+        if column.key not in exclude
+    }
+
+
+def parse_fields(raw_fields, allowed_fields):
+    """
+    Parse ?fields=a,b,c against a whitelist. Returns None when the parameter
+    is absent (serialize everything) or the requested names in order.
+    """
+    if raw_fields is None or raw_fields.strip() == '':
+        return None
+
+    fields = []
+    for name in raw_fields.split(','):
+        name = name.strip()
+        if name and name not in fields:
+            fields.append(name)
+
+    unknown = [name for name in fields if name not in allowed_fields]
+    if unknown:
+        raise PaginationError(
+            f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(allowed_fields)}"
+        )
+    return fields
+
+
+def select_fields(query, fields, allowed_fields, *required_columns):
+    """
+    Narrow `query` to the requested columns plus any required ones (the id
+    and sort key needed for ordering and cursors) so nothing else is fetched.
+    Rows come back as lightweight Row tuples instead of ORM instances.
+    """
+    columns = {column.key: column for column in required_columns}
+    for name in fields:
+        columns.setdefault(name, allowed_fields[name])
+    return query.with_entities(*columns.values())
+
+
+def serialize_fields(fields, row):
+    """Serialize a select_fields() row; the id is always included"""
+    data = {'id': row.id}
+    for name in fields:
+        data[name] = getattr(row, name)
+    return data
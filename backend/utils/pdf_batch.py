@@ -0,0 +1,232 @@
+# backend/utils/pdf_batch.py
+import io
+import json
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from werkzeug.utils import secure_filename
+from .form_data import GENERATOR_METHODS, MANUAL_FIELDS, PREFILL_BUILDERS
+from .pdf_optimize import dedupe_resources
+from .pdf_renderer import RendererBusy
+
+# Try to import pdfrw with fallback (only needed for format=pdf)
+try:
+    from pdfrw import PdfReader, PdfWriter # type: ignore
+    PDFRW_AVAILABLE = True
+except ImportError:
+    PDFRW_AVAILABLE = False
+
+DEFAULT_BATCH_MAX_DOCUMENTS = 500
+
+BATCH_FORMATS = ('zip', 'pdf')
+
+# A batch shares the renderer pool with interactive requests; when the pool
+# queue is full a document waits and retries instead of failing the batch
+BUSY_RETRY_SECONDS = 0.5
+BUSY_RETRIES = 20
+
+
+class BatchDocument:
+    """One form for one receiving, and what happened when it was rendered"""
+
+    def __init__(self, form_type, receiving_no, data=None, error=None):
+        self.form_type = form_type
+        self.receiving_no = receiving_no
+        self.data = data
+        self.error = error
+        self.size = None
+        self.render_ms = None
+
+    @property
+    def filename(self):
+        return f"{self.form_type}_{secure_filename(str(self.receiving_no)) or 'unknown'}.pdf"
+
+    def manifest_entry(self):
+        return {
+            'form': self.form_type,
+            'receiving_no': self.receiving_no,
+            'file': self.filename if self.error is None else None,
+            'status': 'failed' if self.error else 'ok',
+            'error': self.error,
+            'size': self.size,
+            'render_ms': self.render_ms
+        }
+
+
+def build_documents(receivings, receiving_nos, forms, manual_fields):
+    """
+    Every (receiving, form) pair to render, in request order. `receivings` are
+    ReceivingData rows with `item` loaded; requested numbers that matched no
+    row come back as failed documents so they show up in the manifest.
+    """
+    documents = []
+    for receiving in receivings:
+        for form_type in forms:
+            data = {
+                name: value for name, value in (manual_fields.get(form_type) or {}).items()
+                if name in MANUAL_FIELDS[form_type]
+            }
+            data.update(PREFILL_BUILDERS[form_type](receiving, receiving.item))
+            documents.append(BatchDocument(form_type, receiving.receiving_no, data))
+
+    found = {receiving.receiving_no for receiving in receivings}
+    for receiving_no in receiving_nos:
+        if receiving_no not in found:
+            found.add(receiving_no)
+            for form_type in forms:
+                documents.append(BatchDocument(form_type, receiving_no, error='Receiving data not found'))
+    return documents
+
+
+def _pdf_bytes(output):
+    """A generate_*_pdf result (in-memory buffer, or a file path with as_path) as bytes"""
+    if isinstance(output, io.BytesIO):
+        return output.getvalue()
+    return Path(output).read_bytes()
+
+
+def _render(app, handler, document, engine=None):
+    with app.app_context():
+        generate = getattr(handler, GENERATOR_METHODS[document.form_type])
+        started = time.monotonic()
+        for attempt in range(BUSY_RETRIES + 1):
+            try:
+                pdf = _pdf_bytes(generate(document.data, engine=engine))
+                break
+            except RendererBusy:
+                if attempt == BUSY_RETRIES:
+                    raise
+                time.sleep(BUSY_RETRY_SECONDS)
+        document.render_ms = round((time.monotonic() - started) * 1000, 1)
+        document.size = len(pdf)
+        return pdf
+
+
+def batch_workers(handler, engine=None, batches=1):
+    """
+    Threads to render a batch on. wkhtmltopdf renders in the pool's
+    processes, so up to one thread per pool slot keeps them busy; a thread
+    that finds every process taken waits in the pool's queue, so `batches`
+    concurrent batches together use at most half of that queue and
+    interactive requests always find room. ReportLab draws in this process
+    under the GIL, where more threads only contend.
+    """
+    if (engine or handler.engine) == 'reportlab':
+        return 1
+    share = handler.renderer.queue_size // (2 * max(1, batches))
+    return max(1, min(handler.renderer.size, share))
+
+
+def render_documents(app, handler, documents, workers, engine=None):
+    """
+    Render `documents` on `workers` threads (each feeding the renderer's
+    process pool) and yield (document, pdf_bytes) in completion order;
+    pdf_bytes is None for a failed document, whose `error` is set. At most
+    2 x workers finished PDFs are held before the consumer takes them.
+    """
+    pending = iter([document for document in documents if document.error is None])
+    for document in documents:
+        if document.error is not None:
+            yield document, None
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pdf-batch') as executor:
+        in_flight = {}
+
+        def submit_next():
+            document = next(pending, None)
+            if document is not None:
+                in_flight[executor.submit(_render, app, handler, document, engine)] = document
+
+        for _ in range(workers * 2):
+            submit_next()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                document = in_flight.pop(future)
+                try:
+                    pdf = future.result()
+                except Exception as e:
+                    print(f"❌ Batch PDF {document.filename} failed: {str(e)}")
+                    document.error = str(e)
+                    pdf = None
+                submit_next()
+                yield document, pdf
+
+
+def batch_summary(documents, started):
+    elapsed = time.monotonic() - started
+    rendered = [document for document in documents if document.error is None]
+    return {
+        'documents': len(documents),
+        'succeeded': len(rendered),
+        'failed': len(documents) - len(rendered),
+        'bytes': sum(document.size or 0 for document in rendered),
+        'elapsed_seconds': round(elapsed, 3),
+        'documents_per_second': round(len(rendered) / elapsed, 2) if elapsed else None
+    }
+
+
+class _ChunkBuffer:
+    """Write-only file object: zipfile writes into it and the stream drains it"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data, self._chunks = b''.join(self._chunks), []
+        return data
+
+
+def stream_zip(rendered, documents, started, on_complete=None):
+    """
+    Yield a ZIP archive chunk by chunk as PDFs finish, ending with
+    manifest.json (per-document status and errors plus batch throughput).
+    `on_complete` is called with the batch summary once every PDF is in.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for document, pdf in rendered:
+            if pdf is not None:
+                # PDF streams are compressed already; store them as-is
+                archive.writestr(document.filename, pdf, compress_type=zipfile.ZIP_STORED)
+                yield buffer.drain()
+        summary = batch_summary(documents, started)
+        manifest = {
+            'summary': summary,
+            'documents': [document.manifest_entry() for document in documents]
+        }
+        archive.writestr('manifest.json', json.dumps(manifest, indent=2), compress_type=zipfile.ZIP_DEFLATED)
+    yield buffer.drain()
+    if on_complete:
+        on_complete(summary)
+
+
+def merge_pdfs(rendered, documents, started):
+    """
+    One PDF with every successful document in request order. The merge can
+    only be written once all parts are in, so this returns (bytes, summary).
+    """
+    parts = {id(document): pdf for document, pdf in rendered if pdf is not None}
+
+    writer = PdfWriter()
+    for document in documents:
+        pdf = parts.get(id(document))
+        if pdf is None:
+            continue
+        try:
+            writer.addpages(PdfReader(fdata=pdf).pages)
+        except Exception as e:
+            document.error = f"Could not merge PDF: {str(e)}"
+    # Documents rendered separately each carry their own copy of shared fonts and images
+    dedupe_resources(writer.pagearray)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue(), batch_summary(documents, started)
@@ -0,0 +1,168 @@
+# backend/utils/pdf_cache.py
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+# Try to import fcntl with fallback (POSIX only; without it only this process's threads are serialized)
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+DEFAULT_CACHE_MAX_MB = 256
+
+
+def canonical_json(data):
+    """Stable encoding of template data: key order and spacing never change the hash"""
+    return json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+class PdfCache:
+    """
+    Content-addressed store of rendered PDFs.
+
+    The key is a SHA-256 of the template file contents plus the normalized
+    template data, so an identical request maps to the same file and a
+    template edit invalidates every PDF rendered from the old version.
+
+    The directory is the index: a hit touches the file's mtime, and after
+    each store the directory is scanned under a file lock and the least
+    recently used files go until the total fits in `max_bytes`. Every
+    gunicorn worker shares the same directory, so the budget holds across
+    processes and survives restarts. Callers get copies of the bytes, never
+    a path in here, since another process may evict the file at any time.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max(0, int(max_bytes))
+        if self.enabled:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                # Read-only storage: run without a cache rather than fail
+                print(f"⚠️ PDF cache disabled: {str(e)}")
+                self.max_bytes = 0
+
+        self._lock = threading.Lock()
+        self._template_digests = {}
+        self._stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        if self.enabled:
+            self._evict()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def _path(self, key):
+        return self.directory / f"{key}.pdf"
+
+    @staticmethod
+    def _touch(path):
+        """Stamp the access time used for the LRU order (finer than the file system's own clock)"""
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+
+    def _entries(self):
+        """(mtime, size, key) of the cached PDFs, least recently used first"""
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.is_file() and entry.name.endswith('.pdf'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.name[:-4]))
+        return sorted(entries)
+
+    def _template_digest(self, template_path):
+        """SHA-256 of a template file, re-read only when its mtime or size changes"""
+        stat = template_path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._template_digests.get(template_path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        digest = hashlib.sha256(template_path.read_bytes()).hexdigest()
+        self._template_digests[template_path] = (signature, digest)
+        return digest
+
+    def key(self, template_paths, template_data):
+        """Cache key for one template path (or a list, for multi-section PDFs) and its data"""
+        if isinstance(template_paths, (str, Path)):
+            template_paths = [template_paths]
+        hasher = hashlib.sha256()
+        for template_path in template_paths:
+            hasher.update(self._template_digest(Path(template_path)).encode('ascii'))
+            hasher.update(b'\0')
+        hasher.update(canonical_json(template_data).encode('utf-8'))
+        return hasher.hexdigest()
+
+    def get(self, key):
+        """Bytes of the cached PDF for `key`, or None on a miss"""
+        path = self._path(key)
+        try:
+            pdf_bytes = path.read_bytes()
+        except FileNotFoundError:
+            pdf_bytes = None
+        else:
+            try:
+                self._touch(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._stats['hits' if pdf_bytes is not None else 'misses'] += 1
+        return pdf_bytes
+
+    def put(self, key, pdf_bytes):
+        """
+        Store a rendered PDF; returns False when the cache is disabled or the
+        document alone is larger than the whole budget.
+        """
+        size = len(pdf_bytes)
+        if not self.enabled or size > self.max_bytes:
+            return False
+
+        # Write under a unique name and rename, so readers never see a partial file
+        temp_path = self.directory / f".{key}.{uuid.uuid4().hex}.tmp"
+        temp_path.write_bytes(pdf_bytes)
+        self._touch(temp_path)
+        os.replace(temp_path, self._path(key))
+
+        with self._lock:
+            self._stats['stores'] += 1
+        self._evict(keep=key)
+        return True
+
+    def _evict(self, keep=None):
+        """Drop least-recently-used files until the directory fits its budget"""
+        with self._lock, open(self.directory / '.lock', 'w') as lock_file:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            for _, size, key in entries:
+                if total <= self.max_bytes:
+                    break
+                if key == keep:
+                    continue
+                self._path(key).unlink(missing_ok=True)
+                total -= size
+                self._stats['evictions'] += 1
+
+    def stats(self):
+        entries = self._entries() if self.enabled else []
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(entries=len(entries), bytes=sum(size for _, size, _ in entries))
+        lookups = stats['hits'] + stats['misses']
+        stats.update(
+            max_bytes=self.max_bytes,
+            hit_ratio=round(stats['hits'] / lookups, 4) if lookups else None
+        )
+        return stats
@@ -0,0 +1,293 @@
+# backend/utils/pdf_jobs.py
+import json
+import os
+import socket
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func, select, update # type: ignore
+from ..extensions import db
+from ..models import PdfJob, User
+from .form_data import GENERATOR_METHODS
+from .html_to_pdf_handler import get_pdf_handler
+from .pdf_renderer import RendererBusy
+
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_POLL_SECONDS = 1.0
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_STALE_SECONDS = 300
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+
+def _setting(app, name, default):
+    return app.config.get(name, default)
+
+
+def enqueue_job(form_type, data, user_id=None):
+    """Persist a queued job and wake the local workers"""
+    job = PdfJob(
+        form_type=form_type,
+        status=QUEUED,
+        payload=json.dumps(data),
+        receiving_no=str(data.get('receiving_no') or data.get('RN') or '')[:20] or None,
+        attempts=0,
+        created_by=user_id
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    workers = current_app.extensions.get('pdf_job_workers')
+    if workers:
+        workers.wake()
+    return job
+
+
+def get_user_job(job_id, user_id):
+    """
+    The job with id `job_id` if `user_id` queued it or is an admin, else None.
+    Job ids are sequential, so callers answer 404 either way rather than
+    telling other users' jobs apart from missing ones.
+    """
+    job = db.session.get(PdfJob, job_id)
+    if not job or not user_id:
+        return None
+    if job.created_by == int(user_id):
+        return job
+    user = db.session.get(User, int(user_id))
+    return job if user and user.role and user.role.name == 'admin' else None
+
+
+def serialize_job(job):
+    return {
+        'id': job.id,
+        'form_type': job.form_type,
+        'status': job.status,
+        'receiving_no': job.receiving_no,
+        'attempts': job.attempts,
+        'error': job.error,
+        'file_size': job.file_size,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None
+    }
+
+
+def job_output_names(app):
+    """File names under generated/ that queued, running or finished jobs point at"""
+    with app.app_context():
+        paths = db.session.execute(
+            select(PdfJob.output_path).where(PdfJob.output_path.isnot(None), PdfJob.status != FAILED)
+        ).scalars()
+        return {os.path.basename(path) for path in paths}
+
+
+def requeue_stale_jobs(stale_seconds, max_attempts):
+    """
+    Jobs left 'running' by a worker that died (restart, OOM kill) go back to
+    the queue, or fail once they have used up their attempts. A live worker
+    keeps heartbeat_at fresh however long its render takes, so only jobs
+    without a heartbeat for `stale_seconds` count as abandoned.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_seconds)
+    stale = (PdfJob.status == RUNNING) & (func.coalesce(PdfJob.heartbeat_at, PdfJob.started_at) < cutoff)
+    requeued = db.session.execute(
+        update(PdfJob).where(stale, PdfJob.attempts < max_attempts)
+        .values(status=QUEUED, worker_id=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.execute(
+        update(PdfJob).where(stale, PdfJob.attempts >= max_attempts)
+        .values(status=FAILED, error='Worker stopped while rendering', finished_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return requeued
+
+
+def claim_next_job(worker_id):
+    """
+    Atomically move the oldest queued job to running. The status check in the
+    UPDATE makes the claim safe across threads and gunicorn workers; on
+    Postgres SKIP LOCKED also keeps concurrent claimers off the same row.
+    """
+    while True:
+        candidate = (db.session.query(PdfJob.id)
+                     .filter(PdfJob.status == QUEUED)
+                     .order_by(PdfJob.id)
+                     .limit(1)
+                     .with_for_update(skip_locked=True)
+                     .scalar())
+        if candidate is None:
+            db.session.commit()
+            return None
+
+        claimed_at = datetime.utcnow()
+        claimed = db.session.execute(
+            update(PdfJob).where(PdfJob.id == candidate, PdfJob.status == QUEUED)
+            .values(status=RUNNING, worker_id=worker_id, started_at=claimed_at, heartbeat_at=claimed_at,
+                    attempts=PdfJob.attempts + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return db.session.get(PdfJob, candidate)
+
+
+def _owned(job):
+    """WHERE clause matching `job` only while the worker that claimed it still runs it"""
+    return (PdfJob.id == job.id) & (PdfJob.worker_id == job.worker_id) & (PdfJob.status == RUNNING)
+
+
+@contextmanager
+def _heartbeat(app, job, interval):
+    """Bump the job's heartbeat_at every `interval` seconds while the block runs"""
+    owned = _owned(job)
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(interval):
+            try:
+                with app.app_context():
+                    db.session.execute(
+                        update(PdfJob).where(owned).values(heartbeat_at=datetime.utcnow())
+                        .execution_options(synchronize_session=False)
+                    )
+                    db.session.commit()
+            except Exception as e:
+                print(f"⚠️ PDF job {job.id} heartbeat failed: {str(e)}")
+
+    thread = threading.Thread(target=beat, name=f"pdf-job-heartbeat-{job.id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(job):
+    """
+    Render one claimed job and record the outcome. The outcome is written
+    with a guarded UPDATE: if the job was requeued as stale and claimed by
+    another worker meanwhile, this worker's result is dropped.
+    """
+    app = current_app._get_current_object()
+    stale_seconds = _setting(app, 'PDF_JOB_STALE_SECONDS', DEFAULT_STALE_SECONDS)
+    owned = _owned(job)
+    output_path = None
+    try:
+        with _heartbeat(app, job, max(1, stale_seconds / 3)):
+            handler = get_pdf_handler()
+            output_path = getattr(handler, GENERATOR_METHODS[job.form_type])(json.loads(job.payload), as_path=True)
+        outcome = dict(
+            status=DONE, output_path=str(output_path), file_size=output_path.stat().st_size,
+            error=None, finished_at=datetime.utcnow()
+        )
+    except RendererBusy:
+        # Renderer pool saturated by synchronous requests: retry later
+        # without spending an attempt
+        outcome = dict(status=QUEUED, attempts=PdfJob.attempts - 1, worker_id=None)
+    except Exception as e:
+        print(f"❌ PDF job {job.id} failed: {str(e)}")
+        max_attempts = _setting(app, 'PDF_JOB_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+        if job.attempts >= max_attempts:
+            outcome = dict(status=FAILED, error=str(e), finished_at=datetime.utcnow())
+        else:
+            outcome = dict(status=QUEUED, error=str(e), worker_id=None)
+
+    recorded = db.session.execute(
+        update(PdfJob).where(owned).values(**outcome).execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    if not recorded:
+        print(f"⚠️ PDF job {job.id} was requeued while this worker rendered it; result dropped")
+        if output_path is not None:
+            output_path.unlink(missing_ok=True)
+    return job
+
+
+def process_next_job(worker_id='inline'):
+    """Claim and run one job; returns it, or None when the queue is empty"""
+    job = claim_next_job(worker_id)
+    if job is not None:
+        run_job(job)
+    return job
+
+
+class PdfJobWorkers:
+    """
+    Local pool of daemon threads draining the pdf_jobs table. Each thread has
+    its own app context (and so its own database session). Started lazily by
+    the job endpoints; a restarted process resumes the queue on first use.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.count = max(1, int(_setting(app, 'PDF_JOB_WORKERS', DEFAULT_JOB_WORKERS)))
+        self.poll_seconds = _setting(app, 'PDF_JOB_POLL_SECONDS', DEFAULT_POLL_SECONDS)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        with self.app.app_context():
+            requeue_stale_jobs(
+                _setting(self.app, 'PDF_JOB_STALE_SECONDS', DEFAULT_STALE_SECONDS),
+                _setting(self.app, 'PDF_JOB_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+            )
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        for index in range(self.count):
+            thread = threading.Thread(
+                target=self._run, args=(f"{prefix}:{index}",), name=f"pdf-job-worker-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self, worker_id):
+        stale_seconds = _setting(self.app, 'PDF_JOB_STALE_SECONDS', DEFAULT_STALE_SECONDS)
+        max_attempts = _setting(self.app, 'PDF_JOB_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+        last_sweep = time.monotonic()
+
+        while not self._stop.is_set():
+            idle = True
+            try:
+                with self.app.app_context():
+                    job = process_next_job(worker_id)
+                    # A job put back in the queue (busy renderer) also waits a poll
+                    idle = job is None or job.status == QUEUED
+                    if idle and time.monotonic() - last_sweep > stale_seconds:
+                        requeue_stale_jobs(stale_seconds, max_attempts)
+                        last_sweep = time.monotonic()
+            except Exception as e:
+                print(f"❌ PDF job worker {worker_id} error: {str(e)}")
+                traceback.print_exc()
+            if idle:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+
+
+_workers_lock = threading.Lock()
+
+
+def ensure_job_workers(app):
+    """Start this process's job workers once"""
+    workers = app.extensions.get('pdf_job_workers')
+    if workers is None:
+        with _workers_lock:
+            workers = app.extensions.get('pdf_job_workers')
+            if workers is None:
+                workers = PdfJobWorkers(app)
+                workers.start()
+                app.extensions['pdf_job_workers'] = workers
+    return workers
@@ -0,0 +1,312 @@
+# backend/utils/pdf_limiter.py
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from flask import current_app, jsonify
+
+# Try to import fcntl with fallback (POSIX only; without it the limiter admits everything)
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+DEFAULT_CONCURRENCY = 4        # PDF requests rendering at once across all workers, 0 disables
+DEFAULT_QUEUE_SIZE = 2         # requests allowed to wait for a slot across all workers
+DEFAULT_WAIT_SECONDS = 30      # longest a queued request waits before it is turned away
+DEFAULT_LIMITER_DIR = os.path.join(tempfile.gettempdir(), 'pdf_slots')
+DEFAULT_WEB_WORKERS = 8        # request workers on the host (gunicorn workers x threads)
+DEFAULT_WORKER_RESERVE = 2     # workers that PDF requests may never hold
+DEFAULT_BATCH_CONCURRENCY = 1  # /batch requests running at once across all workers
+
+# Queued requests poll for a free slot, backing off up to this interval
+POLL_MIN_SECONDS = 0.02
+POLL_MAX_SECONDS = 0.25
+
+RETRY_AFTER_MIN = 1
+RETRY_AFTER_MAX = 60
+
+
+class PdfQueueFull(Exception):
+    """No slot free and no room (or time left) in the wait queue"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class PdfSlotLimiter:
+    """
+    Caps concurrent PDF requests across every worker process on the host.
+
+    Each of the `slots` render slots and `queue_size` queue places is a lock
+    file in `directory`, held with flock() for as long as a request owns it.
+    The kernel drops the lock when a worker exits or crashes, so there is no
+    shared state to clean up. A request takes a free slot, or else a queue
+    place and polls for a slot until `wait_seconds` run out; with the queue
+    full it is rejected at once.
+
+    A queued request sleeps inside its request worker, so ensure_pdf_limiter
+    keeps slots + queue places within the host's workers minus a reserve
+    (see worker_bounded). Past the limiter, each process's RendererPool has
+    its own small queue for a free wkhtmltopdf process: web requests reach it
+    only while holding a slot, so it mostly absorbs PDF jobs and batch
+    renders, which do not take slots (batches have their own limiter, see
+    ensure_batch_limiter, and leave half of that queue free). A web request
+    therefore waits at most PDF_CONCURRENCY_WAIT_SECONDS here plus one
+    render time in the pool.
+    """
+
+    def __init__(self, directory, slots=DEFAULT_CONCURRENCY, queue_size=DEFAULT_QUEUE_SIZE,
+                 wait_seconds=DEFAULT_WAIT_SECONDS):
+        self.directory = Path(directory)
+        self.slots = max(0, int(slots))
+        self.queue_size = max(0, int(queue_size))
+        self.wait_seconds = wait_seconds
+        if self.enabled:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._hold_seconds = None  # moving average of how long a slot is held
+        self._stats = {'admitted': 0, 'queued': 0, 'rejected': 0, 'timeouts': 0, 'wait_seconds': 0.0}
+
+    @property
+    def enabled(self):
+        return self.slots > 0 and FCNTL_AVAILABLE
+
+    # -- lock files ---------------------------------------------------------
+
+    def _try_lock(self, name):
+        """The open lock file `name` if it could be locked without waiting, else None"""
+        handle = open(self.directory / name, 'a')
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return handle
+        except BlockingIOError:
+            handle.close()
+            return None
+
+    def _try_any(self, prefix, count):
+        for index in range(count):
+            handle = self._try_lock(f"{prefix}-{index}.lock")
+            if handle:
+                return handle
+        return None
+
+    def _held(self, prefix, count):
+        """How many of the lock files are held right now (each free one is locked for an instant)"""
+        held = 0
+        for index in range(count):
+            handle = self._try_lock(f"{prefix}-{index}.lock")
+            if handle:
+                handle.close()
+            else:
+                held += 1
+        return held
+
+    def _add_rejected(self):
+        """Bump the host-wide rejection counter shared by all workers"""
+        with open(self.directory / 'rejected.json', 'a+') as counter:
+            fcntl.flock(counter, fcntl.LOCK_EX)
+            counter.seek(0)
+            content = counter.read()
+            total = json.loads(content)['rejected'] + 1 if content.strip() else 1
+            counter.seek(0)
+            counter.truncate()
+            counter.write(json.dumps({'rejected': total}))
+
+    def _shared_rejected(self):
+        try:
+            content = (self.directory / 'rejected.json').read_text()
+        except FileNotFoundError:
+            return 0
+        return json.loads(content)['rejected'] if content.strip() else 0
+
+    # -- admission ----------------------------------------------------------
+
+    def retry_after(self):
+        """Seconds a rejected client should wait: the queue ahead of it drained at the recent pace"""
+        hold = self._hold_seconds or 1.0
+        estimate = math.ceil(hold * (self.queue_size / self.slots + 1))
+        return max(RETRY_AFTER_MIN, min(RETRY_AFTER_MAX, estimate))
+
+    def _reject(self, message, timed_out=False):
+        with self._lock:
+            self._stats['rejected'] += 1
+            if timed_out:
+                self._stats['timeouts'] += 1
+        self._add_rejected()
+        raise PdfQueueFull(message, self.retry_after())
+
+    def _acquire(self):
+        slot = self._try_any('slot', self.slots)
+        if slot:
+            return slot
+
+        ticket = self._try_any('queue', self.queue_size)
+        if ticket is None:
+            self._reject(f"All {self.slots} PDF slots are busy and {self.queue_size} requests are already waiting")
+        with self._lock:
+            self._stats['queued'] += 1
+        started = time.monotonic()
+        delay = POLL_MIN_SECONDS
+        try:
+            while True:
+                time.sleep(delay)
+                slot = self._try_any('slot', self.slots)
+                if slot:
+                    return slot
+                if time.monotonic() - started >= self.wait_seconds:
+                    self._reject(f"Timed out after {self.wait_seconds}s waiting for a PDF slot", timed_out=True)
+                delay = min(delay * 2, POLL_MAX_SECONDS)
+        finally:
+            ticket.close()
+            with self._lock:
+                self._stats['wait_seconds'] += time.monotonic() - started
+
+    def hold(self):
+        """
+        Take one slot and return the function that gives it back, for a slot
+        that outlives the view (a streamed response); raises PdfQueueFull
+        """
+        if not self.enabled:
+            return lambda: None
+        slot = self._acquire()
+        with self._lock:
+            self._stats['admitted'] += 1
+        held_at = time.monotonic()
+
+        def release():
+            if slot.closed:
+                return
+            slot.close()
+            held = time.monotonic() - held_at
+            with self._lock:
+                self._hold_seconds = held if self._hold_seconds is None else 0.8 * self._hold_seconds + 0.2 * held
+        return release
+
+    @contextmanager
+    def slot(self):
+        """Hold one render slot for the duration of the block; raises PdfQueueFull"""
+        release = self.hold()
+        try:
+            yield
+        finally:
+            release()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, wait_seconds=round(self._stats['wait_seconds'], 3))
+        stats.update(
+            enabled=self.enabled,
+            slots=self.slots,
+            queue_size=self.queue_size,
+            wait_limit_seconds=self.wait_seconds,
+            pid=os.getpid()
+        )
+        if self.enabled:
+            # Host-wide, from the lock files; the counters above are this process only
+            stats.update(
+                active=self._held('slot', self.slots),
+                queue_depth=self._held('queue', self.queue_size),
+                rejected_all_workers=self._shared_rejected(),
+                retry_after=self.retry_after()
+            )
+        return stats
+
+
+def worker_bounded(slots, queue_size, workers, reserve):
+    """
+    (slots, queue_size) cut down so that requests rendering or waiting for a
+    slot never hold more than `workers` - `reserve` request workers
+    """
+    available = max(1, workers - reserve)
+    slots = min(slots, available)
+    return slots, max(0, min(queue_size, available - slots))
+
+
+_limiter_lock = threading.Lock()
+
+
+def ensure_pdf_limiter(app):
+    """This process's limiter, created once from the app config"""
+    limiter = app.extensions.get('pdf_limiter')
+    if limiter is None:
+        with _limiter_lock:
+            limiter = app.extensions.get('pdf_limiter')
+            if limiter is None:
+                config = app.config
+                requested = (
+                    int(config.get('PDF_CONCURRENCY', DEFAULT_CONCURRENCY)),
+                    int(config.get('PDF_CONCURRENCY_QUEUE', DEFAULT_QUEUE_SIZE))
+                )
+                # A running batch holds a request worker too
+                workers = (int(config.get('WEB_CONCURRENCY', DEFAULT_WEB_WORKERS))
+                           - int(config.get('PDF_BATCH_CONCURRENCY', DEFAULT_BATCH_CONCURRENCY)))
+                reserve = int(config.get('PDF_WORKER_RESERVE', DEFAULT_WORKER_RESERVE))
+                slots, queue_size = worker_bounded(*requested, workers, reserve)
+                if (slots, queue_size) != requested:
+                    print(f"⚠️ PDF_CONCURRENCY/PDF_CONCURRENCY_QUEUE {requested[0]}/{requested[1]} lowered to "
+                          f"{slots}/{queue_size} to keep {reserve} of {workers} request workers free")
+                limiter = PdfSlotLimiter(
+                    config.get('PDF_CONCURRENCY_DIR') or DEFAULT_LIMITER_DIR,
+                    slots=slots,
+                    queue_size=queue_size,
+                    wait_seconds=config.get('PDF_CONCURRENCY_WAIT_SECONDS', DEFAULT_WAIT_SECONDS)
+                )
+                app.extensions['pdf_limiter'] = limiter
+    return limiter
+
+
+def ensure_batch_limiter(app):
+    """
+    This process's limiter for /batch: its own lock files, no queue (a batch
+    that finds every batch slot taken gets 429 at once)
+    """
+    limiter = app.extensions.get('pdf_batch_limiter')
+    if limiter is None:
+        with _limiter_lock:
+            limiter = app.extensions.get('pdf_batch_limiter')
+            if limiter is None:
+                config = app.config
+                limiter = PdfSlotLimiter(
+                    os.path.join(config.get('PDF_CONCURRENCY_DIR') or DEFAULT_LIMITER_DIR, 'batch'),
+                    slots=int(config.get('PDF_BATCH_CONCURRENCY', DEFAULT_BATCH_CONCURRENCY)),
+                    queue_size=0
+                )
+                app.extensions['pdf_batch_limiter'] = limiter
+    return limiter
+
+
+def queue_full_response(error):
+    """429 with Retry-After for a PdfQueueFull"""
+    print(f"⚠️ PDF request rejected: {str(error)}")
+    response = jsonify({
+        'error': 'Too many PDF requests',
+        'details': str(error),
+        'solution': f'Please try again in {error.retry_after} seconds'
+    })
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 429
+
+
+def pdf_slot_required(fn):
+    """
+    Decorator for PDF rendering routes: the view runs while holding a
+    host-wide render slot, or the request gets 429 with Retry-After
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        limiter = ensure_pdf_limiter(current_app)
+        try:
+            with limiter.slot():
+                return fn(*args, **kwargs)
+        except PdfQueueFull as e:
+            return queue_full_response(e)
+    return wrapper
@@ -0,0 +1,201 @@
+# backend/utils/pdf_metrics.py
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from .pdf_renderer import RendererBusy
+
+# Upper bounds (ms) of the latency histogram buckets; anything slower lands in +Inf
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Stages in the order a request goes through them (not every request has all of them)
+STAGES = ('assemble', 'template_data', 'cache', 'template', 'render', 'merge', 'optimize', 'write', 'send', 'total')
+
+# One JSON line per PDF request; own handler so it shows up without any logging setup
+logger = logging.getLogger('pdf.metrics')
+
+
+def _configure_logger():
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+
+class StageTimer:
+    """
+    Wall time of each stage of one PDF request: data assembly, template
+    context, cache lookup/store, Jinja rendering, the renderer itself, the
+    disk write and sending the response, plus the size of the PDF.
+    """
+
+    def __init__(self, form_type, route=None):
+        self.form_type = form_type
+        self.route = route
+        self.engine = None
+        self.cache_hit = None
+        self.bytes = None
+        self.stages = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._started
+
+
+class _Histogram:
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms):
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, fraction):
+        """Upper bound of the bucket holding the quantile (max_ms for the +Inf bucket)"""
+        if not self.count:
+            return None
+        rank, seen = fraction * self.count, 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else round(self.max_ms, 1)
+        return round(self.max_ms, 1)
+
+    def cumulative(self):
+        """(le, count) pairs as in a Prometheus histogram"""
+        pairs, seen = [], 0
+        for bound, count in zip(LATENCY_BUCKETS_MS + ('+Inf',), self.buckets):
+            seen += count
+            pairs.append((str(bound), seen))
+        return pairs
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum_ms': round(self.sum_ms, 1),
+            'max_ms': round(self.max_ms, 1),
+            'p50_ms': self.quantile(0.5),
+            'p95_ms': self.quantile(0.95),
+            'p99_ms': self.quantile(0.99),
+            'buckets': dict(self.cumulative())
+        }
+
+
+class PdfMetrics:
+    """
+    Per-process PDF metrics: a latency histogram per form type and stage,
+    request, failure and cache-hit counts, and PDF byte counts. Every
+    recorded request is also logged as one JSON line on 'pdf.metrics'.
+    """
+
+    def __init__(self, log=True):
+        self.log = log
+        if log:
+            _configure_logger()
+        self._lock = threading.Lock()
+        self._started_at = datetime.utcnow().isoformat()
+        self._stages = {}
+        self._forms = {}
+
+    def record(self, timer, status='ok', error=None):
+        total = timer.elapsed
+        stages_ms = {name: round(seconds * 1000, 2) for name, seconds in timer.stages.items()}
+        stages_ms['total'] = round(total * 1000, 2)
+
+        with self._lock:
+            form = self._forms.setdefault(timer.form_type, {
+                'requests': 0, 'failures': 0, 'busy': 0, 'cache_hits': 0, 'bytes': 0, 'max_bytes': 0
+            })
+            form['requests'] += 1
+            if status == 'busy':
+                form['busy'] += 1
+            elif status != 'ok':
+                form['failures'] += 1
+            if timer.cache_hit:
+                form['cache_hits'] += 1
+            if timer.bytes:
+                form['bytes'] += timer.bytes
+                form['max_bytes'] = max(form['max_bytes'], timer.bytes)
+            for name, ms in stages_ms.items():
+                self._stages.setdefault((timer.form_type, name), _Histogram()).observe(ms)
+
+        if self.log:
+            record = {
+                'event': 'pdf_request',
+                'form': timer.form_type,
+                'route': timer.route,
+                'engine': timer.engine,
+                'status': status,
+                'cache_hit': timer.cache_hit,
+                'bytes': timer.bytes,
+                'stages_ms': stages_ms,
+                'pid': os.getpid()
+            }
+            if error:
+                record['error'] = str(error)
+            logger.info(json.dumps(record))
+
+    def record_failure(self, timer, error):
+        self.record(timer, 'busy' if isinstance(error, RendererBusy) else 'error', error=error)
+
+    def snapshot(self):
+        with self._lock:
+            forms = {name: dict(counts) for name, counts in self._forms.items()}
+            for (form_type, stage), histogram in self._stages.items():
+                forms[form_type].setdefault('stages', {})[stage] = histogram.snapshot()
+        for counts in forms.values():
+            counts['stages'] = {stage: counts['stages'][stage] for stage in STAGES if stage in counts['stages']}
+        return {
+            'pid': os.getpid(),
+            'since': self._started_at,
+            'bucket_bounds_ms': list(LATENCY_BUCKETS_MS),
+            'forms': forms
+        }
+
+    def prometheus(self):
+        """The same numbers in the Prometheus text exposition format"""
+        lines = [
+            '# HELP pdf_stage_duration_milliseconds Time spent in each PDF generation stage',
+            '# TYPE pdf_stage_duration_milliseconds histogram'
+        ]
+        with self._lock:
+            for (form_type, stage), histogram in sorted(self._stages.items()):
+                labels = f'form="{form_type}",stage="{stage}"'
+                for bound, count in histogram.cumulative():
+                    lines.append(f'pdf_stage_duration_milliseconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'pdf_stage_duration_milliseconds_sum{{{labels}}} {histogram.sum_ms:.3f}')
+                lines.append(f'pdf_stage_duration_milliseconds_count{{{labels}}} {histogram.count}')
+            forms = sorted((name, dict(counts)) for name, counts in self._forms.items())
+
+        for metric, key, help_text in (
+            ('pdf_requests_total', 'requests', 'PDF requests recorded'),
+            ('pdf_failures_total', 'failures', 'PDF requests that failed'),
+            ('pdf_busy_total', 'busy', 'PDF requests rejected because the renderers were busy'),
+            ('pdf_cache_hits_total', 'cache_hits', 'PDF requests served from the cache'),
+            ('pdf_bytes_total', 'bytes', 'Bytes of PDF produced')
+        ):
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} counter']
+            lines += [f'{metric}{{form="{name}"}} {counts[key]}' for name, counts in forms]
+        return '\n'.join(lines) + '\n'
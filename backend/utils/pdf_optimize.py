@@ -0,0 +1,222 @@
+# backend/utils/pdf_optimize.py
+import base64
+import hashlib
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+
+# Try to import pdfrw with fallback (without it PDFs are served as rendered)
+try:
+    from pdfrw import PdfArray, PdfDict, PdfReader, PdfWriter # type: ignore
+    PDFRW_AVAILABLE = True
+except ImportError:
+    PDFRW_AVAILABLE = False
+
+# Page resource categories whose entries are shared when identical
+RESOURCE_CATEGORIES = ('/Font', '/XObject', '/ExtGState', '/ColorSpace', '/Pattern', '/Shading')
+
+QPDF_TIMEOUT_SECONDS = 30
+
+
+def _fingerprint(obj, memo):
+    """Content hash of a pdfrw object graph (ignoring /Parent back-links), memoized by identity"""
+    key = id(obj)
+    if key in memo:
+        # None marks an object still being hashed: a cycle, never treated as a duplicate
+        return memo[key] or f"cycle:{key}"
+    if isinstance(obj, PdfDict):
+        memo[key] = None
+        hasher = hashlib.sha1(b'dict')
+        for name in sorted(obj.keys()):
+            if name != '/Parent':
+                hasher.update(f"{name}={_fingerprint(obj[name], memo)};".encode('latin-1', 'replace'))
+        if obj.stream is not None:
+            hasher.update(b'stream')
+            hasher.update(obj.stream.encode('latin-1', 'replace'))
+        digest = hasher.hexdigest()
+    elif isinstance(obj, PdfArray):
+        memo[key] = None
+        hasher = hashlib.sha1(b'array')
+        for item in obj:
+            hasher.update(f"{_fingerprint(item, memo)};".encode('latin-1', 'replace'))
+        digest = hasher.hexdigest()
+    else:
+        digest = f"{type(obj).__name__}:{obj}"
+    memo[key] = digest
+    return digest
+
+
+def dedupe_resources(pages):
+    """
+    Point identical fonts, images and other page resources (and identical
+    content streams) at one shared object, so PdfWriter stores each once.
+    Matters most for PDFs joined from separately rendered parts. Returns
+    how many references were redirected.
+    """
+    memo, canonical, replaced = {}, {}, 0
+
+    def share(obj):
+        nonlocal replaced
+        if not isinstance(obj, (PdfDict, PdfArray)):
+            return obj
+        first = canonical.setdefault(_fingerprint(obj, memo), obj)
+        if first is not obj:
+            replaced += 1
+        return first
+
+    for page in pages:
+        resources = page.inheritable.Resources
+        if resources is not None:
+            for category in RESOURCE_CATEGORIES:
+                entries = resources[category]
+                if isinstance(entries, PdfDict):
+                    for name in list(entries.keys()):
+                        entries[name] = share(entries[name])
+        contents = page.Contents
+        if isinstance(contents, PdfArray):
+            page.Contents = PdfArray(share(stream) for stream in contents)
+        elif contents is not None:
+            page.Contents = share(contents)
+    return replaced
+
+
+def _stream_objects(pages):
+    """Every stream reachable from `pages` (not following /Parent), once each"""
+    seen, pending = set(), list(pages)
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, PdfDict):
+            if obj.stream is not None:
+                yield obj
+            pending.extend(value for name, value in obj.iteritems() if name != '/Parent')
+        elif isinstance(obj, PdfArray):
+            pending.extend(obj)
+
+
+def strip_ascii85(pages):
+    """
+    Decode the ASCII85 text layer of streams (ReportLab writes
+    ASCII85 + Flate), which adds a quarter to their size for no benefit in
+    a binary file; what is left keeps its other filters, or is compressed
+    by the writer. Returns how many streams were changed.
+    """
+    changed = 0
+    for obj in _stream_objects(pages):
+        filters = obj.Filter
+        parms = obj.DecodeParms
+        if isinstance(filters, PdfArray):
+            if not filters or filters[0] != '/ASCII85Decode':
+                continue
+            rest = list(filters[1:])
+            rest_parms = list(parms[1:]) if isinstance(parms, PdfArray) else None
+        elif filters == '/ASCII85Decode':
+            rest, rest_parms = [], None
+        else:
+            continue
+        data = obj.stream.encode('latin-1').strip()
+        if data.startswith(b'<~'):
+            data = data[2:]
+        if data.endswith(b'~>'):
+            data = data[:-2]
+        obj.stream = base64.a85decode(data).decode('latin-1')
+        obj.Filter = (rest[0] if len(rest) == 1 else PdfArray(rest)) if rest else None
+        obj.DecodeParms = (
+            (rest_parms[0] if len(rest_parms) == 1 else PdfArray(rest_parms)) if rest_parms and any(rest_parms) else None
+        )
+        changed += 1
+    return changed
+
+
+class PdfOptimizer:
+    """
+    Post-processes rendered PDFs before they are cached or sent: identical
+    resources are stored once, ASCII85 layers are dropped and uncompressed
+    streams are Flate-compressed (pdfrw). Then, when qpdf is installed and
+    `linearize` is on, the file is linearized for fast first-page display.
+    A PDF that cannot be processed, or would not get smaller, is returned
+    unchanged.
+    """
+
+    def __init__(self, enabled=True, linearize=True, qpdf_path=None):
+        self.enabled = bool(enabled) and PDFRW_AVAILABLE
+        self.qpdf_path = qpdf_path or shutil.which('qpdf')
+        self.linearize = bool(linearize) and bool(self.qpdf_path) and os.access(self.qpdf_path, os.X_OK)
+        self._lock = threading.Lock()
+        self._stats = {'optimized': 0, 'unchanged': 0, 'failures': 0, 'linearized': 0,
+                       'bytes_in': 0, 'bytes_out': 0, 'shared_resources': 0}
+
+    @property
+    def signature(self):
+        """Part of the cache key, so toggling optimization never serves the other variant"""
+        if not self.enabled:
+            return None
+        return 'dedupe+a85+flate' + ('+linearized' if self.linearize else '')
+
+    def _rewrite(self, pdf_bytes):
+        reader = PdfReader(fdata=pdf_bytes)
+        shared = dedupe_resources(reader.pages)
+        strip_ascii85(reader.pages)
+        writer = PdfWriter(compress=True)
+        writer.addpages(reader.pages)
+        if reader.Info:
+            writer.trailer.Info = reader.Info
+        output = io.BytesIO()
+        writer.write(output)
+        return output.getvalue(), shared
+
+    def _linearize(self, pdf_bytes):
+        with tempfile.TemporaryDirectory(prefix='pdf_linearize_') as directory:
+            source = os.path.join(directory, 'in.pdf')
+            target = os.path.join(directory, 'out.pdf')
+            with open(source, 'wb') as handle:
+                handle.write(pdf_bytes)
+            completed = subprocess.run(
+                [self.qpdf_path, '--linearize', '--object-streams=generate', '--compress-streams=y', source, target],
+                capture_output=True, timeout=QPDF_TIMEOUT_SECONDS
+            )
+            # qpdf exits 3 for warnings with a usable result
+            if completed.returncode not in (0, 3) or not os.path.exists(target):
+                raise Exception(completed.stderr.decode('utf-8', errors='replace').strip() or 'qpdf failed')
+            with open(target, 'rb') as handle:
+                return handle.read()
+
+    def optimize(self, pdf_bytes):
+        if not self.enabled:
+            return pdf_bytes
+        try:
+            optimized, shared = self._rewrite(pdf_bytes)
+            linearized = False
+            if self.linearize:
+                optimized, linearized = self._linearize(optimized), True
+        except Exception as e:
+            print(f"⚠️ PDF optimization skipped: {str(e)}")
+            with self._lock:
+                self._stats['failures'] += 1
+            return pdf_bytes
+
+        # Linearized output is kept even if a little larger: it displays sooner
+        keep = linearized or len(optimized) < len(pdf_bytes)
+        result = optimized if keep else pdf_bytes
+        with self._lock:
+            self._stats['optimized' if keep else 'unchanged'] += 1
+            self._stats['linearized'] += int(keep and linearized)
+            self._stats['shared_resources'] += shared
+            self._stats['bytes_in'] += len(pdf_bytes)
+            self._stats['bytes_out'] += len(result)
+        return result
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(
+            enabled=self.enabled,
+            linearize=self.linearize,
+            saved_ratio=round(1 - stats['bytes_out'] / stats['bytes_in'], 4) if stats['bytes_in'] else None
+        )
+        return stats
@@ -0,0 +1,293 @@
+# backend/utils/pdf_renderer.py
+import atexit
+import os
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+
+# Try to import resource with fallback (the memory cap needs prlimit(), Linux only)
+try:
+    import resource
+    RESOURCE_AVAILABLE = hasattr(resource, 'prlimit')
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_QUEUE_SIZE = 8
+DEFAULT_RENDER_TIMEOUT = 60
+DEFAULT_MEMORY_LIMIT_MB = 1024
+DEFAULT_MAX_IDLE_SECONDS = 300
+
+
+class RendererError(IOError):
+    """The renderer exited with an error and produced no output"""
+
+
+class RendererTimeout(RendererError):
+    """A render exceeded the per-job timeout; its process was killed"""
+
+
+class RendererBusy(RendererError):
+    """Every renderer is busy and the wait queue is full (or the wait timed out)"""
+
+
+class RendererPool:
+    """
+    Bounded pool of pre-started renderer processes.
+
+    wkhtmltopdf renders one document per process and has no server mode, so
+    "warm" here means a process that has already been exec'd and finished
+    its Qt / font start-up while blocked reading HTML from stdin. A render
+    takes a warm process (a background thread starts its replacement),
+    feeds it the HTML and reads the PDF from stdout.
+
+    - at most `size` renders run at once; up to `queue_size` callers wait
+      for a slot, anything beyond that is rejected with RendererBusy
+    - a render running longer than `timeout` seconds is killed and replaced
+    - each process gets an address-space limit of `memory_limit_mb` (Linux)
+    - idle processes older than `max_idle_seconds` are recycled
+    """
+
+    def __init__(self, args, size=DEFAULT_POOL_SIZE, queue_size=DEFAULT_QUEUE_SIZE,
+                 timeout=DEFAULT_RENDER_TIMEOUT, memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB,
+                 max_idle_seconds=DEFAULT_MAX_IDLE_SECONDS, env=None):
+        self.args = list(args)
+        self.size = max(1, int(size))
+        self.queue_size = max(0, int(queue_size))
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.max_idle_seconds = max_idle_seconds
+        self.env = env
+
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._warm = deque()
+        self._closed = False
+        self._replenishing = False
+        self._started_at = time.monotonic()
+        self._stats = {
+            'renders': 0,
+            'failures': 0,
+            'timeouts': 0,
+            'rejected': 0,
+            'recycled': 0,
+            'busy': 0,
+            'waiting': 0,
+            'peak_busy': 0,
+            'peak_waiting': 0,
+            'busy_seconds': 0.0,
+            'wait_seconds': 0.0
+        }
+        atexit.register(self.close)
+
+    # -- process management -------------------------------------------------
+
+    def _limit_memory(self, process):
+        # Set from the parent after the spawn: a preexec_fn is not safe in a
+        # threaded server (request, batch and job threads all spawn)
+        limit = int(self.memory_limit_mb) * 1024 * 1024
+        try:
+            resource.prlimit(process.pid, resource.RLIMIT_AS, (limit, limit))
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def _spawn(self, args=None):
+        process = subprocess.Popen(
+            args or self.args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=self.env,
+            # Own process group, so a kill also takes down any children
+            start_new_session=(os.name == 'posix')
+        )
+        if self.memory_limit_mb and RESOURCE_AVAILABLE:
+            self._limit_memory(process)
+        return process, time.monotonic()
+
+    @staticmethod
+    def _kill(process):
+        if process.poll() is None:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except (AttributeError, OSError):
+                process.kill()
+        try:
+            process.communicate(timeout=5)
+        except (subprocess.TimeoutExpired, ValueError, OSError):
+            pass
+
+    def _take_process(self):
+        """A live warm process if there is one, otherwise a fresh one"""
+        now, stale, found = time.monotonic(), [], None
+        with self._lock:
+            while self._warm:
+                process, spawned_at = self._warm.popleft()
+                if process.poll() is None and now - spawned_at <= self.max_idle_seconds:
+                    found = process
+                    break
+                self._stats['recycled'] += 1
+                stale.append(process)
+        for process in stale:
+            self._kill(process)
+        return found or self._spawn()[0]
+
+    def _replenish(self):
+        """Top the warm set back up to `size` idle processes"""
+        while True:
+            with self._lock:
+                if self._closed or len(self._warm) >= self.size:
+                    return
+            spawned = self._spawn()
+            with self._lock:
+                surplus = self._closed or len(self._warm) >= self.size
+                if not surplus:
+                    self._warm.append(spawned)
+            if surplus:
+                self._kill(spawned[0])
+                return
+
+    def _replenish_in_background(self):
+        """Start replacements off the request path; one top-up thread at a time"""
+        with self._lock:
+            if self._closed or self._replenishing:
+                return
+            self._replenishing = True
+
+        def run():
+            try:
+                self._replenish()
+            except Exception as e:
+                print(f"⚠️ Could not start warm PDF renderers: {str(e)}")
+            finally:
+                with self._lock:
+                    self._replenishing = False
+
+        threading.Thread(target=run, name='pdf-renderer-replenish', daemon=True).start()
+
+    def warm_up(self):
+        """Start the idle processes now instead of on the first render"""
+        self._replenish()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            warm, self._warm = list(self._warm), deque()
+        for process, _ in warm:
+            self._kill(process)
+
+    # -- rendering ----------------------------------------------------------
+
+    def _acquire_slot(self):
+        with self._lock:
+            if not self._slots.acquire(blocking=False):
+                if self._stats['waiting'] >= self.queue_size:
+                    self._stats['rejected'] += 1
+                    raise RendererBusy(f"All {self.size} PDF renderers are busy and the queue is full")
+                self._stats['waiting'] += 1
+                self._stats['peak_waiting'] = max(self._stats['peak_waiting'], self._stats['waiting'])
+                queued = True
+            else:
+                queued = False
+
+        if queued:
+            started = time.monotonic()
+            acquired = self._slots.acquire(timeout=self.timeout)
+            with self._lock:
+                self._stats['waiting'] -= 1
+                self._stats['wait_seconds'] += time.monotonic() - started
+                if not acquired:
+                    self._stats['rejected'] += 1
+            if not acquired:
+                raise RendererBusy(f"Timed out after {self.timeout}s waiting for a PDF renderer")
+
+        with self._lock:
+            self._stats['busy'] += 1
+            self._stats['peak_busy'] = max(self._stats['peak_busy'], self._stats['busy'])
+
+    def _release_slot(self, started):
+        with self._lock:
+            self._stats['busy'] -= 1
+            self._stats['busy_seconds'] += time.monotonic() - started
+        self._slots.release()
+
+    def _communicate(self, process, html):
+        try:
+            stdout, stderr = process.communicate(input=html, timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            self._kill(process)
+            with self._lock:
+                self._stats['timeouts'] += 1
+                self._stats['failures'] += 1
+            raise RendererTimeout(f"PDF rendering exceeded {self.timeout}s and was killed")
+
+        # wkhtmltopdf may exit non-zero after writing a usable document
+        # (e.g. an unreachable asset), so only a missing PDF is an error
+        if process.returncode != 0 and not stdout:
+            with self._lock:
+                self._stats['failures'] += 1
+            message = stderr.decode('utf-8', errors='replace').strip() or 'Unknown Error'
+            raise RendererError(f"Renderer exited with code {process.returncode}: {message}")
+
+        with self._lock:
+            self._stats['renders'] += 1
+        return stdout
+
+    def render(self, html):
+        """Render an HTML string (or bytes) and return the output bytes"""
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+
+        self._acquire_slot()
+        started = time.monotonic()
+        try:
+            process = self._take_process()
+            self._replenish_in_background()
+            return self._communicate(process, html)
+        finally:
+            self._release_slot(started)
+
+    def render_many(self, documents):
+        """
+        Render several HTML documents into one output, in order, with a
+        single renderer process. The pool's argv ends with "<input> <output>"
+        ("- -"); wkhtmltopdf takes any number of inputs but only one from
+        stdin, so here the documents are written to a private temporary
+        directory and passed as file inputs. That argv differs from the warm
+        processes', so this render always starts a fresh process.
+        """
+        self._acquire_slot()
+        started = time.monotonic()
+        try:
+            with tempfile.TemporaryDirectory(prefix='pdf-render-') as workdir:
+                inputs = []
+                for index, html in enumerate(documents):
+                    path = os.path.join(workdir, f"{index:03d}.html")
+                    with open(path, 'wb') as f:
+                        f.write(html.encode('utf-8') if isinstance(html, str) else html)
+                    inputs.append(path)
+                process, _ = self._spawn(self.args[:-2] + inputs + self.args[-1:])
+                return self._communicate(process, None)
+        finally:
+            self._release_slot(started)
+
+    def stats(self):
+        """Counters plus utilization: share of slot-time spent rendering since start"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['warm'] = len(self._warm)
+        uptime = time.monotonic() - self._started_at
+        stats.update(
+            size=self.size,
+            queue_size=self.queue_size,
+            timeout=self.timeout,
+            memory_limit_mb=self.memory_limit_mb,
+            utilization=round(stats['busy_seconds'] / (uptime * self.size), 4) if uptime else 0.0,
+            busy_seconds=round(stats['busy_seconds'], 3),
+            wait_seconds=round(stats['wait_seconds'], 3),
+            avg_render_ms=round(stats['busy_seconds'] * 1000 / stats['renders'], 1) if stats['renders'] else None
+        )
+        return stats
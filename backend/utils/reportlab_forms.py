@@ -0,0 +1,279 @@
+# backend/utils/reportlab_forms.py
+"""
+ReportLab drawings of forms 501A, 519A and 520B.
+
+An in-process alternative to the HTML templates + wkhtmltopdf: each form is
+built straight from the same template context (utils/form_schemas.py) as
+platypus tables, following the layout of
+templates/<form>.html. No subprocess and no HTML layout pass.
+"""
+import io
+from xml.sax.saxutils import escape
+
+# Try to import reportlab with fallback
+try:
+    from reportlab.lib import colors # type: ignore
+    from reportlab.lib.pagesizes import A4 # type: ignore
+    from reportlab.lib.styles import ParagraphStyle # type: ignore
+    from reportlab.lib.units import mm # type: ignore
+    from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle # type: ignore
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+
+COMPANY = 'AdiraMedica LLC'
+EFFECTIVE_DATE = 'Effective Date: 03OCT2022'
+
+if REPORTLAB_AVAILABLE:
+    PAGE_WIDTH = A4[0] - 20 * mm
+    TEXT = ParagraphStyle('form-text', fontName='Helvetica', fontSize=8, leading=10)
+    LABEL = ParagraphStyle('form-label', parent=TEXT, fontName='Helvetica-Bold')
+    SMALL = ParagraphStyle('form-small', parent=TEXT, fontSize=7, leading=9)
+    TITLE = ParagraphStyle('form-title', parent=TEXT, fontName='Helvetica-Bold', fontSize=10, leading=12)
+    STAMP = ParagraphStyle(
+        'form-stamp', parent=TITLE, fontSize=28, leading=32, alignment=1, textColor=colors.red
+    )
+    GRID = [
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('TOPPADDING', (0, 0), (-1, -1), 2),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+    ]
+
+
+def _text(value, style=None):
+    return Paragraph(escape('' if value is None else str(value)).replace('\n', '<br/>'), style or TEXT)
+
+
+def _label(value):
+    return Paragraph(escape(value).replace('\n', '<br/>'), LABEL)
+
+
+def _box(checked, label=''):
+    """Checkbox glyph (ZapfDingbats) followed by its label"""
+    glyph = 'n' if checked else 'o'
+    return Paragraph(f'<font name="ZapfDingbats">{glyph}</font> {escape(label)}', TEXT)
+
+
+def _get(mapping, key):
+    """mapping[key] for dict-shaped context values; anything else reads as unset, as in Jinja"""
+    return mapping.get(key) if isinstance(mapping, dict) else None
+
+
+def _table(rows, widths, extra_style=(), repeat_rows=0, row_heights=None):
+    table = Table(
+        rows, colWidths=[PAGE_WIDTH * width for width in widths], rowHeights=row_heights, repeatRows=repeat_rows
+    )
+    table.setStyle(TableStyle(GRID + list(extra_style)))
+    return table
+
+
+def _header(form_number, title):
+    return [
+        _table([
+            [_label(COMPANY), _text('Form Number:'), _label(form_number)],
+            [_text(f'Title: {title}'), _text('Revision Number:'), _text('01')]
+        ], (0.5, 0.25, 0.25)),
+        Spacer(1, 3 * mm)
+    ]
+
+
+def _footer():
+    return [Spacer(1, 3 * mm), _text(EFFECTIVE_DATE, SMALL)]
+
+
+def story_501a(context):
+    status = context.get('locationStatus') or {}
+    date_type = context.get('dateType')
+    story = _header('FORM-501A', 'CTM Inventory Record')
+
+    fields = [
+        ('Item Description', 'item_description'), ('Client Name', 'client_name'),
+        ('Vendor Name', 'vendor_name'), ('Lot No.', 'lot_no'),
+        ('Storage Conditions', 'storage_conditions'), ('Other Storage Conditions', 'other_storage_conditions'),
+        ('Total Units Received/UOM', 'total_units_received'), ('Controlled Substance', 'controlled_substance')
+    ]
+    rows = [[_label('Receiving No.'), _text(context.get('receiving_no')), _label('Item No.'), _text(context.get('item_no'))]]
+    rows += [[_label(name), _text(context.get(key)), '', ''] for name, key in fields]
+    rows[1][2] = Paragraph('QUARANTINE', STAMP)
+    rows += [
+        [_label('Location by Status'), [
+            _box(_get(status, 'quarantine'), 'Quarantine'),
+            _box(_get(status, 'rejected'), 'Rejected'),
+            _box(_get(status, 'released'), 'Released')
+        ], '', ''],
+        [[
+            _box(date_type == 'Expiration Date', 'Expiration Date'),
+            _box(date_type == 'Retest Date', 'Retest Date'),
+            _box(date_type == 'Use-by-Date', 'Use-by-Date')
+        ], '', _text(context.get('dateValue')), ''],
+        [_text(f"Completed By (Name and Initials)/Date: {context.get('completedBy') or ''}"), '', '', '']
+    ]
+    last = len(rows) - 1
+    story.append(_table(rows, (0.15, 0.35, 0.15, 0.35), [
+        # QUARANTINE block beside the eight detail rows
+        ('SPAN', (2, 1), (3, len(fields))),
+        ('SPAN', (1, last - 2), (3, last - 2)),
+        ('SPAN', (0, last - 1), (1, last - 1)),
+        ('SPAN', (2, last - 1), (3, last - 1)),
+        ('SPAN', (0, last), (3, last)),
+    ]))
+    story.append(Spacer(1, 3 * mm))
+
+    transactions = [[_label(name) for name in (
+        'Date', 'Reason', 'Transaction\n(In/Out/Adjust)', 'Quantity', 'Balance', 'Balance\nLocation', 'Entered By/Initials'
+    )]]
+    for transaction in context.get('transactions') or []:
+        transactions.append([_text(_get(transaction, key)) for key in (
+            'date', 'reason', 'transactionType', 'quantity', 'balance', 'balanceLocation', 'enteredBy'
+        )])
+    story.append(_table(transactions, (0.15, 0.2, 0.15, 0.1, 0.1, 0.15, 0.15), repeat_rows=1))
+    story.append(Spacer(1, 3 * mm))
+
+    story.append(_table(
+        [[_label('Comments:')], [_text(context.get('comments'))]], (1,),
+        [('VALIGN', (0, 1), (0, 1), 'TOP')], row_heights=[None, 20 * mm]
+    ))
+    return story + _footer()
+
+
+def story_519a(context):
+    story = _header('FORM-519A', 'Temperature Exposure Record')
+    rows = [
+        [_label('Receiving No.:'), _text(context.get('receiving_no')), _label('Item No.'), _text(context.get('item_no'))],
+        [_label('Item Description:'), _text(context.get('item_description')), '', _text(f"Lot No.:\n{context.get('lot_no') or ''}")],
+        [_label('Storage Conditions:'), _text(context.get('storage_conditions')),
+         _label('Date and Time\nReceived'), _text(context.get('date_time_received'))],
+        [_label('Other Storage Conditions'), _text(context.get('other_storage_conditions')), '', ''],
+        [_label('Temperature Device on\nAlarm'), _text(context.get('temp_device_alarm')),
+         _label('Temperature Device\nDeactivated'), _text(context.get('temp_device_deactivated'))],
+        [_label('Temperature Device\nReturned to Courier'), _text(context.get('temp_device_returned')),
+         _label('Maximum Exposure\nTime'), _text(context.get('max_exposure_time'))],
+        [_label('Temper Time'), _text(context.get('temper_time')),
+         _label('Working Exposure\nTime'), _text(context.get('working_exposure_time'))],
+        [_text('NOTE: Create one Temperature Exposure Record for each container. DO NOT place insulated '
+               'containers or dry ice inside a temperature-controlled storage unit', SMALL), '', '', ''],
+        [_label('Container No.'), _label('Total Units/\nContainer'), _label('Record Created By/Date'), ''],
+        [_text(context.get('container_no')), _text(context.get('total_units_per_container')),
+         _text(f"{context.get('record_created_by') or ''} {context.get('record_created_date') or ''}"), '']
+    ]
+    story.append(_table(rows, (0.25, 0.25, 0.25, 0.25), [
+        ('SPAN', (1, 1), (2, 1)),
+        ('SPAN', (1, 3), (3, 3)),
+        ('SPAN', (0, 7), (3, 7)),
+        ('SPAN', (2, 8), (3, 8)),
+        ('SPAN', (2, 9), (3, 9)),
+    ]))
+    story += [Spacer(1, 4 * mm), _text('DRUG MOVEMENT:', TITLE), Spacer(1, 2 * mm)]
+
+    movements = [[_label(name) for name in (
+        'Destination/\nComments', 'Date', 'Time', 'Exposure\nTime (ET)', 'Cumulative\nET', 'Completed\nBy/Date', 'Verified\nBy/Date'
+    )]]
+    carried_style = []
+    if 'carried_forward_et' in context:
+        # Continuation page of a paginated history (see paginate_movements)
+        movements.append([
+            _text(f"Carried forward from page {context['page_number'] - 1}"), '', '', '',
+            _text(context['carried_forward_et']), '', ''
+        ])
+        carried_style = [('SPAN', (0, 1), (3, 1)), ('SPAN', (5, 1), (6, 1)), ('BACKGROUND', (0, 1), (-1, 1), colors.whitesmoke)]
+    for movement in context.get('drug_movements') or []:
+        movements.append([_text(_get(movement, key)) for key in (
+            'destination', 'date', 'time', 'exposure_time', 'cumulative_et', 'completed_by', 'verified_by'
+        )])
+    story.append(_table(movements, (0.2, 0.12, 0.12, 0.14, 0.14, 0.14, 0.14), carried_style, repeat_rows=1))
+
+    story += [
+        Spacer(1, 3 * mm),
+        _text('Notes:'),
+        Paragraph('1. Exposure Time <font color="red"><b>MUST NOT EXCEED</b></font> the Working Exposure Time', TEXT),
+        Paragraph('2. Cumulative Exposure Time <font color="red"><b>MUST NOT EXCEED</b></font> the Maximum Exposure Time', TEXT)
+    ]
+    story += _footer()
+    if context.get('page_count'):
+        story.append(_text(f"Page {context['page_number']} of {context['page_count']}", SMALL))
+    return story
+
+
+def _field(name, value):
+    return [_label(name), _text(value)]
+
+
+def story_520b(context):
+    acceptance = context.get('deliveryAcceptance')
+    not_applicable = context.get('deliveryAcceptanceNA') or {}
+    date_type = context.get('dateType')
+    story = _header('FORM-520B', 'CTM Material Receiving Report')
+
+    story += [_text('Delivery Acceptance (Complete At Material Delivery)', TITLE), Spacer(1, 1 * mm)]
+    story.append(_table([
+        [_field('Item No.', context.get('item_no')), _field('Tracking No.', context.get('tracking_no')),
+         _field('Client Name', context.get('client_name'))],
+        [_field('Item Description', context.get('item_description')), '', ''],
+        [_field('Storage Conditions:Temperature', context.get('storage_conditions_temp')), '',
+         _field('Other', context.get('storage_conditions_other'))]
+    ], (0.25, 0.35, 0.4), [('SPAN', (0, 1), (2, 1)), ('SPAN', (0, 2), (1, 2))]))
+
+    options = []
+    for label, key in (
+        ('Material placed in storage as documented above', 'material_placed'),
+        ('Discrepancies and/or damaged documented on the shipping paperwork', 'discrepancies'),
+        ('Supporting documentation received attached', 'supporting_docs'),
+        ('Shipment REJECTED. Reason documented on the shipping paperwork', 'shipment_rejected')
+    ):
+        options.append([
+            _text(label), _box(_get(not_applicable, key), 'N/A'),
+            _box(_get(acceptance, f'{key}_yes'), 'Yes'), _box(_get(acceptance, f'{key}_no'), 'No')
+        ])
+    options.append([_text(f"Completed By (Name and Initials)/Date: {context.get('deliveryCompletedBy') or ''}"), '', '', ''])
+    story.append(_table(options, (0.61, 0.13, 0.13, 0.13), [('SPAN', (0, len(options) - 1), (3, len(options) - 1))]))
+
+    story += [Spacer(1, 3 * mm), _text('Receiving Report', TITLE), Spacer(1, 1 * mm)]
+    story.append(_table([
+        [_field('RN', context.get('receiving_no')), _field('Lot No.', context.get('lot_no')), _field('PO No.', context.get('po_no'))],
+        [_field('Vendor', context.get('vendor')), '', _field('Protocol No.', context.get('protocol_no'))],
+        [_field('UoM', context.get('uom')), _field('Total Units (vendor count):', context.get('total_units')),
+         _field('Total Storage Containers', context.get('total_containers'))],
+        [[_box(date_type == 'Expiration Date', 'Expiry Date'), _box(date_type == 'Retest Date', 'Retest Date'),
+          _box(date_type == 'Use-by-Date', 'Use-by-Date')], _text(context.get('dateValue')), '']
+    ], (1 / 3, 1 / 3, 1 / 3), [('SPAN', (0, 1), (1, 1)), ('SPAN', (1, 3), (2, 3))]))
+
+    documents = [_text('Verified the following Receiving Documents:\n(Check all that apply)')]
+    documents += [_box(_get(doc, 'checked'), _get(doc, 'name') or '') for doc in context.get('documentVerification') or []]
+    issues = [_text('Check all that apply and explain in the comments section')]
+    issues += [_box(_get(issue, 'checked'), _get(issue, 'name') or '') for issue in context.get('issuesSection') or []]
+    issues.append(_text(f"NCMR: {context.get('ncmr') or ''}"))
+    story.append(_table([
+        [documents, issues],
+        [[_text('Comments'), _text(context.get('comments'))], ''],
+        [_text(f"Received By (Name and Initials)/Date: {context.get('receivingCompletedBy') or ''}"), '']
+    ], (0.5, 0.5), [('SPAN', (0, 1), (1, 1)), ('SPAN', (0, 2), (1, 2)), ('VALIGN', (0, 0), (-1, 0), 'TOP')]))
+    return story + _footer()
+
+
+FORM_STORIES = {
+    '501A': story_501a,
+    '519A': story_519a,
+    '520B': story_520b
+}
+
+
+def render_forms(pages):
+    """
+    One PDF from `pages`, a list of (form type, template context), each form
+    starting on a new page. Returns the PDF bytes.
+    """
+    story = []
+    for index, (form_type, context) in enumerate(pages):
+        if index:
+            story.append(PageBreak())
+        story += FORM_STORIES[form_type](context)
+
+    output = io.BytesIO()
+    document = SimpleDocTemplate(
+        output, pagesize=A4,
+        leftMargin=10 * mm, rightMargin=10 * mm, topMargin=10 * mm, bottomMargin=10 * mm,
+        title=' + '.join(f"FORM-{form_type}" for form_type, _ in pages), author=COMPANY
+    )
+    document.build(story)
+    return output.getvalue()
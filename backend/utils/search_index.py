@@ -0,0 +1,132 @@
+# backend/utils/search_index.py
+import threading
+from bisect import bisect_left
+from flask import current_app
+from sqlalchemy import case, func, or_ # type: ignore
+from ..extensions import db
+from .conditional import collection_versions
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+# Postgres trigram indexes only help once the query has a full trigram, so
+# shorter queries match key prefixes only (on every backend)
+MIN_TRIGRAM_LENGTH = 3
+
+
+def parse_search_limit(raw_limit):
+    try:
+        limit = int(raw_limit) if raw_limit not in (None, '') else DEFAULT_SEARCH_LIMIT
+    except (TypeError, ValueError):
+        limit = DEFAULT_SEARCH_LIMIT
+    return max(1, min(limit, MAX_SEARCH_LIMIT))
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+class PrefixIndex:
+    """
+    In-process index used when the database has no trigram support. It
+    answers exactly like _search_postgres: rows are held in key order, a
+    bisect finds the key-prefix matches, and a query of MIN_TRIGRAM_LENGTH
+    or more characters also matches substrings of the key or the text
+    column, ranked after the prefix matches.
+    """
+
+    def __init__(self, rows, key_field, text_field):
+        self.rows = sorted(rows, key=lambda row: _key_order(row[key_field]))
+        self._keys = [(row[key_field] or '').lower() for row in self.rows]
+        self._texts = [(row[text_field] or '').lower() for row in self.rows]
+
+    def search(self, q, limit):
+        q = q.lower()
+        results = []
+        position = bisect_left(self._keys, q)
+        while position < len(self._keys) and self._keys[position].startswith(q) and len(results) < limit:
+            results.append(self.rows[position])
+            position += 1
+        if len(q) < MIN_TRIGRAM_LENGTH:
+            return results
+
+        for key, text, row in zip(self._keys, self._texts, self.rows):
+            if len(results) >= limit:
+                break
+            if not key.startswith(q) and (q in key or q in text):
+                results.append(row)
+        return results
+
+
+def _key_order(key):
+    # Same order as the Postgres ORDER BY lower(key) COLLATE "C", key COLLATE "C"
+    key = key or ''
+    return key.lower(), key
+
+
+_prefix_lock = threading.Lock()
+
+
+def _get_prefix_index(model, key_column, text_column, result_columns):
+    """
+    PrefixIndex of `model`, rebuilt when its collection version moves. Kept
+    on the app, so apps (and databases) in one process never share one.
+    """
+    name = model.__tablename__
+    version = collection_versions([name])[name][0]
+    indexes = current_app.extensions.setdefault('search_prefix_indexes', {})
+
+    cached = indexes.get(name)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    with _prefix_lock:
+        cached = indexes.get(name)
+        if cached and cached[0] == version:
+            return cached[1]
+        rows = [dict(row._mapping) for row in db.session.query(*result_columns)]
+        index = PrefixIndex(rows, key_column.key, text_column.key)
+        indexes[name] = (version, index)
+        return index
+
+
+def _search_postgres(key_column, text_column, result_columns, q, limit):
+    escaped = _escape_like(q.lower())
+    prefix = f'{escaped}%'
+    key_lower = func.lower(key_column)
+
+    if len(q) < MIN_TRIGRAM_LENGTH:
+        # Too short for trigrams: prefix-only via the text_pattern_ops index
+        condition = key_lower.like(prefix, escape='\\')
+    else:
+        substring = f'%{escaped}%'
+        condition = or_(
+            key_column.ilike(substring, escape='\\'),
+            text_column.ilike(substring, escape='\\')
+        )
+
+    rank = case((key_lower.like(prefix, escape='\\'), 0), else_=1)
+    rows = (db.session.query(*result_columns)
+            .filter(condition)
+            .order_by(rank, key_lower.collate('C'), key_column.collate('C'))
+            .limit(limit)
+            .all())
+    return [dict(row._mapping) for row in rows]
+
+
+def search_catalog(model, key_column, text_column, result_columns, q, limit):
+    """
+    Top-`limit` rows whose key starts with `q`, then (for `q` of at least
+    MIN_TRIGRAM_LENGTH characters) rows whose key or text column contains
+    `q`, each group in key order; case-insensitive. Postgres answers from
+    pg_trgm / prefix indexes; other databases use the in-process
+    PrefixIndex, with the same results.
+    """
+    q = (q or '').strip()
+    if not q:
+        return []
+
+    if db.engine.dialect.name == 'postgresql':
+        return _search_postgres(key_column, text_column, result_columns, q, limit)
+
+    return _get_prefix_index(model, key_column, text_column, result_columns).search(q, limit)
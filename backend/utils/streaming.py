@@ -0,0 +1,111 @@
+# backend/utils/streaming.py
+import json
+from array import array
+from flask import Response, current_app, stream_with_context
+from .pagination import parse_bool_arg
+
+# Rows fetched per round trip (server-side cursor on Postgres)
+STREAM_BATCH_SIZE = 500
+
+# Serialized rows buffered into one chunk of the HTTP response
+STREAM_ROWS_PER_CHUNK = 100
+
+_READ_CHUNK_BYTES = 64 * 1024
+
+
+def is_stream_request(args):
+    """?stream=1 asks for an incrementally written JSON array"""
+    raw = args.get('stream')
+    return raw not in (None, '') and parse_bool_arg(raw, 'stream')
+
+
+def stream_json_array(rows, serialize=None):
+    """
+    Stream `rows` as a JSON array. Rows are serialized (and encoded with the
+    app's JSON provider, like jsonify) as they are consumed, so only one chunk
+    of output is held in memory no matter how many rows there are.
+    """
+    dumps = current_app.json.dumps
+
+    def generate():
+        yield '['
+        pending, first = [], True
+        for row in rows:
+            pending.append(dumps(serialize(row) if serialize else row))
+            if len(pending) >= STREAM_ROWS_PER_CHUNK:
+                yield ('' if first else ',') + ','.join(pending)
+                pending, first = [], False
+        if pending:
+            yield ('' if first else ',') + ','.join(pending)
+        yield ']\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+
+def stream_query(query, serialize, batch_size=STREAM_BATCH_SIZE):
+    """
+    Stream an ORM query as a JSON array, fetching `batch_size` rows at a
+    time with yield_per instead of materializing the whole result.
+    """
+    return stream_json_array(query.yield_per(batch_size), serialize)
+
+
+def json_array_offsets(f, key=None):
+    """
+    Scan a binary file object holding one top-level JSON array and return
+    (starts, ends, keys): the byte offsets of each element and, if `key` is
+    given, key(element) for each (else None). Decoded elements are not kept.
+    The file must be ASCII (json.dump's default ensure_ascii output) so that
+    character and byte offsets agree; anything else raises ValueError.
+    """
+    decoder = json.JSONDecoder()
+    starts, ends = array('q'), array('q')
+    keys = [] if key else None
+
+    f.seek(0)
+    buffer, base, index = '', 0, 0
+    opened = closed = eof = False
+    while not closed:
+        while index < len(buffer) and buffer[index] in ' \t\r\n,':
+            index += 1
+
+        if index < len(buffer):
+            if not opened:
+                if buffer[index] != '[':
+                    raise ValueError('Expected a JSON array')
+                opened = True
+                index += 1
+                continue
+            if buffer[index] == ']':
+                closed = True
+                continue
+            try:
+                element, end = decoder.raw_decode(buffer, index)
+                starts.append(base + index)
+                ends.append(base + end)
+                if keys is not None:
+                    keys.append(key(element))
+                index = end
+                continue
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Element straddles the chunk boundary; read more
+
+        if eof:
+            raise ValueError('Unterminated JSON array')
+        chunk = f.read(_READ_CHUNK_BYTES)
+        eof = not chunk
+        buffer = buffer[index:] + chunk.decode('ascii')
+        base += index
+        index = 0
+
+    return starts, ends, keys
+
+
+def iter_json_array(f, offsets, positions):
+    """Decode the elements at `positions` of `offsets` (from json_array_offsets), in that order"""
+    starts, ends, _ = offsets
+    for position in positions:
+        f.seek(starts[position])
+        yield json.loads(f.read(ends[position] - starts[position]))